@@ -1,6 +1,7 @@
 from typing import TYPE_CHECKING, Optional, Union
 from uuid import UUID, uuid4
 from datetime import datetime
+from sqlalchemy import Index, text
 from sqlmodel import SQLModel, Field, Relationship
 from ..entities.GroundStation import GroundStation
 from pydantic import ConfigDict
@@ -9,17 +10,31 @@ if TYPE_CHECKING:
     from app.entities.Satellite import Satellite
 
 
+def window_index(table: str) -> Index:
+    """GiST index of the [start_time, end_time) range of a table, PostgreSQL only
+
+    Overlap queries use the same tsrange expression with the && operator, see
+    overlaps_window. Other databases use the B-tree indexes of the two columns.
+    """
+    return Index(
+        f"ix_{table}_window",
+        text("tsrange(start_time, end_time)"),
+        postgresql_using="gist",
+    ).ddl_if(dialect="postgresql")
+
+
 class RFRequest(SQLModel, table=True):  # type: ignore
     """RF Request entity for database storage"""
 
     __tablename__ = "rf_request"  # type: ignore
+    __table_args__ = (window_index("rf_request"),)
     model_config = ConfigDict(arbitrary_types_allowed=True)  # type: ignore
 
     id: UUID = Field(default_factory=uuid4, primary_key=True)
     mission: str
-    satellite_id: UUID = Field(foreign_key="satellites.id")
-    start_time: datetime
-    end_time: datetime
+    satellite_id: UUID = Field(foreign_key="satellites.id", index=True)
+    start_time: datetime = Field(index=True)
+    end_time: datetime = Field(index=True)
     contact_id: Optional[UUID]
     scheduled: bool = Field(default=False)
     priority: int  # Higher is better
@@ -28,10 +43,10 @@ class RFRequest(SQLModel, table=True):  # type: ignore
     science_time_requested: int = Field(default=0)
     min_passes: int = Field(default=1)
     ground_station_id: Optional[int] = Field(
-        default=None, foreign_key="ground_stations.id"
+        default=None, foreign_key="ground_stations.id", index=True
     )
     time_remaining: int = 0  # Will be set in __init__
-    num_passes_remaining: int = Field(default=min_passes)
+    num_passes_remaining: int = Field(default=1)
 
     def __init__(self, **data):
         super().__init__(**data)
@@ -50,7 +65,7 @@ class RFRequest(SQLModel, table=True):  # type: ignore
         )
         time_period = self.end_time - self.start_time
 
-        return (self.end_time - datetime.now()).total_seconds() * (
+        return (self.end_time - datetime.now(self.end_time.tzinfo)).total_seconds() * (
             tot_time / time_period.total_seconds()
         )
 
@@ -75,17 +90,18 @@ class ContactRequest(SQLModel, table=True):  # type: ignore
     """Contact Request entity for database storage"""
 
     __tablename__ = "contact_request"  # type: ignore
+    __table_args__ = (window_index("contact_request"),)
     model_config = ConfigDict(arbitrary_types_allowed=True)  # type: ignore
 
     id: UUID = Field(default_factory=uuid4, primary_key=True)
     mission: str
-    satellite_id: UUID = Field(foreign_key="satellites.id")
-    start_time: datetime
-    end_time: datetime
+    satellite_id: UUID = Field(foreign_key="satellites.id", index=True)
+    start_time: datetime = Field(index=True)
+    end_time: datetime = Field(index=True)
     booking_id: Optional[UUID]
     scheduled: bool = Field(default=False)
     priority: int  # Higher is better
-    ground_station_id: int = Field(foreign_key="ground_stations.id")
+    ground_station_id: int = Field(foreign_key="ground_stations.id", index=True)
     orbit: int
     uplink: bool
     telemetry: bool
@@ -4,6 +4,7 @@ from sqlmodel import Relationship, SQLModel, Field  # type: ignore
 from sqlalchemy.orm import Mapped
 from typing import List
 from app.entities.ExclusionCone import ExclusionCone
+from app.services.propagation import propagator_cache
 
 
 class Satellite(SQLModel, table=True):
@@ -40,9 +41,8 @@ class Satellite(SQLModel, table=True):
         self.priority = priority
 
     def get_sf_sat(self) -> EarthSatellite:
-        tle_lines = self.tle.splitlines()
-        satellite = EarthSatellite(tle_lines[1], tle_lines[2], tle_lines[0])
-        return satellite
+        # shared between callers through the propagator cache, do not mutate
+        return propagator_cache.get(self.tle, self.name)
 
     def __repr__(self):
         return f"Satellite(name={self.name})"
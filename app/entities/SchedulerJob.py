@@ -0,0 +1,34 @@
+from datetime import datetime, timezone
+from typing import Any, Optional
+from uuid import UUID, uuid4
+from sqlalchemy import JSON, Column
+from sqlmodel import SQLModel, Field
+
+
+def utc_now() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class SchedulerJob(SQLModel, table=True):  # type: ignore
+    """A full reschedule, from submission to its bookings
+
+    Jobs are stored so that every worker process can report on and run the jobs
+    submitted to the others. Times are stored as naive UTC.
+    """
+
+    __tablename__ = "scheduler_jobs"  # type: ignore
+
+    id: UUID = Field(default_factory=uuid4, primary_key=True)
+    mode: str
+    improve_ms: int
+    # "queued", "running", "done" or "failed"
+    status: str = Field(default="queued", index=True)
+    # number of submissions coalesced into this job
+    submissions: int = 1
+    submitted_at: datetime = Field(default_factory=utc_now)
+    last_submitted_at: datetime = Field(default_factory=utc_now)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    # the stored bookings once the job is done, as JSON objects
+    result: Optional[list[dict[str, Any]]] = Field(default=None, sa_column=Column(JSON))
+    error: Optional[str] = None
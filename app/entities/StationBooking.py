@@ -0,0 +1,22 @@
+from datetime import datetime
+from uuid import UUID, uuid4
+from sqlmodel import SQLModel, Field
+from app.entities.Request import window_index
+
+
+class StationBooking(SQLModel, table=True):  # type: ignore
+    """Ground station time booked for a request by the scheduler
+
+    Times are stored as naive UTC. request_id refers to an RFRequest or a
+    ContactRequest depending on request_type.
+    """
+
+    __tablename__ = "bookings"  # type: ignore
+    __table_args__ = (window_index("bookings"),)
+
+    id: UUID = Field(default_factory=uuid4, primary_key=True)
+    request_id: UUID = Field(index=True)
+    request_type: str  # "RFTime" or "Contact"
+    gs_id: int = Field(foreign_key="ground_stations.id", index=True)
+    start_time: datetime = Field(index=True)
+    end_time: datetime = Field(index=True)
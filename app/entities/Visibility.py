@@ -1,9 +1,6 @@
-#  type: ignore
-# ^ remove the type: ignore from the class definition when
-#  we have the correct basic types
-
 from datetime import datetime
-from app.entities import GroundStation, Satellite
+from app.entities.GroundStation import GroundStation
+from app.entities.Satellite import Satellite
 
 
 class Visibility:
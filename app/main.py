@@ -1,3 +1,4 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.openapi.docs import get_swagger_ui_html
@@ -12,7 +13,13 @@ from .routers import (
     satellite,
     exclusion_cone,
     user,
+    metrics,
+    health,
+    visibility,
 )
+from .services.compute_pool import shutdown_executor
+from .services.pagination import NEXT_CURSOR_HEADER
+from .services.scheduler_jobs import scheduler_queue
 import logging
 
 logger = logging.getLogger(__name__)
@@ -21,7 +28,15 @@ logger = logging.getLogger(__name__)
 db_logger = logging.getLogger("sqlalchemy.engine")
 db_logger.setLevel(logging.DEBUG)
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    scheduler_queue.shutdown(timeout=5)
+    shutdown_executor()
+
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -29,6 +44,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 app.include_router(gs.router, prefix="/api/v1")
@@ -39,6 +55,9 @@ app.include_router(auth.router, prefix="/api/v1")
 app.include_router(satellite.router, prefix="/api/v1")
 app.include_router(exclusion_cone.router, prefix="/api/v1")
 app.include_router(user.router, prefix="/api/v1")
+app.include_router(metrics.router, prefix="/api/v1")
+app.include_router(health.router, prefix="/api/v1")
+app.include_router(visibility.router, prefix="/api/v1")
 
 
 @app.get("/", include_in_schema=False)
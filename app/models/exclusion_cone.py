@@ -1,6 +1,14 @@
+from datetime import datetime
+import os
 from typing import Optional
 import uuid
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
+from app.models.visibility import horizon_steps
+
+# largest evaluation a single exclusion windows query may ask for, in grid steps
+# and in cone evaluations (exclusion cones x grid steps)
+EXCLUSION_WINDOWS_MAX_STEPS = int(os.getenv("EXCLUSION_WINDOWS_MAX_STEPS", "100000"))
+EXCLUSION_WINDOWS_MAX_CELLS = int(os.getenv("EXCLUSION_WINDOWS_MAX_CELLS", "10000000"))
 
 
 class ExclusionConeCreateModel(BaseModel):
@@ -80,3 +88,82 @@ class ExclusionConeUpdateModel(BaseModel):
 
     class Config:
         from_attributes = True  # Allow conversion from SQLModel objects
+
+
+class ExclusionWindowsRequestModel(BaseModel):
+    """
+    This is a Pydantic model class that represents a request to evaluate every exclusion cone over a horizon.
+    """
+
+    start: datetime = Field(
+        description="Start of the horizon",
+        examples=["2025-01-21T00:00:00Z"],
+    )
+    end: datetime = Field(
+        description="End of the horizon",
+        examples=["2025-01-22T00:00:00Z"],
+    )
+    step_seconds: int = Field(
+        default=60,
+        ge=1,
+        description="Spacing of the evaluation grid in seconds",
+        examples=[60],
+    )
+    satellite_ids: Optional[list[uuid.UUID]] = Field(
+        default=None,
+        description="Only return windows for these satellites, all satellites if omitted",
+        examples=[["7b16adda-0dfc-48d0-9902-0da6da504a71"]],
+    )
+    station_ids: Optional[list[int]] = Field(
+        default=None,
+        description="Only return windows for these ground stations, all stations if omitted",
+        examples=[[1, 2]],
+    )
+
+    def steps(self) -> int:
+        """Number of steps of the evaluation grid"""
+        return horizon_steps(self.start, self.end, self.step_seconds)
+
+    @model_validator(mode="after")
+    def validate_size(self):
+        steps = self.steps()
+        if steps > EXCLUSION_WINDOWS_MAX_STEPS:
+            raise ValueError(
+                f"Evaluation grid would have {steps} steps, "
+                f"at most {EXCLUSION_WINDOWS_MAX_STEPS} are allowed"
+            )
+        return self
+
+
+class ExclusionWindowModel(BaseModel):
+    """
+    This is a Pydantic model class that represents an interval during which an exclusion cone forbids contact.
+    """
+
+    cone_id: uuid.UUID = Field(
+        description="ID of the exclusion cone",
+        examples=["4ff2dab7-bffe-414d-88a5-1826b9fea8df"],
+    )
+    satellite_id: uuid.UUID = Field(
+        description="The satellite protected by the exclusion cone",
+        examples=["7b16adda-0dfc-48d0-9902-0da6da504a71"],
+    )
+    gs_id: int = Field(
+        description="The station for which the exclusion cone applies",
+        examples=[1],
+    )
+    interfering_satellite_id: uuid.UUID = Field(
+        description="ID of the satellite the cone deconflicts against",
+        examples=["1c54a4ba-2c59-4a8e-a4f1-f6f5bfb7f2b0"],
+    )
+    start: datetime = Field(
+        description="First excluded instant",
+        examples=["2025-01-21T06:12:00Z"],
+    )
+    end: datetime = Field(
+        description="Last excluded instant",
+        examples=["2025-01-21T06:14:00Z"],
+    )
+
+    class Config:
+        from_attributes = True  # Allow conversion from dataclasses
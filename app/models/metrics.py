@@ -0,0 +1,76 @@
+from pydantic import BaseModel, Field
+
+
+class CacheStatsModel(BaseModel):
+    """
+    This is a Pydantic model class that represents the counters of an in-process cache.
+    """
+
+    size: int = Field(description="Number of cached entries", examples=[12])
+    max_size: int = Field(
+        description="Maximum number of entries before eviction", examples=[1024]
+    )
+    hits: int = Field(description="Number of lookups served from cache", examples=[340])
+    misses: int = Field(
+        description="Number of lookups that had to build a new entry", examples=[12]
+    )
+    evictions: int = Field(
+        description="Number of entries dropped to stay within max_size", examples=[0]
+    )
+
+
+class EntityCacheStatsModel(CacheStatsModel):
+    """
+    This is a Pydantic model class that represents the counters of the satellite and ground station cache.
+    """
+
+    invalidations: int = Field(
+        description="Number of times a write dropped every entry", examples=[3]
+    )
+    hit_rate: float = Field(
+        description="Share of lookups served from cache, 0 before the first lookup",
+        examples=[0.97],
+    )
+
+
+class DbPoolStatsModel(BaseModel):
+    """
+    This is a Pydantic model class that represents the database connection pool of one worker process.
+    """
+
+    pid: int = Field(description="Process id of the worker that answered", examples=[7])
+    pool: str = Field(
+        description="Pool implementation", examples=["MonitoredQueuePool"]
+    )
+    size: int = Field(description="Connections kept open by the pool", examples=[5])
+    max_overflow: int = Field(
+        description="Connections that may be opened beyond size under load",
+        examples=[10],
+    )
+    checked_out: int = Field(description="Connections in use", examples=[2])
+    checked_in: int = Field(description="Idle connections in the pool", examples=[3])
+    overflow: int = Field(
+        description="Connections open beyond size right now", examples=[0]
+    )
+    checkouts: int = Field(description="Number of connection checkouts", examples=[420])
+    waits: int = Field(
+        description="Checkouts that found every connection in use", examples=[3]
+    )
+    wait_seconds: float = Field(
+        description="Total time checkouts spent getting a connection", examples=[0.84]
+    )
+    max_wait_seconds: float = Field(
+        description="Longest wait for a connection", examples=[0.05]
+    )
+    timeouts: int = Field(
+        description="Checkouts that gave up after the pool timeout", examples=[0]
+    )
+
+
+class HealthModel(BaseModel):
+    """
+    This is a Pydantic model class that represents the health of the API and its database.
+    """
+
+    status: str = Field(description="ok when the database answers", examples=["ok"])
+    database: DbPoolStatsModel = Field(description="Connection pool of this worker")
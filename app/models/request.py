@@ -1,6 +1,6 @@
 import asyncio
 from datetime import datetime, timedelta
-from typing import List, Optional
+from typing import List, Literal, Optional
 from pydantic import BaseModel, Field
 from uuid import UUID
 
@@ -148,3 +148,45 @@ class GeneralContactResponseModel(BaseModel):
     class Config:
         # Pydantic's default datetime format to serialize `datetime` to ISO 8601 string
         json_encoders = {datetime: lambda v: v.isoformat() if v is not None else None}
+
+
+class SchedulerJobModel(BaseModel):
+    """
+    This is a Pydantic model class that represents a background reschedule job.
+    """
+
+    id: UUID = Field(
+        description="ID of the job",
+        examples=["3fa85f64-5717-4562-b3fc-2c963f66afa6"],
+    )
+    status: Literal["queued", "running", "done", "failed"] = Field(
+        description="State of the job", examples=["queued"]
+    )
+    mode: str = Field(description="Scheduler the job runs", examples=["greedy"])
+    improve_ms: int = Field(
+        description="Milliseconds of local search after scheduling", examples=[0]
+    )
+    submissions: int = Field(
+        description="Number of submissions coalesced into this job", examples=[3]
+    )
+    submitted_at: datetime = Field(
+        description="Time of the first submission", examples=["2024-10-15T12:00:00Z"]
+    )
+    started_at: Optional[datetime] = Field(
+        default=None,
+        description="Time the job started running",
+        examples=["2024-10-15T12:00:02Z"],
+    )
+    finished_at: Optional[datetime] = Field(
+        default=None,
+        description="Time the job finished",
+        examples=["2024-10-15T12:00:05Z"],
+    )
+    bookings: Optional[int] = Field(
+        default=None,
+        description="Number of bookings made, once the job is done",
+        examples=[42],
+    )
+    error: Optional[str] = Field(
+        default=None, description="Why the job failed", examples=[None]
+    )
@@ -0,0 +1,186 @@
+from datetime import datetime, timezone
+import os
+from typing import List, Literal, Optional, Union
+import uuid
+from pydantic import BaseModel, Field, model_validator
+
+# largest visibility matrix or pass prediction a single query may ask for, in time
+# steps and in values (satellites x stations x time steps)
+VISIBILITY_MATRIX_MAX_STEPS = int(os.getenv("VISIBILITY_MATRIX_MAX_STEPS", "100000"))
+VISIBILITY_MATRIX_MAX_CELLS = int(os.getenv("VISIBILITY_MATRIX_MAX_CELLS", "10000000"))
+# pass prediction horizons are counted in steps of this many seconds
+PASS_PREDICTION_STEP_SECONDS = 60
+
+
+def horizon_steps(start: datetime, end: datetime, step_seconds: int) -> int:
+    """Number of steps of a time grid over [start, end), naive datetimes are taken as UTC"""
+    start, end = (
+        t if t.tzinfo else t.replace(tzinfo=timezone.utc) for t in (start, end)
+    )
+    return max(-int((start - end).total_seconds() // step_seconds), 0)
+
+
+def check_network_size(
+    steps: int,
+    satellite_ids: Optional[List[uuid.UUID]],
+    station_ids: Optional[List[int]],
+):
+    """Raise ValueError if a query over the network exceeds the visibility limits
+
+    The values are only counted when both id lists are given, otherwise the number
+    of satellites and stations is only known once they are loaded.
+    """
+    if steps > VISIBILITY_MATRIX_MAX_STEPS:
+        raise ValueError(
+            f"Query would cover {steps} time steps, "
+            f"at most {VISIBILITY_MATRIX_MAX_STEPS} are allowed"
+        )
+    if satellite_ids is not None and station_ids is not None:
+        cells = len(satellite_ids) * len(station_ids) * steps
+        if cells > VISIBILITY_MATRIX_MAX_CELLS:
+            raise ValueError(
+                f"Query would cover {cells} values, "
+                f"at most {VISIBILITY_MATRIX_MAX_CELLS} are allowed"
+            )
+
+
+class PassPredictionRequestModel(BaseModel):
+    """
+    This is a Pydantic model class that represents a pass prediction query.
+    """
+
+    start: datetime = Field(
+        description="Start of the prediction horizon (UTC if no timezone is given)",
+        examples=["2025-01-21T00:00:00Z"],
+    )
+    end: datetime = Field(
+        description="End of the prediction horizon (UTC if no timezone is given)",
+        examples=["2025-01-28T00:00:00Z"],
+    )
+    satellite_ids: Optional[List[uuid.UUID]] = Field(
+        default=None,
+        description="Satellites to predict the passes of; all satellites if omitted",
+        examples=[["7b16adda-0dfc-48d0-9902-0da6da504a71"]],
+    )
+    station_ids: Optional[List[int]] = Field(
+        default=None,
+        description="Ground stations to predict the passes over; all stations if omitted",
+        examples=[[1, 2]],
+    )
+
+    def steps(self) -> int:
+        """Number of PASS_PREDICTION_STEP_SECONDS steps the horizon is counted in"""
+        return horizon_steps(self.start, self.end, PASS_PREDICTION_STEP_SECONDS)
+
+    @model_validator(mode="after")
+    def validate_size(self):
+        check_network_size(self.steps(), self.satellite_ids, self.station_ids)
+        return self
+
+
+class VisibilityModel(BaseModel):
+    """
+    This is a Pydantic model class that represents a visibility window (AOS to LOS)
+    of a satellite above the mask of a ground station.
+    """
+
+    satellite_id: uuid.UUID = Field(
+        description="ID of the satellite",
+        examples=["7b16adda-0dfc-48d0-9902-0da6da504a71"],
+    )
+    satellite_name: str = Field(
+        description="Name of the satellite", examples=["SCISAT 1"]
+    )
+    gs_id: int = Field(description="ID of the ground station", examples=[1])
+    gs_name: str = Field(
+        description="Name of the ground station", examples=["Inuvik NorthWest"]
+    )
+    start: datetime = Field(
+        description="Acquisition of signal", examples=["2025-01-21T09:23:00Z"]
+    )
+    end: datetime = Field(
+        description="Loss of signal", examples=["2025-01-21T09:31:00Z"]
+    )
+    duration: float = Field(
+        description="Duration of the window in seconds", examples=[480.0]
+    )
+
+
+class VisibilityMatrixRequestModel(BaseModel):
+    """
+    This is a Pydantic model class that represents a visibility matrix query.
+    """
+
+    start: datetime = Field(
+        description="Start of the time grid (UTC if no timezone is given)",
+        examples=["2025-01-21T00:00:00Z"],
+    )
+    end: datetime = Field(
+        description="End of the time grid, not included (UTC if no timezone is given)",
+        examples=["2025-01-22T00:00:00Z"],
+    )
+    step_seconds: int = Field(
+        default=60,
+        ge=1,
+        description="Spacing of the time grid in seconds",
+        examples=[60],
+    )
+    satellite_ids: Optional[List[uuid.UUID]] = Field(
+        default=None,
+        description="Satellites of the matrix; all satellites if omitted",
+        examples=[["7b16adda-0dfc-48d0-9902-0da6da504a71"]],
+    )
+    station_ids: Optional[List[int]] = Field(
+        default=None,
+        description="Ground stations of the matrix; all stations if omitted",
+        examples=[[1, 2]],
+    )
+    values: Literal["visible", "elevation"] = Field(
+        default="visible",
+        description="Either visibility above the station mask or elevation in degrees",
+        examples=["visible"],
+    )
+    encoding: Literal["list", "packed"] = Field(
+        default="packed",
+        description="Nested JSON lists, or base64 of bit-packed booleans / little-endian float32 elevations",
+        examples=["packed"],
+    )
+
+    def steps(self) -> int:
+        """Number of time steps of the matrix"""
+        return horizon_steps(self.start, self.end, self.step_seconds)
+
+    @model_validator(mode="after")
+    def validate_size(self):
+        check_network_size(self.steps(), self.satellite_ids, self.station_ids)
+        return self
+
+
+class VisibilityMatrixModel(BaseModel):
+    """
+    This is a Pydantic model class that represents a dense visibility matrix
+    of shape [satellites, stations, time steps].
+    """
+
+    satellite_ids: List[uuid.UUID] = Field(
+        description="Satellites along the first axis",
+        examples=[["7b16adda-0dfc-48d0-9902-0da6da504a71"]],
+    )
+    station_ids: List[int] = Field(
+        description="Ground stations along the second axis", examples=[[1, 2]]
+    )
+    start: datetime = Field(
+        description="Time of the first step", examples=["2025-01-21T00:00:00Z"]
+    )
+    step_seconds: int = Field(description="Spacing of the time steps", examples=[60])
+    shape: List[int] = Field(description="Shape of the matrix", examples=[[1, 2, 1440]])
+    values: Literal["visible", "elevation"] = Field(
+        description="Meaning of the values", examples=["visible"]
+    )
+    encoding: Literal["list", "packed"] = Field(
+        description="Encoding of data", examples=["packed"]
+    )
+    data: Union[str, List] = Field(
+        description="The matrix, encoded as described by encoding",
+        examples=["8A8AAA=="],
+    )
@@ -7,7 +7,15 @@ class ErrorResponse(BaseModel):
 
 
 def getErrorResponses(code: int) -> Dict[int, Dict[str, Any]]:
-    if code == 403:
+    if code == 400:
+        return {
+            400: {
+                "description": "Invalid request parameters",
+                "model": ErrorResponse,
+                "content": _getErrorContentExample(),
+            }
+        }
+    elif code == 403:
         return {
             403: {
                 "description": "Permission denied",
@@ -5,11 +5,14 @@ from app.models.exclusion_cone import (
     ExclusionConeModel,
     ExclusionConeCreateModel,
     ExclusionConeUpdateModel,
+    ExclusionWindowModel,
+    ExclusionWindowsRequestModel,
 )
 from sqlmodel import Session
 from app.routers.error import getErrorResponses
 from app.services.db import get_db
 from app.services.exclusion_cone import ExclusionConeService
+from app.services.exclusion_evaluator import ExclusionEvaluatorService
 
 router = APIRouter(prefix="/excones", tags=["Exclusion Cone"])
 
@@ -28,6 +31,20 @@ def create_exclusion_cone(
     return ExclusionConeService.create_exclusion_cone(db, request)
 
 
+# POST /api/v1/excones/windows
+@router.post(
+    "/windows",
+    summary="Evaluate every exclusion cone over a horizon",
+    response_model=List[ExclusionWindowModel],
+    response_description="Exclusion windows sorted by start time",
+    responses={**getErrorResponses(400), **getErrorResponses(503), **getErrorResponses(500)},  # type: ignore[dict-item]
+)
+def get_exclusion_windows(
+    request: ExclusionWindowsRequestModel, db: Session = Depends(get_db)
+):
+    return ExclusionEvaluatorService.get_exclusion_windows(db, request)
+
+
 # PATCH /api/v1/excones/{excone_id}
 @router.patch(
     "/{excone_id}",
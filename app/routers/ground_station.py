@@ -1,9 +1,16 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query, Response
 from typing import List
 from app.models.ground_station import GroundStationModel, GroundStationUpdateModel
 from sqlmodel import Session
 from app.services.ground_station import GroundStationService, GroundStationCreateModel
 from app.services.db import get_db
+from app.services.pagination import (
+    NEXT_CURSOR_HEADER,
+    PAGE_SIZE_DEFAULT,
+    PAGE_SIZE_MAX,
+    set_next_cursor,
+    split_page,
+)
 from app.routers.error import getErrorResponses
 
 router = APIRouter(prefix="/gs", tags=["Ground Station"])
@@ -40,13 +47,29 @@ def update_ground_station(
 # GET /api/v1/gs
 @router.get(
     "/",
-    summary="Get a list of all ground stations",
+    summary="Get a page of ground stations, ordered by id",
     response_model=List[GroundStationModel],
     response_description="List of ground station objects",
-    responses={**getErrorResponses(503), **getErrorResponses(500)},  # type: ignore[dict-item]
+    responses={**getErrorResponses(400), **getErrorResponses(503), **getErrorResponses(500)},  # type: ignore[dict-item]
 )
-def get_ground_stations(db: Session = Depends(get_db)):
-    return GroundStationService.get_ground_stations(db)
+def get_ground_stations(
+    response: Response,
+    limit: int = Query(
+        default=PAGE_SIZE_DEFAULT,
+        ge=1,
+        le=PAGE_SIZE_MAX,
+        description="Number of ground stations per page",
+    ),
+    cursor: str | None = Query(
+        default=None,
+        description=f"Cursor of the next page, from the {NEXT_CURSOR_HEADER} header",
+    ),
+    db: Session = Depends(get_db),
+):
+    items = GroundStationService.get_ground_stations(db, limit + 1, cursor)
+    page, next_cursor = split_page(items, limit, lambda gs: (gs.id,))
+    set_next_cursor(response, next_cursor)
+    return page
 
 
 # GET /api/v1/gs/{gs_id}
@@ -0,0 +1,20 @@
+from fastapi import APIRouter, Depends
+from sqlmodel import Session
+from app.models.metrics import HealthModel
+from app.routers.error import getErrorResponses
+from app.services.db import engine, get_db, ping, pool_stats
+
+router = APIRouter(prefix="/health", tags=["Health"])
+
+
+# GET /api/v1/health
+@router.get(
+    "/",
+    summary="Check that the API can reach its database",
+    response_model=HealthModel,
+    response_description="Health and connection pool of this worker",
+    responses={**getErrorResponses(503)},  # type: ignore[dict-item]
+)
+def get_health(db: Session = Depends(get_db)):
+    ping(db)
+    return {"status": "ok", "database": pool_stats(engine)}
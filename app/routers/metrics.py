@@ -0,0 +1,56 @@
+from fastapi import APIRouter
+from app.models.metrics import (
+    CacheStatsModel,
+    DbPoolStatsModel,
+    EntityCacheStatsModel,
+)
+from app.services.db import engine, pool_stats
+from app.services.entity_cache import entity_cache
+from app.services.exclusion_cache import exclusion_window_cache
+from app.services.propagation import propagator_cache
+
+router = APIRouter(prefix="/metrics", tags=["Metrics"])
+
+
+# GET /api/v1/metrics/propagator
+@router.get(
+    "/propagator",
+    summary="Get the counters of the satellite propagator cache",
+    response_model=CacheStatsModel,
+    response_description="Propagator cache counters",
+)
+def get_propagator_metrics():
+    return propagator_cache.stats()
+
+
+# GET /api/v1/metrics/exclusions
+@router.get(
+    "/exclusions",
+    summary="Get the counters of the exclusion window cache",
+    response_model=CacheStatsModel,
+    response_description="Exclusion window cache counters",
+)
+def get_exclusion_metrics():
+    return exclusion_window_cache.stats()
+
+
+# GET /api/v1/metrics/entities
+@router.get(
+    "/entities",
+    summary="Get the counters of the satellite and ground station cache",
+    response_model=EntityCacheStatsModel,
+    response_description="Satellite and ground station cache counters",
+)
+def get_entity_metrics():
+    return entity_cache.stats()
+
+
+# GET /api/v1/metrics/db
+@router.get(
+    "/db",
+    summary="Get the state of the database connection pool of this worker",
+    response_model=DbPoolStatsModel,
+    response_description="Connection pool counters",
+)
+def get_db_metrics():
+    return pool_stats(engine)
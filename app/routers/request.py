@@ -1,10 +1,12 @@
-from typing import List
-from fastapi import APIRouter, HTTPException, Depends
+from datetime import datetime
+from typing import List, Literal
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
 from app.services.db import get_db
 from sqlmodel import Session
 from uuid import UUID
 from app.models.request import (
     GeneralContactResponseModel,
+    SchedulerJobModel,
     RFTimeRequestModel,
     ContactRequestModel,
 )
@@ -13,6 +15,17 @@ from app.entities.Request import (
     RFRequest,
 )
 from app.services.request import RequestService, Booking
+from app.services.local_search import SCHEDULER_MAX_IMPROVE_MS
+from app.services.pagination import (
+    NEXT_CURSOR_HEADER,
+    PAGE_SIZE_DEFAULT,
+    PAGE_SIZE_MAX,
+    set_next_cursor,
+    split_page,
+)
+from app.entities.SchedulerJob import SchedulerJob
+from app.services.propagation import as_utc
+from app.services.scheduler_jobs import SCHEDULER_RERUN_ON_WRITE, scheduler_queue
 import logging
 from app.routers.error import getErrorResponses
 
@@ -25,17 +38,87 @@ router = APIRouter(
 )
 
 
+def job_to_model(job: SchedulerJob) -> SchedulerJobModel:
+    return SchedulerJobModel(
+        id=job.id,
+        status=job.status,  # type: ignore[arg-type]
+        mode=job.mode,
+        improve_ms=job.improve_ms,
+        submissions=job.submissions,
+        submitted_at=as_utc(job.submitted_at),
+        started_at=None if job.started_at is None else as_utc(job.started_at),
+        finished_at=None if job.finished_at is None else as_utc(job.finished_at),
+        bookings=None if job.result is None else len(job.result),
+        error=job.error,
+    )
+
+
+def rerun_on_write():
+    # requests are repaired incrementally on write, a full rerun is opt-in
+    if SCHEDULER_RERUN_ON_WRITE:
+        scheduler_queue.submit()
+
+
+def get_job(job_id: UUID) -> SchedulerJob:
+    job = scheduler_queue.get(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=404, detail=f"Scheduler job with ID {job_id} not found"
+        )
+    return job
+
+
 @router.get(
     "/",
-    summary="Get all requests",
+    summary="Get a page of requests, ordered by start time",
     response_model=List[GeneralContactResponseModel],
-    responses={**getErrorResponses(503), **getErrorResponses(500)},  # type: ignore[dict-item]
+    responses={**getErrorResponses(400), **getErrorResponses(503), **getErrorResponses(500)},  # type: ignore[dict-item]
 )
 def get_requests(
+    response: Response,
+    limit: int = Query(
+        default=PAGE_SIZE_DEFAULT,
+        ge=1,
+        le=PAGE_SIZE_MAX,
+        description="Number of requests per page",
+    ),
+    cursor: str | None = Query(
+        default=None,
+        description=f"Cursor of the next page, from the {NEXT_CURSOR_HEADER} header",
+    ),
+    start: datetime | None = Query(
+        default=None, description="Only requests whose window ends after this time"
+    ),
+    end: datetime | None = Query(
+        default=None, description="Only requests whose window starts before this time"
+    ),
+    satellite_id: UUID | None = Query(
+        default=None, description="Only requests for this satellite"
+    ),
+    station_id: int | None = Query(
+        default=None, description="Only requests on this ground station"
+    ),
+    request_type: Literal["RFTime", "Contact"] | None = Query(
+        default=None, description="Only requests of this type"
+    ),
     db: Session = Depends(get_db),
 ):
     try:
-        return RequestService.get_all_transformed_requests(db)
+        requests = RequestService.get_all_transformed_requests(
+            db,
+            limit + 1,
+            cursor,
+            start,
+            end,
+            satellite_id,
+            station_id,
+            request_type,
+        )
+        page, next_cursor = split_page(requests, limit, lambda r: (r.startTime, r.id))
+        set_next_cursor(response, next_cursor)
+        return page
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting all requests: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -52,11 +135,68 @@ def get_bookings(
 ):
     try:
         return RequestService.get_bookings(db)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting bookings: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post(
+    "/bookings/reschedule",
+    summary="Queue a reschedule of the requests that have not ended yet",
+    status_code=202,
+    response_model=SchedulerJobModel,
+    responses={**getErrorResponses(500)},  # type: ignore[dict-item]
+)
+def reschedule_bookings(
+    mode: Literal["greedy", "optimal"] | None = Query(
+        default=None,
+        description="Scheduler to use, defaults to the SCHEDULER_MODE setting",
+    ),
+    improve_ms: int = Query(
+        default=0,
+        ge=0,
+        le=SCHEDULER_MAX_IMPROVE_MS,
+        description="Milliseconds of local search to improve the schedule with, 0 to skip it",
+    ),
+):
+    try:
+        return job_to_model(scheduler_queue.submit(mode, improve_ms))
+    except Exception as e:
+        logger.error(f"Error queueing reschedule: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get(
+    "/bookings/jobs/{job_id}",
+    summary="Get the status of a reschedule job",
+    response_model=SchedulerJobModel,
+    responses={**getErrorResponses(404)},  # type: ignore[dict-item]
+)
+def get_reschedule_job(job_id: UUID):
+    return job_to_model(get_job(job_id))
+
+
+@router.get(
+    "/bookings/jobs/{job_id}/result",
+    summary="Get the bookings made by a finished reschedule job",
+    response_model=List[Booking],
+    responses={**getErrorResponses(404), **getErrorResponses(409), **getErrorResponses(500)},  # type: ignore[dict-item]
+)
+def get_reschedule_result(job_id: UUID):
+    job = get_job(job_id)
+    if job.status == "failed":
+        raise HTTPException(
+            status_code=500, detail=f"Scheduler job {job_id} failed: {job.error}"
+        )
+    if job.result is None:
+        raise HTTPException(
+            status_code=409, detail=f"Scheduler job {job_id} is still {job.status}"
+        )
+    return job.result
+
+
 @router.get(
     "/sample",
     summary="runs a sample demo of the service",
@@ -86,6 +226,7 @@ def sample(
 def rf_time(request: RFTimeRequestModel, db: Session = Depends(get_db)):
     try:
         created_request = RequestService.create_rf_request(db, request)
+        rerun_on_write()
         return created_request
     except HTTPException as e:
         raise e
@@ -104,6 +245,7 @@ def rf_time(request: RFTimeRequestModel, db: Session = Depends(get_db)):
 def contact(request: ContactRequestModel, db: Session = Depends(get_db)):
     try:
         resp = RequestService.create_contact_request(db, request)
+        rerun_on_write()
         return resp
     except HTTPException as e:
         raise e
@@ -137,6 +279,7 @@ def get_rf_time_request(request_id: UUID, db: Session = Depends(get_db)):
 def delete_rf_time_request(request_id: UUID, db: Session = Depends(get_db)):
     try:
         RequestService.delete_rf_time_request(db, request_id)
+        rerun_on_write()
         return {"message": "RF Time Request deleted successfully"}
     except HTTPException:
         raise
@@ -169,6 +312,7 @@ def get_contact_request(request_id: UUID, db: Session = Depends(get_db)):
 def delete_contact_request(request_id: UUID, db: Session = Depends(get_db)):
     try:
         RequestService.delete_contact_request(db, request_id)
+        rerun_on_write()
         return {"message": "Contact Request deleted successfully"}
     except HTTPException:
         raise
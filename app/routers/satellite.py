@@ -1,5 +1,5 @@
 import uuid
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query, Response
 from typing import List
 from app.models.satellite import (
     SatelliteModel,
@@ -9,6 +9,13 @@ from app.models.satellite import (
 from sqlmodel import Session
 from app.routers.error import getErrorResponses
 from app.services.db import get_db
+from app.services.pagination import (
+    NEXT_CURSOR_HEADER,
+    PAGE_SIZE_DEFAULT,
+    PAGE_SIZE_MAX,
+    set_next_cursor,
+    split_page,
+)
 from app.services.satellite import SatelliteService
 
 router = APIRouter(prefix="/satellites", tags=["Satellite"])
@@ -45,13 +52,29 @@ def update_satellite(
 # GET /api/v1/satellites
 @router.get(
     "/",
-    summary="Get a list of all satellites",
+    summary="Get a page of satellites, ordered by id",
     response_model=List[SatelliteModel],
     response_description="List of satellite objects",
-    responses={**getErrorResponses(503), **getErrorResponses(500)},  # type: ignore[dict-item]
+    responses={**getErrorResponses(400), **getErrorResponses(503), **getErrorResponses(500)},  # type: ignore[dict-item]
 )
-def get_satellites(db: Session = Depends(get_db)):
-    return SatelliteService.get_satellites(db)
+def get_satellites(
+    response: Response,
+    limit: int = Query(
+        default=PAGE_SIZE_DEFAULT,
+        ge=1,
+        le=PAGE_SIZE_MAX,
+        description="Number of satellites per page",
+    ),
+    cursor: str | None = Query(
+        default=None,
+        description=f"Cursor of the next page, from the {NEXT_CURSOR_HEADER} header",
+    ),
+    db: Session = Depends(get_db),
+):
+    items = SatelliteService.get_satellites(db, limit + 1, cursor)
+    page, next_cursor = split_page(items, limit, lambda sat: (sat.id,))
+    set_next_cursor(response, next_cursor)
+    return page
 
 
 # GET /api/v1/satellites/{satellite_id}
@@ -1,9 +1,16 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
 from typing import List
 from sqlmodel import Session
 from app.models.user import UserModel, UserUpdateModel
 from app.routers.error import getErrorResponses
 from app.services.db import get_db
+from app.services.pagination import (
+    NEXT_CURSOR_HEADER,
+    PAGE_SIZE_DEFAULT,
+    PAGE_SIZE_MAX,
+    set_next_cursor,
+    split_page,
+)
 from app.services.user import UserService
 from app.services.auth import get_current_user
 
@@ -30,15 +37,30 @@ def update_user(
 # GET /api/v1/users
 @router.get(
     "/",
-    summary="Get a list of all users",
+    summary="Get a page of users, ordered by id",
     response_model=List[UserModel],
     response_description="List of user objects",
-    responses={**getErrorResponses(403), **getErrorResponses(503), **getErrorResponses(500)},  # type: ignore[dict-item]
+    responses={**getErrorResponses(400), **getErrorResponses(403), **getErrorResponses(503), **getErrorResponses(500)},  # type: ignore[dict-item]
 )
 def get_users(
-    db: Session = Depends(get_db), current_user: UserModel = Depends(get_current_user)
+    response: Response,
+    limit: int = Query(
+        default=PAGE_SIZE_DEFAULT,
+        ge=1,
+        le=PAGE_SIZE_MAX,
+        description="Number of users per page",
+    ),
+    cursor: str | None = Query(
+        default=None,
+        description=f"Cursor of the next page, from the {NEXT_CURSOR_HEADER} header",
+    ),
+    db: Session = Depends(get_db),
+    current_user: UserModel = Depends(get_current_user),
 ):
-    return UserService.get_users(db, current_user)
+    users = UserService.get_users(db, current_user, limit + 1, cursor)
+    page, next_cursor = split_page(users, limit, lambda user: (user.id,))
+    set_next_cursor(response, next_cursor)
+    return page
 
 
 # GET /api/v1/users/{user_id}
@@ -0,0 +1,64 @@
+from fastapi import APIRouter, Depends
+from typing import List
+from sqlmodel import Session
+from app.models.visibility import (
+    PassPredictionRequestModel,
+    VisibilityMatrixModel,
+    VisibilityMatrixRequestModel,
+    VisibilityModel,
+)
+from app.routers.error import getErrorResponses
+from app.services.db import get_db
+from app.services.passes import PassService
+from app.services.visibility import VisibilityService, encode_matrix
+
+router = APIRouter(prefix="/visibility", tags=["Visibility"])
+
+
+# POST /api/v1/visibility/passes
+@router.post(
+    "/passes",
+    summary="Predict the passes of satellites over ground stations",
+    response_model=List[VisibilityModel],
+    response_description="Visibility windows sorted by start time",
+    responses={**getErrorResponses(400), **getErrorResponses(503), **getErrorResponses(500)},  # type: ignore[dict-item]
+)
+async def get_passes(
+    request: PassPredictionRequestModel, db: Session = Depends(get_db)
+):
+    return [
+        VisibilityModel(
+            satellite_id=v.sat.id,
+            satellite_name=v.sat.name,
+            gs_id=v.gs.id,
+            gs_name=v.gs.name,
+            start=v.start,
+            end=v.end,
+            duration=v.dur,
+        )
+        for v in await PassService.get_passes(db, request)
+    ]
+
+
+# POST /api/v1/visibility/matrix
+@router.post(
+    "/matrix",
+    summary="Compute the visibility matrix of satellites, ground stations and time",
+    response_model=VisibilityMatrixModel,
+    response_description="Dense matrix of shape [satellites, stations, time steps]",
+    responses={**getErrorResponses(400), **getErrorResponses(503), **getErrorResponses(500)},  # type: ignore[dict-item]
+)
+async def get_matrix(
+    request: VisibilityMatrixRequestModel, db: Session = Depends(get_db)
+):
+    satellites, stations, matrix = await VisibilityService.get_matrix(db, request)
+    return VisibilityMatrixModel(
+        satellite_ids=[s.id for s in satellites],
+        station_ids=[gs.id for gs in stations],
+        start=request.start,
+        step_seconds=request.step_seconds,
+        shape=list(matrix.shape),
+        values=request.values,
+        encoding=request.encoding,
+        data=encode_matrix(matrix, request.encoding),
+    )
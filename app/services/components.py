@@ -0,0 +1,267 @@
+from collections import defaultdict
+import logging
+import os
+import uuid
+from app.entities.GroundStation import GroundStation
+from app.entities.Request import ContactRequest, RFRequest
+from app.services import compute_pool
+from app.services.optimizer import request_weights, schedule_optimal
+from app.services.request import (
+    SCHEDULER_SETUP_SECONDS,
+    SCHEDULER_TEARDOWN_SECONDS,
+    Booking,
+    Request,
+    schedule_with_slots,
+)
+from app.services.timeline import to_epoch
+
+logger = logging.getLogger(__name__)
+
+# below this many requests the components are scheduled in the calling process
+SCHEDULER_PARALLEL_MIN_REQUESTS = int(
+    os.getenv("SCHEDULER_PARALLEL_MIN_REQUESTS", "200")
+)
+
+
+class _DisjointSet:
+    def __init__(self, size: int) -> None:
+        self.parent = list(range(size))
+
+    def find(self, i: int) -> int:
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, i: int, j: int):
+        self.parent[self.find(i)] = self.find(j)
+
+
+def station_footprints(
+    requests: list[Request],
+    stations: list[GroundStation],
+    slot_duration: int = 15 * 60,
+    passes: dict[tuple[uuid.UUID, int], list[tuple[int, int]]] | None = None,
+    setup: int = SCHEDULER_SETUP_SECONDS,
+    teardown: int = SCHEDULER_TEARDOWN_SECONDS,
+) -> dict[int, list[tuple[int, int, int]]]:
+    """Station time each request could book, as (start, end, request index) by station
+
+    A contact can only use its own station. An RF request can use every station, or
+    with pass windows only the stations it passes over during its window. The last
+    slot of a window may run past its end, so footprints are extended by a slot,
+    and the station is held for the setup and teardown margins around them.
+
+    Args:
+        requests (list[Request]): Requests to schedule
+        stations (list[GroundStation]): Ground stations RF requests can be booked on
+        slot_duration (int, optional): The length of each slot in seconds. Defaults to 15*60. 15 minutes.
+        passes (dict[tuple[uuid.UUID, int], list[tuple[int, int]]] | None, optional): Pass windows by (satellite id, ground station id). Defaults to None.
+        setup (int, optional): Seconds a station is held before each booking. Defaults to SCHEDULER_SETUP_SECONDS.
+        teardown (int, optional): Seconds a station is held after each booking. Defaults to SCHEDULER_TEARDOWN_SECONDS.
+
+    Returns:
+        dict[int, list[tuple[int, int, int]]]: Footprints by ground station id
+    """
+    footprints: dict[int, list[tuple[int, int, int]]] = defaultdict(list)
+    for i, request in enumerate(requests):
+        start = to_epoch(request.start_time) - setup
+        end = to_epoch(request.end_time) + slot_duration + teardown
+        if isinstance(request, ContactRequest):
+            footprints[request.ground_station_id].append((start, end, i))
+            continue
+        for gs in stations:
+            if passes is not None and not any(
+                first < end and last > start
+                for first, last in passes.get((request.satellite_id, gs.id), [])
+            ):
+                continue
+            footprints[gs.id].append((start, end, i))
+    return footprints
+
+
+def conflict_components(
+    requests: list[Request],
+    stations: list[GroundStation],
+    slot_duration: int = 15 * 60,
+    passes: dict[tuple[uuid.UUID, int], list[tuple[int, int]]] | None = None,
+    setup: int = SCHEDULER_SETUP_SECONDS,
+    teardown: int = SCHEDULER_TEARDOWN_SECONDS,
+) -> list[list[int]]:
+    """Split the requests into groups that can be scheduled independently
+
+    Two requests conflict when they could use the same station at the same time.
+    The footprints of each station are swept in start order and every footprint
+    that starts before the furthest end seen so far is joined to the group of the
+    one reaching that end, so the groups are the connected components of the
+    conflict graph without building its edges.
+
+    Args:
+        requests (list[Request]): Requests to schedule
+        stations (list[GroundStation]): Ground stations RF requests can be booked on
+        slot_duration (int, optional): The length of each slot in seconds. Defaults to 15*60. 15 minutes.
+        passes (dict[tuple[uuid.UUID, int], list[tuple[int, int]]] | None, optional): Pass windows by (satellite id, ground station id). Defaults to None.
+        setup (int, optional): Seconds a station is held before each booking. Defaults to SCHEDULER_SETUP_SECONDS.
+        teardown (int, optional): Seconds a station is held after each booking. Defaults to SCHEDULER_TEARDOWN_SECONDS.
+
+    Returns:
+        list[list[int]]: Request indices of each component, largest first
+    """
+    groups = _DisjointSet(len(requests))
+    for footprints in station_footprints(
+        requests, stations, slot_duration, passes, setup, teardown
+    ).values():
+        footprints.sort()
+        reach, owner = None, -1
+        for start, end, i in footprints:
+            if reach is not None and start < reach:
+                groups.union(i, owner)
+            if reach is None or end > reach:
+                reach, owner = end, i
+
+    components: dict[int, list[int]] = defaultdict(list)
+    for i in range(len(requests)):
+        components[groups.find(i)].append(i)
+    return sorted(components.values(), key=len, reverse=True)
+
+
+def _schedule_chunk(
+    requests: list[tuple[bool, dict]],
+    stations: list[dict],
+    slot_duration: int,
+    passes: dict[tuple[uuid.UUID, int], list[tuple[int, int]]] | None,
+    mode: str,
+    weights: dict[uuid.UUID, float],
+    setup: int,
+    teardown: int,
+) -> tuple[list[Booking], list[tuple[bool, int | None]]]:
+    """Scheduling pool task: bookings of some components and the state of their requests"""
+    chunk: list[Request] = [
+        RFRequest(**data) if is_rf else ContactRequest(**data)
+        for is_rf, data in requests
+    ]
+    chunk_stations = [GroundStation(**gs) for gs in stations]
+    if mode == "optimal":
+        bookings = schedule_optimal(
+            list(chunk),
+            chunk_stations,
+            slot_duration=slot_duration,
+            passes=passes,
+            weights=weights,
+            setup=setup,
+            teardown=teardown,
+        )
+    else:
+        bookings = schedule_with_slots(
+            list(chunk),
+            chunk_stations,
+            slot_duration=slot_duration,
+            passes=passes,
+            setup=setup,
+            teardown=teardown,
+        )
+    return bookings, [(r.scheduled, r.ground_station_id) for r in chunk]
+
+
+def schedule_components(
+    requests: list[Request],
+    stations: list[GroundStation],
+    slot_duration: int = 15 * 60,
+    passes: dict[tuple[uuid.UUID, int], list[tuple[int, int]]] | None = None,
+    mode: str = "greedy",
+    min_parallel: int = SCHEDULER_PARALLEL_MIN_REQUESTS,
+    setup: int = SCHEDULER_SETUP_SECONDS,
+    teardown: int = SCHEDULER_TEARDOWN_SECONDS,
+) -> list[Booking]:
+    """Schedule the conflict components of the requests in parallel
+
+    Requests in different components never compete for station time, so scheduling
+    each component on its own gives the same bookings as scheduling them together.
+    Components are packed into one task per worker, largest first onto the least
+    loaded task, and run on the compute pool. The scheduled flag and ground station
+    of the requests are updated as the scheduler would.
+
+    Args:
+        requests (list[Request]): Requests to schedule
+        stations (list[GroundStation]): Ground stations RF requests can be booked on
+        slot_duration (int, optional): The length of each slot in seconds. Defaults to 15*60. 15 minutes.
+        passes (dict[tuple[uuid.UUID, int], list[tuple[int, int]]] | None, optional): Pass windows by (satellite id, ground station id). Defaults to None.
+        mode (str, optional): "greedy" or "optimal". Defaults to "greedy".
+        min_parallel (int, optional): Schedule in the calling process below this many requests. Defaults to SCHEDULER_PARALLEL_MIN_REQUESTS.
+        setup (int, optional): Seconds a station is held before each booking. Defaults to SCHEDULER_SETUP_SECONDS.
+        teardown (int, optional): Seconds a station is held after each booking. Defaults to SCHEDULER_TEARDOWN_SECONDS.
+
+    Returns:
+        list[Booking]: Bookings of every component, sorted by start time
+    """
+    workers = max(compute_pool.PROPAGATION_WORKERS, 1)
+    components = (
+        conflict_components(requests, stations, slot_duration, passes, setup, teardown)
+        if len(requests) >= min_parallel and workers > 1
+        else []
+    )
+    if len(components) < 2:
+        if mode == "optimal":
+            return schedule_optimal(
+                requests,
+                stations,
+                slot_duration=slot_duration,
+                passes=passes,
+                setup=setup,
+                teardown=teardown,
+            )
+        return schedule_with_slots(
+            requests,
+            stations,
+            slot_duration=slot_duration,
+            passes=passes,
+            setup=setup,
+            teardown=teardown,
+        )
+
+    tasks: list[list[int]] = [[] for _ in range(min(workers, len(components)))]
+    for component in components:
+        min(tasks, key=len).extend(component)
+    logger.info(
+        f"Scheduling {len(requests)} requests in {len(components)} components "
+        f"over {len(tasks)} tasks"
+    )
+
+    all_weights = request_weights(requests)
+    weights = {r.id: w for r, w in zip(requests, all_weights)}
+    station_data = [gs.model_dump() for gs in stations]
+    calls = []
+    for task in sorted(tasks, key=len, reverse=True):
+        chunk = [requests[i] for i in task]
+        satellite_ids = {r.satellite_id for r in chunk if isinstance(r, RFRequest)}
+        calls.append(
+            (
+                [(isinstance(r, RFRequest), r.model_dump()) for r in chunk],
+                station_data,
+                slot_duration,
+                (
+                    None
+                    if passes is None
+                    else {k: v for k, v in passes.items() if k[0] in satellite_ids}
+                ),
+                mode,
+                {r.id: weights[r.id] for r in chunk},
+                setup,
+                teardown,
+            )
+        )
+    results = compute_pool.map_chunks(_schedule_chunk, calls)
+
+    bookings: list[Booking] = []
+    states: dict[uuid.UUID, tuple[bool, int | None]] = {}
+    for args, (chunk_bookings, chunk_states) in zip(calls, results):
+        bookings.extend(chunk_bookings)
+        states.update(
+            (data["id"], state) for (_, data), state in zip(args[0], chunk_states)
+        )
+    for request in requests:
+        request.scheduled, gs_id = states[request.id]
+        if isinstance(request, RFRequest):
+            request.ground_station_id = gs_id
+    bookings.sort(key=lambda b: (to_epoch(b.slot.start_time), b.gs_id))
+    return bookings
@@ -0,0 +1,136 @@
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import contextmanager
+import logging
+import multiprocessing
+import os
+import threading
+from multiprocessing import shared_memory
+from typing import Any, Callable, Iterator, Sequence, TypeVar
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 0 runs the computations in the event loop's default thread pool instead
+PROPAGATION_WORKERS = int(os.getenv("PROPAGATION_WORKERS", str(os.cpu_count() or 1)))
+# number of satellites handed to a worker per task
+PROPAGATION_CHUNK_SIZE = int(os.getenv("PROPAGATION_CHUNK_SIZE", "8"))
+
+T = TypeVar("T")
+
+_executor: ProcessPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ProcessPoolExecutor | None:
+    """Return the process pool used for propagation, starting it on first use
+
+    Workers are spawned rather than forked, so they never inherit the threads and
+    sockets of the API process.
+
+    Returns:
+        ProcessPoolExecutor | None: The pool, or None when PROPAGATION_WORKERS is 0
+    """
+    global _executor
+    if PROPAGATION_WORKERS <= 0:
+        return None
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ProcessPoolExecutor(
+                    max_workers=PROPAGATION_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+                logger.info(
+                    f"Started propagation pool with {PROPAGATION_WORKERS} workers"
+                )
+    return _executor
+
+
+def shutdown_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(cancel_futures=True)
+            _executor = None
+
+
+def chunked(items: Sequence[T], chunk_size: int | None = None) -> Iterator[range]:
+    """Split the indices of items into ranges of at most chunk_size"""
+    size = max(chunk_size or PROPAGATION_CHUNK_SIZE, 1)
+    for start in range(0, len(items), size):
+        yield range(start, min(start + size, len(items)))
+
+
+async def run_chunks(fn: Callable[..., T], calls: list[tuple[Any, ...]]) -> list[T]:
+    """Run fn once per argument tuple on the propagation pool and await every result
+
+    Args:
+        fn (Callable[..., T]): Module level function, so it can be sent to the workers
+        calls (list[tuple[Any, ...]]): Arguments of each call
+
+    Returns:
+        list[T]: The results in the order of calls
+    """
+    loop = asyncio.get_running_loop()
+    executor: Executor | None = get_executor()
+    futures = [loop.run_in_executor(executor, fn, *args) for args in calls]
+    return list(await asyncio.gather(*futures))
+
+
+def map_chunks(fn: Callable[..., T], calls: list[tuple[Any, ...]]) -> list[T]:
+    """Blocking counterpart of run_chunks, for callers outside of the event loop
+
+    Args:
+        fn (Callable[..., T]): Module level function, so it can be sent to the workers
+        calls (list[tuple[Any, ...]]): Arguments of each call
+
+    Returns:
+        list[T]: The results in the order of calls
+    """
+    executor = get_executor()
+    if executor is None:
+        return [fn(*args) for args in calls]
+    futures = [executor.submit(fn, *args) for args in calls]
+    return [future.result() for future in futures]
+
+
+@contextmanager
+def shared_block(nbytes: int) -> Iterator[shared_memory.SharedMemory]:
+    """Allocate a block of shared memory that workers can attach to by name
+
+    The block is released when the context exits, read results out with
+    read_shared_array before that.
+    """
+    shm = shared_memory.SharedMemory(create=True, size=max(nbytes, 1))
+    try:
+        yield shm
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def read_shared_array(
+    shm: shared_memory.SharedMemory, shape: tuple[int, ...], dtype: Any
+) -> np.ndarray:
+    """Copy an array out of a shared memory block"""
+    return np.ndarray(shape, dtype=dtype, buffer=shm.buf).copy()
+
+
+def write_shared_array(
+    name: str,
+    shape: tuple[int, ...],
+    dtype: Any,
+    write: Callable[[np.ndarray], None],
+):
+    """Attach to a shared memory block by name and let write fill the array it holds
+
+    write must not keep a reference to the array, the block is closed once it returns.
+    """
+    # spawned workers share the parent's resource tracker, which keeps tracking the
+    # block until the parent unlinks it
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        write(np.ndarray(shape, dtype=dtype, buffer=shm.buf))
+    finally:
+        shm.close()
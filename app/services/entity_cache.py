@@ -0,0 +1,159 @@
+import logging
+import os
+import pickle
+from typing import Any, Callable, Hashable, TypeVar
+import uuid
+import weakref
+from sqlmodel import Session
+from app.services.lru import BoundedLRU
+
+logger = logging.getLogger(__name__)
+
+ENTITY_CACHE_ENABLED = os.getenv("ENTITY_CACHE_ENABLED", "true").lower() == "true"
+ENTITY_CACHE_SIZE = int(os.getenv("ENTITY_CACHE_SIZE", "1024"))
+# file holding a token that every invalidation replaces, so worker processes
+# pointed at the same file drop their entries when any of them writes
+ENTITY_CACHE_VERSION_FILE = os.getenv("ENTITY_CACHE_VERSION_FILE", "")
+
+T = TypeVar("T")
+
+
+class EntityCache:
+    """Read-through LRU cache of satellites and ground stations
+
+    Entries are pickled snapshots of the loaded rows, keyed by database engine.
+    A hit is merged into the caller's session without loading, so the caller gets
+    attached objects it may change like freshly queried ones, and no query is made.
+
+    Every write to a satellite, ground station or exclusion cone calls invalidate,
+    which bumps the version and drops all entries. A value loaded while the version
+    changed is not stored. With a version file the invalidations of every worker
+    process sharing the file apply to all of them, entries stay per process.
+    """
+
+    def __init__(
+        self,
+        max_size: int = ENTITY_CACHE_SIZE,
+        enabled: bool = ENTITY_CACHE_ENABLED,
+        version_file: str = ENTITY_CACHE_VERSION_FILE,
+    ):
+        self.enabled = enabled
+        self.version_file = version_file
+        self.invalidations = 0
+        self._version = 0
+        self._shared_stamp = self._read_shared_stamp()
+        self._shared_token = self._read_shared_token()
+        # entries are keyed by a token of their engine, so they never keep one alive
+        self._binds: weakref.WeakKeyDictionary[Any, str] = weakref.WeakKeyDictionary()
+        self._entries: BoundedLRU[tuple[str, Hashable], bytes] = BoundedLRU(max_size)
+        self._lock = self._entries.lock
+
+    def _read_shared_token(self) -> str:
+        if not self.version_file:
+            return ""
+        try:
+            with open(self.version_file) as f:
+                return f.read()
+        except FileNotFoundError:
+            return ""
+
+    def _read_shared_stamp(self) -> tuple[int, int] | None:
+        """Inode and modification time of the version file, it is replaced on every write"""
+        if not self.version_file:
+            return None
+        try:
+            stat = os.stat(self.version_file)
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns
+
+    def _sync(self, stamp: tuple[int, int] | None):
+        """Drop the entries if another process invalidated since the last look, under the lock
+
+        The token is only read when the stamp of the version file changed.
+        """
+        if stamp == self._shared_stamp:
+            return
+        self._shared_stamp = stamp
+        token = self._read_shared_token()
+        if token != self._shared_token:
+            self._shared_token = token
+            self._version += 1
+            self._entries.discard_all()
+
+    def load(self, db: Session, key: Hashable, load: Callable[[], T]) -> T:
+        """Return the cached value of key, calling load on a miss
+
+        Args:
+            db (Session): Database session the value is read in, hits are merged into it
+            key (Hashable): Cache key
+            load (Callable[[], T]): Reads the value in db: an entity, or a list of entities
+
+        Returns:
+            T: The value, attached to db
+        """
+        if not self.enabled:
+            return load()
+        stamp = self._read_shared_stamp()
+        with self._lock:
+            self._sync(stamp)
+            entry_key = (self._bind_token(db), key)
+            data = self._entries.get(entry_key)
+            version = self._version
+
+        if data is not None:
+            value: Any = pickle.loads(data)
+            if isinstance(value, list):
+                value = [db.merge(v, load=False) for v in value]
+            elif value is not None:
+                value = db.merge(value, load=False)
+            return value
+
+        loaded = load()
+        # rows changed but not committed in this session must not be shared
+        if not (db.new or db.dirty or db.deleted):
+            data = pickle.dumps(loaded)
+            with self._lock:
+                if version == self._version:
+                    self._entries.put(entry_key, data)
+        return loaded
+
+    def _bind_token(self, db: Session) -> str:
+        """Token of the engine of db, under the lock"""
+        bind = db.get_bind()
+        token = self._binds.get(bind)
+        if token is None:
+            token = self._binds[bind] = uuid.uuid4().hex
+        return token
+
+    def invalidate(self):
+        with self._lock:
+            self._version += 1
+            self.invalidations += 1
+            self._entries.discard_all()
+            if self.version_file:
+                # replaced by a rename so other processes never read half a token
+                self._shared_token = uuid.uuid4().hex
+                tmp_path = f"{self.version_file}.{uuid.uuid4().hex}.tmp"
+                with open(tmp_path, "w") as f:
+                    f.write(self._shared_token)
+                os.replace(tmp_path, self.version_file)
+                self._shared_stamp = self._read_shared_stamp()
+        logger.debug("Invalidated cached satellites and ground stations")
+
+    def clear(self):
+        with self._lock:
+            self._version += 1
+            self._entries.clear()
+            self.invalidations = 0
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            stats: dict[str, Any] = self._entries.stats()
+            lookups = stats["hits"] + stats["misses"]
+            stats["invalidations"] = self.invalidations
+            stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+            return stats
+
+
+entity_cache = EntityCache()
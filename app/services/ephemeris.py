@@ -0,0 +1,169 @@
+import datetime
+import glob
+import logging
+import os
+import tempfile
+import uuid
+import numpy as np
+from app.entities.Satellite import Satellite
+from app.services.lru import BoundedLRU
+from app.services.propagation import as_utc, get_timescale, satellite_itrf, tle_hash
+
+logger = logging.getLogger(__name__)
+
+EPHEMERIS_ENABLED = os.getenv("EPHEMERIS_ENABLED", "true").lower() == "true"
+EPHEMERIS_DIR = os.getenv(
+    "EPHEMERIS_DIR", os.path.join(tempfile.gettempdir(), "starsync-ephemeris")
+)
+EPHEMERIS_STEP_SECONDS = int(os.getenv("EPHEMERIS_STEP_SECONDS", "60"))
+EPHEMERIS_SPAN_DAYS = float(os.getenv("EPHEMERIS_SPAN_DAYS", "14"))
+# number of open ephemeris files kept per process
+EPHEMERIS_CACHE_SIZE = int(os.getenv("EPHEMERIS_CACHE_SIZE", "256"))
+
+_UNIX_EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+def _epoch_seconds(time: datetime.datetime) -> float:
+    return (as_utc(time) - _UNIX_EPOCH).total_seconds()
+
+
+class EphemerisStore:
+    """Precomputed satellite ITRF positions stored as memory-mapped .npy files
+
+    Each TLE gets a file of positions in km, shape [steps, 3], on a grid that starts at
+    the TLE epoch (floored to the step) and covers span_days. Files are named after the
+    satellite id, a hash of the TLE and the grid, so a new TLE gets a new file. They
+    are written to a temporary name and renamed into place, which lets several worker
+    processes share one directory and read the same pages without copies.
+
+    At most max_size files are kept open, least recently used first out. An open file
+    is dropped when its satellite gets a new TLE, and reopened when another process
+    removed or rewrote it.
+    """
+
+    def __init__(
+        self,
+        directory: str = EPHEMERIS_DIR,
+        step_seconds: int = EPHEMERIS_STEP_SECONDS,
+        span_days: float = EPHEMERIS_SPAN_DAYS,
+        max_size: int = EPHEMERIS_CACHE_SIZE,
+    ):
+        self.directory = directory
+        self.step_seconds = step_seconds
+        self.span_days = span_days
+        # open files by path, with the inode and modification time they were opened at
+        self._arrays: BoundedLRU[str, tuple[np.ndarray, tuple[int, int]]] = BoundedLRU(
+            max_size
+        )
+
+    def _grid(self, satellite: Satellite) -> tuple[str, int, int]:
+        """File path, first grid instant (Unix seconds) and number of steps for a satellite"""
+        epoch = satellite.get_sf_sat().epoch.utc_datetime()
+        start = int(_epoch_seconds(epoch)) // self.step_seconds * self.step_seconds
+        count = int(self.span_days * 86400 // self.step_seconds) + 1
+        name = (
+            f"{satellite.id}_{tle_hash(satellite.tle)[:16]}"
+            f"_{start}_{self.step_seconds}_{count}.npy"
+        )
+        return os.path.join(self.directory, name), start, count
+
+    def _generate(self, satellite: Satellite, path: str, start: int, count: int):
+        os.makedirs(self.directory, exist_ok=True)
+        grid_start = datetime.datetime.fromtimestamp(start, datetime.timezone.utc)
+        times = get_timescale().utc(
+            grid_start.year,
+            grid_start.month,
+            grid_start.day,
+            grid_start.hour,
+            grid_start.minute,
+            grid_start.second + np.arange(count) * self.step_seconds,  # type: ignore
+        )
+        positions = satellite_itrf(satellite.get_sf_sat(), times)
+
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        array = np.lib.format.open_memmap(
+            tmp_path, mode="w+", dtype=np.float64, shape=(count, 3)
+        )
+        array[:] = positions.T
+        array.flush()
+        del array
+        os.replace(tmp_path, path)
+        logger.info(f"Generated ephemeris for satellite {satellite.id} in {path}")
+
+    def load(self, satellite: Satellite) -> tuple[int, np.ndarray]:
+        """Open the ephemeris of a satellite, generating it first if needed
+
+        Args:
+            satellite (Satellite): Satellite to open the ephemeris of
+
+        Returns:
+            tuple[int, np.ndarray]: First grid instant in Unix seconds and the read-only positions, shape [steps, 3]
+        """
+        path, start, count = self._grid(satellite)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            self._generate(satellite, path, start, count)
+            stat = os.stat(path)
+        version = (stat.st_ino, stat.st_mtime_ns)
+
+        entry = self._arrays.get(path)
+        if entry is not None and entry[1] == version:
+            return start, entry[0]
+
+        array = np.load(path, mmap_mode="r")
+        # the files of earlier TLEs of the satellite are not read again
+        prefix = os.path.join(self.directory, f"{satellite.id}_")
+        with self._arrays.lock:
+            self._arrays.remove_if(lambda p: p.startswith(prefix))
+            self._arrays.put(path, (array, version))
+        return start, array
+
+    def positions(
+        self,
+        satellite: Satellite,
+        start_time: datetime.datetime,
+        count: int,
+        step_seconds: float,
+    ) -> np.ndarray | None:
+        """Slice the positions of a satellite for a regular time grid
+
+        Args:
+            satellite (Satellite): Satellite to get the positions of
+            start_time (datetime.datetime): First instant of the grid
+            count (int): Number of instants in the grid
+            step_seconds (float): Spacing of the grid in seconds
+
+        Returns:
+            np.ndarray | None: ITRF positions in km, shape [3, count], or None if the grid
+                is not aligned with the stored one or falls outside of it
+        """
+        offset = _epoch_seconds(start_time)
+        stride = step_seconds / self.step_seconds
+        if offset % self.step_seconds != 0 or stride != int(stride) or count <= 0:
+            return None
+
+        # check the span before opening, so grids outside of it never generate a file
+        _, start, steps = self._grid(satellite)
+        first = int(offset - start) // self.step_seconds
+        last = first + (count - 1) * int(stride)
+        if first < 0 or last >= steps:
+            return None
+        _, array = self.load(satellite)
+        return array[first : last + 1 : int(stride)].T
+
+    def invalidate(self, sat_id: uuid.UUID):
+        """Remove every stored ephemeris of a satellite
+
+        Args:
+            sat_id (uuid.UUID): ID of the satellite
+        """
+        self._arrays.remove_if(lambda p: f"{sat_id}_" in p)
+        for path in glob.glob(os.path.join(self.directory, f"{sat_id}_*.npy")):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+ephemeris_store = EphemerisStore()
@@ -0,0 +1,72 @@
+import logging
+import os
+from typing import Any, Hashable
+from app.services.lru import BoundedLRU
+
+logger = logging.getLogger(__name__)
+
+EXCLUSION_CACHE_SIZE = int(os.getenv("EXCLUSION_CACHE_SIZE", "32"))
+
+
+class ExclusionWindowCache:
+    """Bounded LRU cache of evaluated exclusion windows, keyed by horizon
+
+    Every write to an exclusion cone, satellite or ground station calls invalidate,
+    which bumps the version and drops all entries. Callers read the version before
+    loading their inputs and pass it to put, so a result computed from data that was
+    changed in the meantime is never stored.
+    """
+
+    def __init__(self, max_size: int = EXCLUSION_CACHE_SIZE):
+        self._version = 0
+        self._entries: BoundedLRU[Hashable, Any] = BoundedLRU(max_size)
+
+    @property
+    def version(self) -> int:
+        with self._entries.lock:
+            return self._version
+
+    def get(self, key: Hashable) -> Any | None:
+        """Return the cached value for key, or None on a miss
+
+        Args:
+            key (Hashable): Cache key
+
+        Returns:
+            Any | None: The cached value
+        """
+        return self._entries.get(key)
+
+    def put(self, key: Hashable, value: Any, version: int) -> bool:
+        """Store a value computed from the data as of version
+
+        Args:
+            key (Hashable): Cache key
+            value (Any): Value to store
+            version (int): Version read before loading the inputs of value
+
+        Returns:
+            bool: False if the data changed since version and the value was not stored
+        """
+        with self._entries.lock:
+            if version != self._version:
+                return False
+            self._entries.put(key, value)
+            return True
+
+    def invalidate(self):
+        with self._entries.lock:
+            self._version += 1
+            self._entries.discard_all()
+        logger.debug("Invalidated cached exclusion windows")
+
+    def clear(self):
+        with self._entries.lock:
+            self._version += 1
+            self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        return self._entries.stats()
+
+
+exclusion_window_cache = ExclusionWindowCache()
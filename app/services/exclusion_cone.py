@@ -7,6 +7,8 @@ from app.models.exclusion_cone import (
     ExclusionConeUpdateModel,
 )
 from app.entities.ExclusionCone import ExclusionCone
+from app.services.entity_cache import entity_cache
+from app.services.exclusion_cache import exclusion_window_cache
 from app.services.ground_station import GroundStationService
 from app.services.satellite import SatelliteService
 
@@ -25,6 +27,8 @@ class ExclusionConeService:
             db.add(ex_cone)
             db.commit()
             db.refresh(ex_cone)
+            exclusion_window_cache.invalidate()
+            entity_cache.invalidate()
             return ex_cone
 
         except HTTPException as http_e:
@@ -65,6 +69,8 @@ class ExclusionConeService:
 
             db.commit()
             db.refresh(existing_ex_cone)
+            exclusion_window_cache.invalidate()
+            entity_cache.invalidate()
             return existing_ex_cone
 
         except HTTPException as http_e:
@@ -137,6 +143,8 @@ class ExclusionConeService:
                 )
             db.delete(exclusion_cone)
             db.commit()
+            exclusion_window_cache.invalidate()
+            entity_cache.invalidate()
             return exclusion_cone
 
         except HTTPException as http_e:
@@ -0,0 +1,247 @@
+from collections import defaultdict
+from dataclasses import dataclass
+import datetime
+import logging
+import uuid
+import numpy as np
+from fastapi import HTTPException
+from sqlalchemy.exc import SQLAlchemyError
+from sqlmodel import Session
+from app.entities.ExclusionCone import ExclusionCone
+from app.entities.GroundStation import GroundStation
+from app.entities.Satellite import Satellite
+from app.models.exclusion_cone import (
+    EXCLUSION_WINDOWS_MAX_CELLS,
+    ExclusionWindowsRequestModel,
+)
+from app.services.ephemeris import EphemerisStore, EPHEMERIS_ENABLED, ephemeris_store
+from app.services.exclusion_cache import exclusion_window_cache
+from app.services.exclusion_cone import ExclusionConeService
+from app.services.geometry import station_frames, time_grid
+from app.services.passes import load_network
+from app.services.propagation import as_utc, satellite_itrf
+from app.services.request import get_excl_times_array
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ExclusionWindow:
+    """Interval during which an exclusion cone forbids contact, both ends inclusive"""
+
+    cone_id: uuid.UUID
+    satellite_id: uuid.UUID
+    gs_id: int
+    interfering_satellite_id: uuid.UUID
+    start: datetime.datetime
+    end: datetime.datetime
+
+
+def normalize_satellite_name(name: str) -> str:
+    return " ".join(name.split()).casefold()
+
+
+def satellite_name_index(satellites: list[Satellite]) -> dict[str, Satellite]:
+    """Index satellites by normalized name, to resolve ExclusionCone.interfering_satellite
+
+    Names are compared ignoring case and repeated whitespace. If several satellites
+    share a name the first one wins.
+
+    Args:
+        satellites (list[Satellite]): Satellites to index
+
+    Returns:
+        dict[str, Satellite]: Satellites by normalized name
+    """
+    index: dict[str, Satellite] = {}
+    for sat in satellites:
+        index.setdefault(normalize_satellite_name(sat.name), sat)
+    return index
+
+
+def evaluate_exclusion_cones(
+    cones: list[ExclusionCone],
+    satellites: list[Satellite],
+    stations: list[GroundStation],
+    start_time: datetime.datetime,
+    end_time: datetime.datetime,
+    step_seconds: float = 60,
+    ephemeris: EphemerisStore | None = None,
+) -> list[ExclusionWindow]:
+    """Evaluate every exclusion cone over a horizon in one batched pass
+
+    Each satellite is propagated once over the time grid (or sliced out of the
+    ephemeris store) and each station frame is computed once. Cones are grouped by
+    (ground station, satellite) so the line of sight of the protected satellite is
+    shared by all cones of the group, and cones with the same interfering satellite
+    share the separation series. As with angle_diff, an instant is only excluded
+    while both satellites are above the horizon.
+
+    Cones whose satellite, station or interfering satellite cannot be resolved are
+    skipped with a warning.
+
+    Args:
+        cones (list[ExclusionCone]): Exclusion cones to evaluate
+        satellites (list[Satellite]): Satellites the cones refer to, by id or by name
+        stations (list[GroundStation]): Ground stations the cones refer to
+        start_time (datetime.datetime): Start of the horizon
+        end_time (datetime.datetime): End of the horizon, not included
+        step_seconds (float, optional): Spacing of the evaluation grid in seconds. Defaults to 60.
+        ephemeris (EphemerisStore | None, optional): Store of precomputed positions. Defaults to None.
+
+    Returns:
+        list[ExclusionWindow]: Exclusion windows sorted by start time
+    """
+    times = time_grid(start_time, end_time, step_seconds)
+    count = len(times)
+    if count == 0 or not cones:
+        return []
+
+    sats_by_id = {sat.id: sat for sat in satellites}
+    sats_by_name = satellite_name_index(satellites)
+    stations_by_id = {gs.id: gs for gs in stations}
+
+    positions: dict[uuid.UUID, np.ndarray] = {}
+
+    def sat_positions(sat: Satellite) -> np.ndarray:
+        if sat.id not in positions:
+            cached = None
+            if ephemeris is not None:
+                cached = ephemeris.positions(sat, start_time, count, step_seconds)
+            positions[sat.id] = (
+                cached
+                if cached is not None
+                else satellite_itrf(sat.get_sf_sat(), times)
+            )
+        return positions[sat.id]
+
+    groups: dict[tuple[int, uuid.UUID], list[ExclusionCone]] = defaultdict(list)
+    for cone in cones:
+        groups[(cone.gs_id, cone.satellite_id)].append(cone)
+
+    sample_index = np.arange(count)
+    start_time = as_utc(start_time)
+    windows: list[ExclusionWindow] = []
+
+    for (gs_id, sat_id), group in groups.items():
+        gs = stations_by_id.get(gs_id)
+        sat = sats_by_id.get(sat_id)
+        if gs is None or sat is None:
+            logger.warning(
+                f"Skipping exclusion cones {[str(c.id) for c in group]}: "
+                f"unknown satellite {sat_id} or ground station {gs_id}"
+            )
+            continue
+
+        gs_position, gs_zenith = station_frames([gs])
+
+        def line_of_sight(target: Satellite) -> tuple[np.ndarray, np.ndarray]:
+            # unit vectors from the station, shape [3, times], and above-horizon mask
+            los = sat_positions(target) - gs_position[0][:, np.newaxis]
+            unit = los / np.linalg.norm(los, axis=0)
+            return unit, gs_zenith[0] @ unit > 0
+
+        sat_los, sat_visible = line_of_sight(sat)
+
+        by_interferer: dict[uuid.UUID, list[ExclusionCone]] = defaultdict(list)
+        interferers: dict[uuid.UUID, Satellite] = {}
+        for cone in group:
+            other = sats_by_name.get(
+                normalize_satellite_name(cone.interfering_satellite)
+            )
+            if other is None:
+                logger.warning(
+                    f"Skipping exclusion cone {cone.id}: unknown interfering "
+                    f"satellite {cone.interfering_satellite!r}"
+                )
+                continue
+            by_interferer[other.id].append(cone)
+            interferers[other.id] = other
+
+        for other_id, other_cones in by_interferer.items():
+            other_los, other_visible = line_of_sight(interferers[other_id])
+
+            cos_separation = np.clip(np.einsum("kt,kt->t", sat_los, other_los), -1, 1)
+            separation = np.degrees(np.arccos(cos_separation))
+            separation[~(sat_visible & other_visible)] = np.nan
+
+            for cone in other_cones:
+                starts, ends = get_excl_times_array(
+                    sample_index, separation, cone.angle_limit
+                )
+                for first, last in zip(starts.tolist(), ends.tolist()):
+                    windows.append(
+                        ExclusionWindow(
+                            cone_id=cone.id,
+                            satellite_id=sat_id,
+                            gs_id=gs_id,
+                            interfering_satellite_id=other_id,
+                            start=start_time
+                            + datetime.timedelta(seconds=first * step_seconds),
+                            end=start_time
+                            + datetime.timedelta(seconds=last * step_seconds),
+                        )
+                    )
+
+    windows.sort(key=lambda w: w.start)
+    return windows
+
+
+class ExclusionEvaluatorService:
+    @staticmethod
+    def get_exclusion_windows(
+        db: Session, request: ExclusionWindowsRequestModel
+    ) -> list[ExclusionWindow]:
+        try:
+            if request.start >= request.end:
+                raise HTTPException(
+                    status_code=400,
+                    detail="Start time must be before end time",
+                )
+
+            key = (as_utc(request.start), as_utc(request.end), request.step_seconds)
+            windows = exclusion_window_cache.get(key)
+            if windows is None:
+                version = exclusion_window_cache.version
+                cones = ExclusionConeService.get_exclusion_cones(db)
+                cells = len(cones) * request.steps()
+                if cells > EXCLUSION_WINDOWS_MAX_CELLS:
+                    raise HTTPException(
+                        status_code=422,
+                        detail=f"Evaluation would cover {cells} cone steps, "
+                        f"at most {EXCLUSION_WINDOWS_MAX_CELLS} are allowed",
+                    )
+                satellites, stations = load_network(db)
+                windows = evaluate_exclusion_cones(
+                    cones,
+                    satellites,
+                    stations,
+                    request.start,
+                    request.end,
+                    request.step_seconds,
+                    ephemeris=ephemeris_store if EPHEMERIS_ENABLED else None,
+                )
+                exclusion_window_cache.put(key, windows, version)
+
+            if request.satellite_ids is not None:
+                windows = [
+                    w for w in windows if w.satellite_id in request.satellite_ids
+                ]
+            if request.station_ids is not None:
+                windows = [w for w in windows if w.gs_id in request.station_ids]
+            return windows
+
+        except HTTPException:
+            raise
+        except SQLAlchemyError as e:
+            logger.error(f"Error evaluating exclusion cones: {str(e)}")
+            raise HTTPException(
+                status_code=503,
+                detail=f"Database error while evaluating exclusion cones: {str(e)}",
+            )
+        except Exception as e:
+            logger.error(f"Error evaluating exclusion cones: {str(e)}")
+            raise HTTPException(
+                status_code=500,
+                detail=f"Error evaluating exclusion cones: {str(e)}",
+            )
@@ -0,0 +1,57 @@
+import datetime
+import numpy as np
+from skyfield.api import Time, wgs84
+from app.entities.GroundStation import GroundStation
+from app.services.propagation import as_utc, get_timescale
+
+
+def time_grid(
+    start_time: datetime.datetime,
+    end_time: datetime.datetime,
+    step_seconds: float = 60,
+) -> Time:
+    """Build a Skyfield Time array from start_time (inclusive) to end_time (exclusive)
+
+    Args:
+        start_time (datetime.datetime): First instant of the grid
+        end_time (datetime.datetime): End of the grid, not included
+        step_seconds (float, optional): Spacing of the grid in seconds. Defaults to 60.
+
+    Returns:
+        Time: Time array with one entry per step
+    """
+    start_time = as_utc(start_time)
+    count = max(int((as_utc(end_time) - start_time).total_seconds() // step_seconds), 0)
+    return get_timescale().utc(
+        start_time.year,
+        start_time.month,
+        start_time.day,
+        start_time.hour,
+        start_time.minute,
+        start_time.second
+        + start_time.microsecond / 1e6
+        + np.arange(count) * step_seconds,  # type: ignore
+    )
+
+
+def station_frames(stations: list[GroundStation]) -> tuple[np.ndarray, np.ndarray]:
+    """Get the ITRF position and local zenith of every ground station
+
+    Args:
+        stations (list[GroundStation]): Ground stations
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: Positions in km and unit zenith vectors, both of shape [stations, 3]
+    """
+    positions = np.empty((len(stations), 3))
+    zeniths = np.empty((len(stations), 3))
+    for i, gs in enumerate(stations):
+        positions[i] = wgs84.latlon(gs.lat, gs.lon, gs.height).itrs_xyz.km
+        lat = np.radians(gs.lat)
+        lon = np.radians(gs.lon)
+        zeniths[i] = (
+            np.cos(lat) * np.cos(lon),
+            np.cos(lat) * np.sin(lon),
+            np.sin(lat),
+        )
+    return positions, zeniths
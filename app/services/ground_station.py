@@ -1,12 +1,15 @@
 from fastapi import HTTPException
 from sqlalchemy.exc import SQLAlchemyError
-from sqlmodel import select, Session
+from sqlmodel import col, select, Session
 from app.entities.ExclusionCone import ExclusionCone
 from app.models.ground_station import (
     GroundStationCreateModel,
     GroundStationUpdateModel,
 )
 from app.entities.GroundStation import GroundStation
+from app.services.entity_cache import entity_cache
+from app.services.exclusion_cache import exclusion_window_cache
+from app.services.pagination import after_key, decode_cursor
 
 
 class GroundStationService:
@@ -21,6 +24,8 @@ class GroundStationService:
             db.add(gs)
             db.commit()
             db.refresh(gs)
+            exclusion_window_cache.invalidate()
+            entity_cache.invalidate()
             return gs
 
         except SQLAlchemyError as e:
@@ -55,7 +60,8 @@ class GroundStationService:
 
             db.commit()
             db.refresh(existing_gs)
-            print(existing_gs)
+            exclusion_window_cache.invalidate()
+            entity_cache.invalidate()
             return existing_gs
 
         except HTTPException as http_e:
@@ -73,14 +79,41 @@ class GroundStationService:
             )
 
     @staticmethod
-    def get_ground_stations(db: Session) -> list[GroundStation]:
+    def get_ground_stations(
+        db: Session, limit: int | None = None, cursor: str | None = None
+    ) -> list[GroundStation]:
+        """Get the ground stations ordered by id, optionally one page at a time
+
+        The full list is read through the entity cache.
+
+        Args:
+            db (Session): Database session
+            limit (int | None, optional): Number of ground stations to return. Defaults to None, all of them.
+            cursor (str | None, optional): Cursor of the last ground station of the previous page, see encode_cursor. Defaults to None.
+
+        Returns:
+            list[GroundStation]: The ground stations
+        """
         # TODO: Before we service the request in the future we must first validate that request is legitimate (token validation)
         # TODO: Check user permissions to return ground station
         try:
-            statement = select(GroundStation)
+            statement = select(GroundStation).order_by(col(GroundStation.id))
+            if cursor is not None:
+                statement = statement.where(
+                    after_key([col(GroundStation.id)], decode_cursor(cursor, int))
+                )
+            if limit is not None:
+                statement = statement.limit(limit)
+            if limit is None and cursor is None:
+                return entity_cache.load(
+                    db, ("ground_stations",), lambda: list(db.exec(statement).all())
+                )
             ground_stations = db.exec(statement).all()
             return list(ground_stations)
 
+        except HTTPException as http_e:
+            raise http_e
+
         except SQLAlchemyError as e:
             raise HTTPException(
                 status_code=503,
@@ -98,7 +131,9 @@ class GroundStationService:
         # TODO: Check user permissions to return ground station
         try:
             statement = select(GroundStation).where(GroundStation.id == gs_id)
-            ground_station = db.exec(statement).first()
+            ground_station = entity_cache.load(
+                db, ("ground_station", gs_id), lambda: db.exec(statement).first()
+            )
 
             if ground_station is None:
                 raise HTTPException(
@@ -142,6 +177,8 @@ class GroundStationService:
 
             db.delete(ground_station)
             db.commit()
+            exclusion_window_cache.invalidate()
+            entity_cache.invalidate()
             return ground_station
 
         except HTTPException as http_e:
@@ -0,0 +1,278 @@
+from collections import Counter, defaultdict
+import logging
+import math
+import os
+import random
+import time
+import uuid
+from app.entities.GroundStation import GroundStation
+from app.entities.Request import RFRequest
+from app.services.occupancy import OccupancyIndex
+from app.services.optimizer import (
+    Candidate,
+    book_candidates,
+    candidate_intervals,
+    request_weights,
+    requested_time,
+)
+from app.services.request import (
+    SCHEDULER_SETUP_SECONDS,
+    SCHEDULER_TEARDOWN_SECONDS,
+    Booking,
+    Request,
+)
+from app.services.timeline import Occupancy, create_occupancy, to_epoch
+
+logger = logging.getLogger(__name__)
+
+# upper bound on the budget a caller can ask for
+SCHEDULER_MAX_IMPROVE_MS = int(os.getenv("SCHEDULER_MAX_IMPROVE_MS", "10000"))
+
+# cost of a booked second, so time beyond what a request needs is given up
+_SURPLUS_COST = 1e-3
+# starting temperature, as a fraction of the value of the average candidate
+_INITIAL_TEMPERATURE = 0.1
+
+
+class _Schedule:
+    """Set of booked candidates with the per request totals the objective needs"""
+
+    def __init__(
+        self,
+        requests: list[Request],
+        candidates: list[Candidate],
+        weights: list[float],
+        setup: int = 0,
+        teardown: int = 0,
+    ) -> None:
+        self.requests = requests
+        self.candidates = candidates
+        self.weights = weights
+        self.demand = [requested_time(r) for r in requests]
+        self.min_passes = [
+            r.min_passes if isinstance(r, RFRequest) else 0 for r in requests
+        ]
+        self.chosen: set[int] = set()
+        # station time, held for the margins around each booking
+        self.setup = setup
+        self.teardown = teardown
+        self.stations = OccupancyIndex()
+        # time of each RF request, keyed by request index, as a satellite is in
+        # contact with one station at a time
+        self.satellites = OccupancyIndex()
+        self.is_rf = [isinstance(r, RFRequest) for r in requests]
+        self.booked = [0] * len(requests)
+        self.passes: list[Counter[tuple[int, int]]] = [Counter() for _ in requests]
+        self.value = 0.0
+
+    def request_value(self, r: int, booked: int, passes: int) -> float:
+        if passes < self.min_passes[r]:
+            return -_SURPLUS_COST * booked
+        return self.weights[r] * min(booked, self.demand[r]) - _SURPLUS_COST * booked
+
+    def conflicts(self, k: int) -> set[int]:
+        """Booked candidates that have to go for k to be booked"""
+        candidate = self.candidates[k]
+        clashing = set(
+            self.stations.station(candidate.gs_id).overlapping(
+                candidate.start - self.setup, candidate.end + self.teardown
+            )
+        )
+        if self.is_rf[candidate.request]:
+            clashing.update(
+                self.satellites.station(candidate.request).overlapping(
+                    candidate.start, candidate.end
+                )
+            )
+        clashing.discard(k)
+        return clashing
+
+    def delta(self, add: list[int], remove: set[int]) -> float:
+        """Change of value if add were booked and remove released"""
+        booked: dict[int, int] = {}
+        passes: dict[int, Counter[tuple[int, int]]] = {}
+        for k, sign in [(k, -1) for k in remove] + [(k, 1) for k in add]:
+            candidate = self.candidates[k]
+            r = candidate.request
+            if r not in booked:
+                booked[r] = self.booked[r]
+                passes[r] = Counter(self.passes[r])
+            booked[r] += sign * (candidate.end - candidate.start)
+            passes[r][candidate.pass_key] += sign
+
+        return sum(
+            self.request_value(r, booked[r], sum(1 for n in passes[r].values() if n))
+            - self.request_value(
+                r,
+                self.booked[r],
+                sum(1 for n in self.passes[r].values() if n),
+            )
+            for r in booked
+        )
+
+    def add(self, k: int):
+        candidate = self.candidates[k]
+        self.stations.book(
+            candidate.gs_id,
+            candidate.start - self.setup,
+            candidate.end + self.teardown,
+            k,
+        )
+        if self.is_rf[candidate.request]:
+            self.satellites.book(candidate.request, candidate.start, candidate.end, k)
+        self.booked[candidate.request] += candidate.end - candidate.start
+        self.passes[candidate.request][candidate.pass_key] += 1
+        self.chosen.add(k)
+
+    def remove(self, k: int):
+        candidate = self.candidates[k]
+        self.stations.release(
+            candidate.gs_id, candidate.start - self.setup, candidate.end + self.teardown
+        )
+        if self.is_rf[candidate.request]:
+            self.satellites.release(candidate.request, candidate.start, candidate.end)
+        self.booked[candidate.request] -= candidate.end - candidate.start
+        self.passes[candidate.request][candidate.pass_key] -= 1
+        self.chosen.discard(k)
+
+    def apply(self, add: list[int], remove: set[int], delta: float):
+        for k in remove:
+            self.remove(k)
+        for k in add:
+            self.add(k)
+        self.value += delta
+
+
+def improve_schedule(
+    requests: list[Request],
+    stations: list[GroundStation],
+    bookings: list[Booking],
+    budget_ms: int,
+    occupancy: Occupancy | None = None,
+    slot_duration: int = 15 * 60,
+    passes: dict[tuple[uuid.UUID, int], list[tuple[int, int]]] | None = None,
+    seed: int | None = None,
+    setup: int = SCHEDULER_SETUP_SECONDS,
+    teardown: int = SCHEDULER_TEARDOWN_SECONDS,
+) -> list[Booking]:
+    """Improve a schedule with simulated annealing until the time budget runs out
+
+    The search starts from bookings and works on the candidate intervals of
+    schedule_optimal, maximizing the same weighted satisfied time. Each step tries
+    one of three moves, releasing whatever the new booking overlaps:
+
+    - insert: book a candidate that is not booked yet
+    - shift: move a booking of a request to another slot or ground station
+    - remove: release a booking
+
+    Moves that lower the value are accepted with a probability that goes down as the
+    budget is used up. The best schedule seen is returned, so stopping at any time
+    gives a schedule at least as good as bookings.
+
+    Args:
+        requests (list[Request]): Requests that were scheduled
+        stations (list[GroundStation]): Ground stations RF requests can be booked on
+        bookings (list[Booking]): Bookings to start from, e.g. from schedule_with_slots
+        budget_ms (int): Wall clock budget in milliseconds
+        occupancy (Occupancy | None, optional): Bookings to keep that are not part of bookings. Defaults to None.
+        slot_duration (int, optional): The length of each slot in seconds. Defaults to 15*60. 15 minutes.
+        passes (dict[tuple[uuid.UUID, int], list[tuple[int, int]]] | None, optional): Pass windows by (satellite id, ground station id), see pass_windows. Defaults to None.
+        seed (int | None, optional): Seed of the random moves. Defaults to None.
+        setup (int, optional): Seconds a station is held before each booking. Defaults to SCHEDULER_SETUP_SECONDS.
+        teardown (int, optional): Seconds a station is held after each booking. Defaults to SCHEDULER_TEARDOWN_SECONDS.
+
+    Returns:
+        list[Booking]: The best bookings found
+    """
+    deadline = time.perf_counter() + budget_ms / 1000
+    if budget_ms <= 0 or not requests:
+        return bookings
+    if occupancy is None:
+        occupancy = create_occupancy(
+            min(to_epoch(r.start_time) for r in requests) - setup,
+            max(to_epoch(r.end_time) for r in requests) + slot_duration + teardown,
+        )
+
+    candidates = candidate_intervals(
+        requests, stations, occupancy, slot_duration, passes, setup, teardown
+    )
+    pool = len(candidates)
+    if pool == 0:
+        return bookings
+
+    # the starting bookings are exact intervals, which may be shorter than slots
+    index = {r.id: i for i, r in enumerate(requests)}
+    by_slot = {(c.request, c.gs_id, c.slot): c for c in candidates}
+    existing: dict[tuple[int, int, int], Booking] = {}
+    schedule = _Schedule(
+        requests, candidates, request_weights(requests), setup, teardown
+    )
+    for booking in bookings:
+        r = index[booking.request_id]
+        start, end = to_epoch(booking.slot.start_time), to_epoch(booking.slot.end_time)
+        slot = (start - to_epoch(requests[r].start_time)) // slot_duration
+        match = by_slot.get((r, booking.gs_id, slot))
+        pass_key = match.pass_key if match is not None else (booking.gs_id, slot)
+        candidates.append(Candidate(r, booking.gs_id, start, end, slot, pass_key))
+        existing[(booking.gs_id, start, end)] = booking
+        k = len(candidates) - 1
+        delta = schedule.delta([k], set())
+        schedule.apply([k], set(), delta)
+
+    by_request: dict[int, list[int]] = defaultdict(list)
+    for k in range(pool):
+        by_request[candidates[k].request].append(k)
+
+    rng = random.Random(seed)
+    initial = best = schedule.value
+    best_chosen = set(schedule.chosen)
+    mean_value = (
+        sum(schedule.weights[c.request] * (c.end - c.start) for c in candidates[:pool])
+        / pool
+    )
+    moves = 0
+    start_time = time.perf_counter()
+    while (now := time.perf_counter()) < deadline:
+        moves += 1
+        move = rng.random()
+        add: list[int] = []
+        remove: set[int] = set()
+        if move < 0.6 or not schedule.chosen:
+            k = rng.randrange(pool)
+            if k in schedule.chosen:
+                continue
+            add, remove = [k], schedule.conflicts(k)
+        else:
+            booked = rng.choice(tuple(schedule.chosen))
+            if move < 0.9:
+                k = rng.choice(by_request[candidates[booked].request])
+                if k in schedule.chosen:
+                    continue
+                add, remove = [k], schedule.conflicts(k) | {booked}
+            else:
+                remove = {booked}
+
+        delta = schedule.delta(add, remove)
+        progress = (now - start_time) / (deadline - start_time)
+        temperature = _INITIAL_TEMPERATURE * mean_value * (1 - progress)
+        if delta >= 0 or (
+            temperature > 0 and rng.random() < math.exp(delta / temperature)
+        ):
+            schedule.apply(add, remove, delta)
+            if schedule.value > best + 1e-9:
+                best = schedule.value
+                best_chosen = set(schedule.chosen)
+
+    logger.info(
+        f"Local search tried {moves} moves in {budget_ms} ms, value {initial:.0f} -> {best:.0f}"
+    )
+    for request in requests:
+        request.scheduled = False
+    return book_candidates(
+        requests,
+        [candidates[k] for k in best_chosen],
+        occupancy,
+        existing,
+        setup,
+        teardown,
+    )
@@ -0,0 +1,83 @@
+from collections import OrderedDict
+import threading
+from typing import Callable, Generic, Hashable, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class BoundedLRU(Generic[K, V]):
+    """Thread-safe mapping that keeps its max_size most recently used entries
+
+    Counts hits, misses and evictions for the stats of the caches built on it.
+    Callers that need several operations to happen atomically, such as a version
+    check before put, hold lock around them; it is reentrant.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.RLock()
+        self._entries: OrderedDict[K, V] = OrderedDict()
+
+    def __len__(self) -> int:
+        with self.lock:
+            return len(self._entries)
+
+    def get(self, key: K) -> V | None:
+        """Return the value of key and mark it as recently used, None on a miss"""
+        with self.lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: K, value: V):
+        """Store a value, evicting the least recently used entries beyond max_size"""
+        with self.lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key: K) -> V | None:
+        """Remove key, returning its value or None if it was not stored"""
+        with self.lock:
+            return self._entries.pop(key, None)
+
+    def remove_if(self, predicate: Callable[[K], bool]) -> int:
+        """Remove every entry whose key matches predicate, returning how many"""
+        with self.lock:
+            keys = [key for key in self._entries if predicate(key)]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+
+    def discard_all(self):
+        """Remove every entry, keeping the counts"""
+        with self.lock:
+            self._entries.clear()
+
+    def clear(self):
+        """Remove every entry and reset the counts"""
+        with self.lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def stats(self) -> dict[str, int]:
+        with self.lock:
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
@@ -0,0 +1,160 @@
+from bisect import bisect_right
+from collections import defaultdict
+from typing import Any, Iterator
+
+
+class StationOccupancy:
+    """Busy intervals of one ground station, kept sorted in parallel arrays
+
+    Intervals are half-open [start, end) in Unix seconds and never overlap, so both
+    the starts and the ends are sorted and overlap queries are a single bisection.
+    Insertion is a bisection plus a list insert, which only moves pointers.
+    """
+
+    def __init__(self) -> None:
+        self._starts: list[float] = []
+        self._ends: list[float] = []
+        self._items: list[Any] = []
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def __iter__(self) -> Iterator[tuple[float, float, Any]]:
+        return iter(zip(self._starts, self._ends, self._items))
+
+    def copy(self) -> "StationOccupancy":
+        """Copy of the intervals, sharing their items"""
+        other = StationOccupancy()
+        other._starts = self._starts.copy()
+        other._ends = self._ends.copy()
+        other._items = self._items.copy()
+        return other
+
+    def _first_ending_after(self, start: float) -> int:
+        return bisect_right(self._ends, start)
+
+    def overlapping(self, start: float, end: float) -> list[Any]:
+        """Get the items of the intervals that overlap [start, end)
+
+        Args:
+            start (float): Start of the queried interval in Unix seconds
+            end (float): End of the queried interval in Unix seconds
+
+        Returns:
+            list[Any]: Items of the overlapping intervals, in time order
+        """
+        items = []
+        i = self._first_ending_after(start)
+        while i < len(self._starts) and self._starts[i] < end:
+            items.append(self._items[i])
+            i += 1
+        return items
+
+    def is_free(self, start: float, end: float) -> bool:
+        """Check that no interval overlaps [start, end)
+
+        Args:
+            start (float): Start of the queried interval in Unix seconds
+            end (float): End of the queried interval in Unix seconds
+
+        Returns:
+            bool: True if the station is free for the whole interval
+        """
+        i = self._first_ending_after(start)
+        return i == len(self._starts) or self._starts[i] >= end
+
+    def find_gap(self, start: float, end: float, duration: float) -> float | None:
+        """Find the earliest free interval of a given length within [start, end)
+
+        The search starts at the first interval ending after start and jumps from
+        one busy interval to the next, so it costs a bisection plus the number of
+        busy intervals it has to skip.
+
+        Args:
+            start (float): Earliest start of the gap in Unix seconds
+            end (float): Latest end of the gap in Unix seconds
+            duration (float): Length of the gap in seconds
+
+        Returns:
+            float | None: Start of the gap, None if there is no such gap
+        """
+        t = start
+        i = self._first_ending_after(t)
+        while t + duration <= end:
+            if i == len(self._starts) or self._starts[i] >= t + duration:
+                return t
+            t = max(t, self._ends[i])
+            i += 1
+        return None
+
+    def add(self, start: float, end: float, item: Any = None):
+        """Mark [start, end) as busy
+
+        Args:
+            start (float): Start of the interval in Unix seconds
+            end (float): End of the interval in Unix seconds
+            item (Any, optional): Value attached to the interval, e.g. a booking. Defaults to None.
+
+        Raises:
+            ValueError: If the interval is empty or overlaps a busy interval
+        """
+        if end <= start:
+            raise ValueError(f"Interval [{start}, {end}) is empty")
+        i = self._first_ending_after(start)
+        if i < len(self._starts) and self._starts[i] < end:
+            raise ValueError(f"Interval [{start}, {end}) overlaps a busy interval")
+        self._starts.insert(i, start)
+        self._ends.insert(i, end)
+        self._items.insert(i, item)
+
+    def remove(self, start: float, end: float) -> Any:
+        """Free the busy interval [start, end)
+
+        Args:
+            start (float): Start of the interval in Unix seconds
+            end (float): End of the interval in Unix seconds
+
+        Raises:
+            KeyError: If there is no such busy interval
+
+        Returns:
+            Any: The item attached to the interval
+        """
+        i = self._first_ending_after(start)
+        if i < len(self._starts) and (self._starts[i], self._ends[i]) == (start, end):
+            del self._starts[i]
+            del self._ends[i]
+            return self._items.pop(i)
+        raise KeyError(f"No busy interval [{start}, {end})")
+
+
+class OccupancyIndex:
+    """Occupancy of every ground station, keyed by ground station id"""
+
+    def __init__(self) -> None:
+        self._stations: defaultdict[int, StationOccupancy] = defaultdict(
+            StationOccupancy
+        )
+
+    def copy(self) -> "OccupancyIndex":
+        other = OccupancyIndex()
+        for gs_id, station in self._stations.items():
+            other._stations[gs_id] = station.copy()
+        return other
+
+    def station(self, gs_id: int) -> StationOccupancy:
+        return self._stations[gs_id]
+
+    def is_free(self, gs_id: int, start: float, end: float) -> bool:
+        return self._stations[gs_id].is_free(start, end)
+
+    def find_gap(
+        self, gs_id: int, start: float, end: float, duration: float
+    ) -> float | None:
+        return self._stations[gs_id].find_gap(start, end, duration)
+
+    def book(self, gs_id: int, start: float, end: float, item: Any = None):
+        self._stations[gs_id].add(start, end, item)
+
+    def release(self, gs_id: int, start: float, end: float) -> Any:
+        return self._stations[gs_id].remove(start, end)
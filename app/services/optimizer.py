@@ -0,0 +1,512 @@
+from bisect import bisect_right
+from collections import defaultdict
+from dataclasses import dataclass
+import logging
+import os
+import uuid
+import numpy as np
+from scipy.optimize import Bounds, LinearConstraint, milp
+from scipy.sparse import coo_matrix
+from app.entities.GroundStation import GroundStation
+from app.entities.Request import ContactRequest, RFRequest
+from app.services.passes import visible_window
+from app.services.request import (
+    SCHEDULER_SETUP_SECONDS,
+    SCHEDULER_TEARDOWN_SECONDS,
+    Booking,
+    Request,
+    Slot,
+    schedule_with_slots,
+)
+from app.services.timeline import (
+    Occupancy,
+    create_occupancy,
+    from_epoch,
+    slot_starts,
+    to_epoch,
+)
+
+logger = logging.getLogger(__name__)
+
+# "greedy" for schedule_with_slots, "optimal" for schedule_optimal
+SCHEDULER_MODE = os.getenv("SCHEDULER_MODE", "greedy")
+# wall time HiGHS may spend before returning the best schedule found so far
+SCHEDULER_TIME_LIMIT_SECONDS = float(os.getenv("SCHEDULER_TIME_LIMIT_SECONDS", "10"))
+
+# cost of a booked second, so time beyond what a request needs is never booked
+_SURPLUS_COST = 1e-3
+
+
+@dataclass(frozen=True)
+class Candidate:
+    """Interval a request could be booked on, one binary variable of the program"""
+
+    # index of the request in the scheduled list
+    request: int
+    gs_id: int
+    start: int
+    end: int
+    # index of the slot within the request window, negative for greedy bookings
+    slot: int
+    # the pass the interval falls in, counted towards min_passes
+    pass_key: tuple[int, int]
+
+
+def requested_time(request: Request) -> int:
+    if isinstance(request, ContactRequest):
+        return request.duration
+    return max(
+        request.uplink_time_requested,
+        request.downlink_time_requested,
+        request.science_time_requested,
+    )
+
+
+def request_weights(requests: list[Request]) -> list[float]:
+    """Value of one second of satisfied time for each request
+
+    The priority scales the weight. RF requests add their get_priority_weight
+    relative to the largest one, so between two requests of the same priority the
+    one with the higher weight wins. Contacts are tied to a pass of their own
+    station and rank with the highest RF weight.
+
+    Args:
+        requests (list[Request]): Requests to weigh
+
+    Returns:
+        list[float]: Weights, at least 1, in the order of requests
+    """
+    rf_weights = {
+        i: max(r.get_priority_weight(), 0.0)
+        for i, r in enumerate(requests)
+        if isinstance(r, RFRequest)
+    }
+    largest = max(rf_weights.values(), default=0.0)
+    weights = []
+    for i, request in enumerate(requests):
+        share = rf_weights[i] / largest if i in rf_weights and largest > 0 else 1.0
+        weights.append(max(request.priority, 1) * (1 + share))
+    return weights
+
+
+def candidate_intervals(
+    requests: list[Request],
+    stations: list[GroundStation],
+    occupancy: Occupancy,
+    slot_duration: int = 15 * 60,
+    passes: dict[tuple[uuid.UUID, int], list[tuple[int, int]]] | None = None,
+    setup: int = 0,
+    teardown: int = 0,
+) -> list[Candidate]:
+    """Discretize every request window into the intervals it could be booked on
+
+    Contacts get the slots of their window on their own station. RF requests get
+    every slot on every station, clipped to the pass it overlaps when pass windows
+    are given. Intervals that are not free in occupancy, together with their setup
+    and teardown margins, are left out.
+
+    Args:
+        requests (list[Request]): Requests to schedule
+        stations (list[GroundStation]): Ground stations RF requests can be booked on
+        occupancy (Occupancy): Bookings that have to be kept
+        slot_duration (int, optional): The length of each slot in seconds. Defaults to 15*60. 15 minutes.
+        passes (dict[tuple[uuid.UUID, int], list[tuple[int, int]]] | None, optional): Pass windows by (satellite id, ground station id). Defaults to None.
+        setup (int, optional): Seconds a station is held before each booking. Defaults to 0.
+        teardown (int, optional): Seconds a station is held after each booking. Defaults to 0.
+
+    Returns:
+        list[Candidate]: Candidate intervals
+    """
+    candidates: list[Candidate] = []
+    for i, request in enumerate(requests):
+        starts = slot_starts(
+            to_epoch(request.start_time), to_epoch(request.end_time), slot_duration
+        ).tolist()
+        for slot, start in enumerate(starts):
+            end = start + slot_duration
+            if isinstance(request, ContactRequest):
+                gs_id = request.ground_station_id
+                if occupancy.is_free(gs_id, start - setup, end + teardown):
+                    candidates.append(Candidate(i, gs_id, start, end, slot, (-1, slot)))
+                continue
+
+            for gs in stations:
+                first, last, pass_key = start, end, (gs.id, slot)
+                if passes is not None:
+                    windows = passes.get((request.satellite_id, gs.id), [])
+                    interval = visible_window(windows, start, end)
+                    if interval is None:
+                        continue
+                    first, last = interval
+                    # the index of the pass visible_window clipped to
+                    pass_key = (
+                        gs.id,
+                        bisect_right(windows, start, key=lambda w: w[1]),
+                    )
+                if occupancy.is_free(gs.id, first - setup, last + teardown):
+                    candidates.append(Candidate(i, gs.id, first, last, slot, pass_key))
+    return candidates
+
+
+def greedy_candidates(
+    requests: list[Request],
+    stations: list[GroundStation],
+    occupancy: Occupancy,
+    slot_duration: int = 15 * 60,
+    passes: dict[tuple[uuid.UUID, int], list[tuple[int, int]]] | None = None,
+    setup: int = 0,
+    teardown: int = 0,
+) -> list[Candidate]:
+    """The bookings of schedule_with_slots as candidates
+
+    Greedy books exact lengths wherever a gap starts, which the slot candidates
+    cannot express, so adding its bookings makes the optimum at least as good as
+    the greedy schedule. They get negative slot indices so they never match a slot
+    candidate, overlaps with those are ruled out by request_cliques. occupancy and the
+    scheduled flag and ground station of the requests are left as they were.
+
+    Args:
+        requests (list[Request]): Requests to schedule, sorted by end time
+        stations (list[GroundStation]): Ground stations RF requests can be booked on
+        occupancy (Occupancy): Bookings that have to be kept
+        slot_duration (int, optional): The length of each slot in seconds. Defaults to 15*60. 15 minutes.
+        passes (dict[tuple[uuid.UUID, int], list[tuple[int, int]]] | None, optional): Pass windows by (satellite id, ground station id). Defaults to None.
+        setup (int, optional): Seconds a station is held before each booking. Defaults to 0.
+        teardown (int, optional): Seconds a station is held after each booking. Defaults to 0.
+
+    Returns:
+        list[Candidate]: One candidate per greedy booking
+    """
+    states = [(r.scheduled, r.ground_station_id) for r in requests]
+    bookings = schedule_with_slots(
+        requests, stations, occupancy.copy(), slot_duration, passes, setup, teardown
+    )
+    for request, (scheduled, gs_id) in zip(requests, states):
+        request.scheduled, request.ground_station_id = scheduled, gs_id
+    index = {r.id: i for i, r in enumerate(requests)}
+    candidates: list[Candidate] = []
+    for j, booking in enumerate(bookings):
+        r = index[booking.request_id]
+        request = requests[r]
+        start = to_epoch(booking.slot.start_time)
+        slot = (start - to_epoch(request.start_time)) // slot_duration
+        if isinstance(request, ContactRequest):
+            pass_key = (-1, slot)
+        elif passes is not None:
+            windows = passes.get((request.satellite_id, booking.gs_id), [])
+            pass_key = (booking.gs_id, bisect_right(windows, start, key=lambda w: w[1]))
+        else:
+            pass_key = (booking.gs_id, slot)
+        candidates.append(
+            Candidate(
+                r,
+                booking.gs_id,
+                start,
+                to_epoch(booking.slot.end_time),
+                -1 - j,
+                pass_key,
+            )
+        )
+    return candidates
+
+
+def _overlap_cliques(
+    candidates: list[Candidate],
+    groups: dict[int, list[int]],
+    before: int = 0,
+    after: int = 0,
+) -> list[list[int]]:
+    """Maximal sets of overlapping candidates within each group
+
+    Intervals are extended by before and after seconds, e.g. station margins.
+
+    The intervals of one group form an interval graph, so it is enough to forbid
+    two bookings in every maximal set of intervals sharing an instant. Those sets
+    are found with a sweep over the interval ends, starts at a time coming after the
+    ends at that time since intervals are half-open.
+    """
+    cliques = []
+    for members in groups.values():
+        events = sorted(
+            [(candidates[k].start - before, 1, k) for k in members]
+            + [(candidates[k].end + after, 0, k) for k in members]
+        )
+        active: set[int] = set()
+        for n, (_, is_start, k) in enumerate(events):
+            if not is_start:
+                active.discard(k)
+                continue
+            active.add(k)
+            # the set only stops growing when the next event is an end
+            if n + 1 == len(events) or not events[n + 1][1]:
+                if len(active) > 1:
+                    cliques.append(sorted(active))
+    return cliques
+
+
+def station_cliques(
+    candidates: list[Candidate], setup: int = 0, teardown: int = 0
+) -> list[list[int]]:
+    """Groups of candidates that overlap on the same station, margins included
+
+    Args:
+        candidates (list[Candidate]): Candidate intervals
+        setup (int, optional): Seconds a station is held before each booking. Defaults to 0.
+        teardown (int, optional): Seconds a station is held after each booking. Defaults to 0.
+
+    Returns:
+        list[list[int]]: Indices of candidates at most one of which can be booked
+    """
+    by_station: dict[int, list[int]] = defaultdict(list)
+    for k, candidate in enumerate(candidates):
+        by_station[candidate.gs_id].append(k)
+    return _overlap_cliques(candidates, by_station, setup, teardown)
+
+
+def request_cliques(
+    requests: list[Request], candidates: list[Candidate]
+) -> list[list[int]]:
+    """Groups of candidates of one RF request that overlap in time, on any station
+
+    A satellite is in contact with one station at a time, so at most one of each
+    group can be booked. Contacts only use their own station, which station_cliques
+    already covers.
+
+    Args:
+        requests (list[Request]): Requests the candidates refer to
+        candidates (list[Candidate]): Candidate intervals, greedy ones included
+
+    Returns:
+        list[list[int]]: Indices of candidates at most one of which can be booked
+    """
+    by_request: dict[int, list[int]] = defaultdict(list)
+    for k, candidate in enumerate(candidates):
+        if isinstance(requests[candidate.request], RFRequest):
+            by_request[candidate.request].append(k)
+    return _overlap_cliques(candidates, by_request)
+
+
+def schedule_optimal(
+    requests: list[Request],
+    stations: list[GroundStation],
+    occupancy: Occupancy | None = None,
+    slot_duration: int = 15 * 60,
+    passes: dict[tuple[uuid.UUID, int], list[tuple[int, int]]] | None = None,
+    time_limit: float = SCHEDULER_TIME_LIMIT_SECONDS,
+    weights: dict[uuid.UUID, float] | None = None,
+    setup: int = SCHEDULER_SETUP_SECONDS,
+    teardown: int = SCHEDULER_TEARDOWN_SECONDS,
+) -> list[Booking]:
+    """Schedule the requests by solving a mixed integer program
+
+    Every candidate interval is a binary variable, the slots of the request windows
+    and the bookings of the greedy schedule (see greedy_candidates) alike. The
+    program maximizes the weighted satisfied time of the requests (see
+    request_weights), where satisfied time is capped at what the request asked for,
+    subject to:
+
+    - no two bookings overlapping on a ground station, bookings in occupancy and
+      the setup and teardown margins of every booking included
+    - an RF request using at most one station at a time, see request_cliques
+    - an RF request being booked on at least min_passes distinct passes, or not at all
+
+    The program is solved with HiGHS through scipy. When the time limit is reached
+    the best schedule found so far is used, and if none was found yet the greedy
+    schedule_with_slots is used instead.
+
+    Args:
+        requests (list[Request]): List of requests to schedule
+        stations (list[GroundStation]): List of GroundStations to schedule the requests with
+        occupancy (Occupancy | None, optional): Station occupancy to schedule into, bookings already in it are kept. Defaults to an empty one of the SCHEDULER_OCCUPANCY kind.
+        slot_duration (int, optional): The length of each slot in seconds. Defaults to 15*60. 15 minutes.
+        passes (dict[tuple[uuid.UUID, int], list[tuple[int, int]]] | None, optional): Pass windows by (satellite id, ground station id), see pass_windows. Defaults to None.
+        time_limit (float, optional): Solver time limit in seconds. Defaults to SCHEDULER_TIME_LIMIT_SECONDS.
+        weights (dict[uuid.UUID, float] | None, optional): Weights by request id, when requests are part of a larger set. Defaults to request_weights(requests).
+        setup (int, optional): Seconds a station is held before each booking. Defaults to SCHEDULER_SETUP_SECONDS.
+        teardown (int, optional): Seconds a station is held after each booking. Defaults to SCHEDULER_TEARDOWN_SECONDS.
+
+    Returns:
+        list[Booking]: List of bookings that were scheduled
+    """
+    if occupancy is None:
+        occupancy = create_occupancy(
+            min((to_epoch(r.start_time) for r in requests), default=0) - setup,
+            max((to_epoch(r.end_time) for r in requests), default=0)
+            + slot_duration
+            + teardown,
+        )
+    requests.sort(key=lambda r: r.end_time)
+    for request in requests:
+        request.scheduled = False
+
+    candidates = candidate_intervals(
+        requests, stations, occupancy, slot_duration, passes, setup, teardown
+    )
+    candidates += greedy_candidates(
+        requests, stations, occupancy, slot_duration, passes, setup, teardown
+    )
+    if not candidates:
+        return []
+
+    # variables: x per candidate, then y (satisfied time) and z (served) per
+    # request, then one p per (request, pass) telling whether the pass is used
+    n_x = len(candidates)
+    n_r = len(requests)
+    pass_index: dict[tuple[int, tuple[int, int]], int] = {}
+    for candidate in candidates:
+        key = (candidate.request, candidate.pass_key)
+        pass_index.setdefault(key, 2 * n_r + n_x + len(pass_index))
+    n_vars = n_x + 2 * n_r + len(pass_index)
+
+    def y(r: int) -> int:
+        return n_x + r
+
+    def z(r: int) -> int:
+        return n_x + n_r + r
+
+    rows: list[int] = []
+    cols: list[int] = []
+    values: list[float] = []
+    upper: list[float] = []
+
+    def add_row(terms: list[tuple[int, float]], ub: float):
+        row = len(upper)
+        for col, value in terms:
+            rows.append(row)
+            cols.append(col)
+            values.append(value)
+        upper.append(ub)
+
+    demand = [requested_time(r) for r in requests]
+    by_request: dict[int, list[int]] = defaultdict(list)
+    by_pass: dict[int, list[int]] = defaultdict(list)
+    for k, candidate in enumerate(candidates):
+        by_request[candidate.request].append(k)
+        by_pass[pass_index[(candidate.request, candidate.pass_key)]].append(k)
+        # a request that is not served gets nothing
+        add_row([(k, 1.0), (z(candidate.request), -1.0)], 0)
+
+    for r, members in by_request.items():
+        # y <= booked time and y <= demand * z
+        add_row(
+            [(y(r), 1.0)]
+            + [(k, -float(candidates[k].end - candidates[k].start)) for k in members],
+            0,
+        )
+        add_row([(y(r), 1.0), (z(r), -float(demand[r]))], 0)
+
+    for p, members in by_pass.items():
+        add_row([(p, 1.0)] + [(k, -1.0) for k in members], 0)
+    for r, request in enumerate(requests):
+        if isinstance(request, RFRequest) and request.min_passes > 1:
+            used = [p for (q, _), p in pass_index.items() if q == r]
+            add_row([(z(r), float(request.min_passes))] + [(p, -1.0) for p in used], 0)
+
+    for clique in station_cliques(candidates, setup, teardown) + request_cliques(
+        requests, candidates
+    ):
+        add_row([(k, 1.0) for k in clique], 1)
+
+    request_weight = (
+        request_weights(requests)
+        if weights is None
+        else [weights[r.id] for r in requests]
+    )
+    cost = np.zeros(n_vars)
+    for k, candidate in enumerate(candidates):
+        cost[k] = _SURPLUS_COST * (candidate.end - candidate.start)
+    for r in range(n_r):
+        cost[y(r)] = -request_weight[r]
+
+    integrality = np.ones(n_vars)
+    integrality[n_x : n_x + n_r] = 0
+    upper_bounds = np.ones(n_vars)
+    upper_bounds[n_x : n_x + n_r] = demand
+
+    matrix = coo_matrix((values, (rows, cols)), shape=(len(upper), n_vars))
+    result = milp(
+        cost,
+        integrality=integrality,
+        bounds=Bounds(np.zeros(n_vars), upper_bounds),
+        constraints=LinearConstraint(matrix, -np.inf, np.array(upper)),
+        options={"time_limit": time_limit, "disp": False},
+    )
+    if result.x is None:
+        logger.warning(
+            f"No schedule found within {time_limit}s ({result.message}), "
+            "falling back to the greedy scheduler"
+        )
+        return schedule_with_slots(
+            requests, stations, occupancy, slot_duration, passes, setup, teardown
+        )
+    if result.status != 0:
+        logger.info(f"Using the best schedule found: {result.message}")
+
+    return book_candidates(
+        requests,
+        [candidates[k] for k in range(n_x) if result.x[k] > 0.5],
+        occupancy,
+        setup=setup,
+        teardown=teardown,
+    )
+
+
+def book_candidates(
+    requests: list[Request],
+    chosen: list[Candidate],
+    occupancy: Occupancy,
+    existing: dict[tuple[int, int, int], Booking] | None = None,
+    setup: int = 0,
+    teardown: int = 0,
+) -> list[Booking]:
+    """Turn a set of non-overlapping candidates into bookings
+
+    The bookings of a request are trimmed to the time it asked for, which only ever
+    shortens them. Requests are marked scheduled the way schedule_with_slots does.
+
+    Args:
+        requests (list[Request]): Requests the candidates refer to
+        chosen (list[Candidate]): Candidates to book
+        occupancy (Occupancy): Station occupancy the bookings are added to
+        existing (dict[tuple[int, int, int], Booking] | None, optional): Bookings by (gs_id, start, end) to reuse when a candidate is booked unchanged. Defaults to None.
+        setup (int, optional): Seconds the station is held before each booking. Defaults to 0.
+        teardown (int, optional): Seconds the station is held after each booking. Defaults to 0.
+
+    Returns:
+        list[Booking]: The bookings
+    """
+    by_request: dict[int, list[Candidate]] = defaultdict(list)
+    for candidate in chosen:
+        by_request[candidate.request].append(candidate)
+
+    bookings: list[Booking] = []
+    for r, request in enumerate(requests):
+        remaining = requested_time(request)
+        for candidate in sorted(by_request[r], key=lambda c: c.start):
+            if remaining <= 0:
+                break
+            end = min(candidate.end, candidate.start + remaining)
+            booking = (existing or {}).get((candidate.gs_id, candidate.start, end))
+            if booking is None or booking.request_id != request.id:
+                booking = Booking(
+                    slot=Slot(
+                        start_time=from_epoch(candidate.start, request.start_time),
+                        end_time=from_epoch(end, request.start_time),
+                    ),
+                    request_id=request.id,
+                    gs_id=candidate.gs_id,
+                    id=uuid.uuid4(),
+                )
+            occupancy.book(
+                candidate.gs_id, candidate.start - setup, end + teardown, booking
+            )
+            bookings.append(booking)
+            remaining -= end - candidate.start
+            if isinstance(request, RFRequest):
+                request.ground_station_id = candidate.gs_id
+            else:
+                request.scheduled = True
+        if isinstance(request, RFRequest):
+            request.scheduled = remaining <= 0
+
+    return bookings
@@ -0,0 +1,96 @@
+import base64
+import binascii
+import datetime
+import json
+import os
+from typing import Any, Callable, Sequence, TypeVar
+import uuid
+from fastapi import HTTPException, Response
+from sqlalchemy import and_, or_
+from sqlalchemy.sql.elements import ColumnElement
+
+# page size of the list endpoints when none is given, and the largest allowed
+PAGE_SIZE_DEFAULT = int(os.getenv("PAGE_SIZE_DEFAULT", "100"))
+PAGE_SIZE_MAX = int(os.getenv("PAGE_SIZE_MAX", "1000"))
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+T = TypeVar("T")
+
+
+def encode_cursor(key: Sequence[Any]) -> str:
+    """Opaque cursor for the sort key of the last item of a page
+
+    Args:
+        key (Sequence[Any]): Sort key values: ints, strings, UUIDs or datetimes
+
+    Returns:
+        str: URL safe cursor
+    """
+    values = [
+        (
+            v.isoformat()
+            if isinstance(v, datetime.datetime)
+            else str(v) if isinstance(v, uuid.UUID) else v
+        )
+        for v in key
+    ]
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+def decode_cursor(cursor: str, *types: Callable[[Any], Any]) -> tuple:
+    """Read the sort key of a cursor made by encode_cursor
+
+    Args:
+        cursor (str): The cursor
+        *types (Callable[[Any], Any]): Conversion of each key value, e.g. int, uuid.UUID or datetime.datetime.fromisoformat
+
+    Raises:
+        HTTPException: 400 if the cursor is not a valid cursor for this key
+
+    Returns:
+        tuple: The sort key
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if not isinstance(values, list) or len(values) != len(types):
+            raise ValueError("wrong number of values")
+        return tuple(convert(v) for convert, v in zip(types, values))
+    except (ValueError, TypeError, binascii.Error) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid cursor: {str(e)}")
+
+
+def after_key(columns: Sequence[Any], key: Sequence[Any]) -> ColumnElement[bool]:
+    """Condition selecting the rows that sort after key on columns
+
+    Spelled out as (a > x) or (a = x and b > y) rather than a row value
+    comparison, so an index on the leading column can be used on every backend.
+    """
+    column, *rest = columns
+    value, *rest_key = key
+    if not rest:
+        return column > value
+    return or_(column > value, and_(column == value, after_key(rest, rest_key)))
+
+
+def split_page(
+    items: list[T], limit: int, key: Callable[[T], Sequence[Any]]
+) -> tuple[list[T], str | None]:
+    """Cut a page out of up to limit + 1 items fetched in key order
+
+    Args:
+        items (list[T]): Items in key order, one more than the page if there are more
+        limit (int): Page size
+        key (Callable[[T], Sequence[Any]]): Sort key of an item
+
+    Returns:
+        tuple[list[T], str | None]: The page, and the cursor of the next one if there is one
+    """
+    if len(items) <= limit:
+        return items, None
+    page = items[:limit]
+    return page, encode_cursor(key(page[-1]))
+
+
+def set_next_cursor(response: Response, cursor: str | None):
+    if cursor is not None:
+        response.headers[NEXT_CURSOR_HEADER] = cursor
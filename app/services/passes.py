@@ -0,0 +1,349 @@
+from bisect import bisect_right
+import datetime
+import logging
+import math
+import uuid
+import numpy as np
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+from skyfield.api import EarthSatellite
+from skyfield.toposlib import GeographicPosition
+from sqlalchemy.exc import SQLAlchemyError
+from sqlmodel import Session
+from app.entities.GroundStation import GroundStation
+from app.entities.Satellite import Satellite
+from app.entities.Visibility import Visibility
+from app.models.visibility import (
+    VISIBILITY_MATRIX_MAX_CELLS,
+    PassPredictionRequestModel,
+)
+from app.services.compute_pool import chunked, run_chunks
+from app.services.geometry import station_frames
+from app.services.ground_station import GroundStationService
+from app.services.propagation import as_utc, get_timescale
+from app.services.satellite import SatelliteService
+from app.services.screening import (
+    SCREENING_ENABLED,
+    orbit_bounds,
+    reachable_stations,
+)
+
+logger = logging.getLogger(__name__)
+
+# event codes returned by EarthSatellite.find_events
+_RISE = 0
+_SET = 2
+
+
+def find_windows(
+    satellite: EarthSatellite,
+    topos: GeographicPosition,
+    start_time: datetime.datetime,
+    end_time: datetime.datetime,
+    altitude_degrees: float = 0.0,
+) -> list[tuple[datetime.datetime, datetime.datetime]]:
+    """Find the windows during which a satellite is above an altitude as seen from topos
+
+    Windows that are already open at start_time or still open at end_time are clipped
+    to the time window.
+
+    Args:
+        satellite (EarthSatellite): Satellite to find the windows of
+        topos (GeographicPosition): Position the satellite is observed from
+        start_time (datetime.datetime): Start time of the time window
+        end_time (datetime.datetime): End time of the time window
+        altitude_degrees (float, optional): Minimum altitude above the horizon. Defaults to 0.0.
+
+    Returns:
+        list[tuple[datetime.datetime, datetime.datetime]]: List of (rise, set) tuples in UTC
+    """
+    start_time = as_utc(start_time)
+    end_time = as_utc(end_time)
+    if start_time >= end_time:
+        return []
+
+    ts = get_timescale()
+    t0 = ts.from_datetime(start_time)
+    t1 = ts.from_datetime(end_time)
+
+    times, events = satellite.find_events(
+        topos, t0, t1, altitude_degrees=altitude_degrees
+    )
+
+    windows: list[tuple[datetime.datetime, datetime.datetime]] = []
+    rise: datetime.datetime | None = None
+
+    # the satellite may already be up when the window opens
+    altitude, _, _ = (satellite - topos).at(t0).altaz()
+    if altitude.degrees > altitude_degrees:  # type: ignore
+        rise = start_time
+
+    for t, event in zip(times, events):
+        if event == _RISE:
+            rise = t.utc_datetime()
+        elif event == _SET and rise is not None:
+            windows.append((rise, t.utc_datetime()))
+            rise = None
+
+    if rise is not None:
+        windows.append((rise, end_time))
+
+    return windows
+
+
+def find_passes(
+    satellite: EarthSatellite,
+    station: GroundStation,
+    start_time: datetime.datetime,
+    end_time: datetime.datetime,
+) -> list[tuple[datetime.datetime, datetime.datetime]]:
+    """Find the AOS/LOS windows of a satellite above the mask of a ground station
+
+    Passes that are already in progress at start_time or still in progress at end_time
+    are clipped to the time window.
+
+    Args:
+        satellite (EarthSatellite): Satellite to find the passes of
+        station (GroundStation): Ground station the satellite is observed from, its mask is used as the minimum elevation
+        start_time (datetime.datetime): Start time of the time window
+        end_time (datetime.datetime): End time of the time window
+
+    Returns:
+        list[tuple[datetime.datetime, datetime.datetime]]: List of (AOS, LOS) tuples in UTC
+    """
+    return find_windows(
+        satellite,
+        station.get_sf_geo_position(),
+        start_time,
+        end_time,
+        altitude_degrees=float(station.mask),
+    )
+
+
+def satellite_passes(
+    satellite: EarthSatellite,
+    stations: list[GroundStation],
+    start_time: datetime.datetime,
+    end_time: datetime.datetime,
+    screening: bool = SCREENING_ENABLED,
+) -> list[tuple[int, datetime.datetime, datetime.datetime]]:
+    """Find the passes of one satellite over several ground stations
+
+    With screening, the stations the satellite can never see (too far from the
+    latitudes its ground track reaches) are skipped before any pass search.
+
+    Args:
+        satellite (EarthSatellite): Satellite to find the passes of
+        stations (list[GroundStation]): Ground stations to find the passes over
+        start_time (datetime.datetime): Start of the prediction horizon
+        end_time (datetime.datetime): End of the prediction horizon
+        screening (bool, optional): Skip the stations ruled out by screening. Defaults to SCREENING_ENABLED.
+
+    Returns:
+        list[tuple[int, datetime.datetime, datetime.datetime]]: List of (station index, AOS, LOS) tuples
+    """
+    if not stations:
+        return []
+
+    reachable = np.ones(len(stations), dtype=bool)
+    if screening:
+        positions, _ = station_frames(stations)
+        masks = np.array([float(gs.mask) for gs in stations])
+        reachable = reachable_stations(orbit_bounds(satellite), positions, masks)
+
+    return [
+        (j, aos, los)
+        for j in np.flatnonzero(reachable).tolist()
+        for aos, los in find_passes(satellite, stations[j], start_time, end_time)
+    ]
+
+
+def predict_passes(
+    satellites: list[Satellite],
+    stations: list[GroundStation],
+    start_time: datetime.datetime,
+    end_time: datetime.datetime,
+    screening: bool = SCREENING_ENABLED,
+) -> list[Visibility]:
+    """Predict every visibility window for each satellite and ground station pair
+
+    Args:
+        satellites (list[Satellite]): Satellites to predict the passes of
+        stations (list[GroundStation]): Ground stations to predict the passes over
+        start_time (datetime.datetime): Start of the prediction horizon
+        end_time (datetime.datetime): End of the prediction horizon
+        screening (bool, optional): Skip the windows ruled out by screening. Defaults to SCREENING_ENABLED.
+
+    Returns:
+        list[Visibility]: Visibility windows sorted by start time
+    """
+    visibilities: list[Visibility] = []
+    for sat in satellites:
+        for j, aos, los in satellite_passes(
+            sat.get_sf_sat(), stations, start_time, end_time, screening
+        ):
+            visibilities.append(Visibility(stations[j], sat, aos, los))
+
+    visibilities.sort(key=lambda v: v.start)
+    return visibilities
+
+
+def pass_windows(
+    satellites: list[Satellite],
+    stations: list[GroundStation],
+    start_time: datetime.datetime,
+    end_time: datetime.datetime,
+) -> dict[tuple[uuid.UUID, int], list[tuple[int, int]]]:
+    """Predict the passes of every satellite over every station in whole Unix seconds
+
+    AOS is rounded up and LOS down, so every second of a window is above the mask.
+
+    Args:
+        satellites (list[Satellite]): Satellites to predict the passes of
+        stations (list[GroundStation]): Ground stations to predict the passes over
+        start_time (datetime.datetime): Start of the prediction horizon
+        end_time (datetime.datetime): End of the prediction horizon
+
+    Returns:
+        dict[tuple[uuid.UUID, int], list[tuple[int, int]]]: Sorted (AOS, LOS) windows by (satellite id, ground station id)
+    """
+    windows: dict[tuple[uuid.UUID, int], list[tuple[int, int]]] = {}
+    for sat in satellites:
+        for j, aos, los in satellite_passes(
+            sat.get_sf_sat(), stations, start_time, end_time
+        ):
+            first = math.ceil(aos.timestamp())
+            last = math.floor(los.timestamp())
+            if first < last:
+                windows.setdefault((sat.id, stations[j].id), []).append((first, last))
+    return windows
+
+
+def visible_window(
+    windows: list[tuple[int, int]], start: int, end: int
+) -> tuple[int, int] | None:
+    """Clip [start, end) to the first pass window it overlaps
+
+    Args:
+        windows (list[tuple[int, int]]): Sorted, non-overlapping (AOS, LOS) windows in Unix seconds
+        start (int): Start of the interval in Unix seconds
+        end (int): End of the interval in Unix seconds
+
+    Returns:
+        tuple[int, int] | None: The visible part of the interval, None if there is none
+    """
+    i = bisect_right(windows, start, key=lambda w: w[1])
+    if i < len(windows) and windows[i][0] < end:
+        return max(start, windows[i][0]), min(end, windows[i][1])
+    return None
+
+
+def _passes_chunk(
+    satellites: list[dict],
+    stations: list[dict],
+    start_time: datetime.datetime,
+    end_time: datetime.datetime,
+) -> list[tuple[int, int, datetime.datetime, datetime.datetime]]:
+    """Propagation pool task: pass windows as (satellite index, station index, AOS, LOS)"""
+    chunk_stations = [GroundStation(**gs) for gs in stations]
+    return [
+        (i, j, aos, los)
+        for i, sat in enumerate(satellites)
+        for j, aos, los in satellite_passes(
+            Satellite(**sat).get_sf_sat(), chunk_stations, start_time, end_time
+        )
+    ]
+
+
+async def predict_passes_async(
+    satellites: list[Satellite],
+    stations: list[GroundStation],
+    start_time: datetime.datetime,
+    end_time: datetime.datetime,
+    chunk_size: int | None = None,
+) -> list[Visibility]:
+    """predict_passes split per satellite over the propagation pool"""
+    station_data = [gs.model_dump() for gs in stations]
+    chunks = list(chunked(satellites, chunk_size))
+    results = await run_chunks(
+        _passes_chunk,
+        [
+            (
+                [
+                    {"id": sat.id, "name": sat.name, "tle": sat.tle}
+                    for sat in satellites[rows.start : rows.stop]
+                ],
+                station_data,
+                start_time,
+                end_time,
+            )
+            for rows in chunks
+        ],
+    )
+
+    visibilities = [
+        Visibility(stations[j], satellites[rows.start + i], aos, los)
+        for rows, windows in zip(chunks, results)
+        for i, j, aos, los in windows
+    ]
+    visibilities.sort(key=lambda v: v.start)
+    return visibilities
+
+
+def load_network(
+    db: Session,
+    satellite_ids: list[uuid.UUID] | None = None,
+    station_ids: list[int] | None = None,
+) -> tuple[list[Satellite], list[GroundStation]]:
+    """Load the satellites and ground stations, optionally restricted to some ids"""
+    satellites = SatelliteService.get_satellites(db)
+    if satellite_ids is not None:
+        satellites = [s for s in satellites if s.id in satellite_ids]
+
+    stations = GroundStationService.get_ground_stations(db)
+    if station_ids is not None:
+        stations = [gs for gs in stations if gs.id in station_ids]
+
+    return satellites, stations
+
+
+class PassService:
+    @staticmethod
+    async def get_passes(
+        db: Session, request: PassPredictionRequestModel
+    ) -> list[Visibility]:
+        try:
+            if request.start >= request.end:
+                raise HTTPException(
+                    status_code=400,
+                    detail="Start time must be before end time",
+                )
+
+            satellites, stations = await run_in_threadpool(
+                load_network, db, request.satellite_ids, request.station_ids
+            )
+            cells = len(satellites) * len(stations) * request.steps()
+            if cells > VISIBILITY_MATRIX_MAX_CELLS:
+                raise HTTPException(
+                    status_code=422,
+                    detail=f"Prediction would cover {cells} values, "
+                    f"at most {VISIBILITY_MATRIX_MAX_CELLS} are allowed",
+                )
+            return await predict_passes_async(
+                satellites, stations, request.start, request.end
+            )
+
+        except HTTPException:
+            raise
+        except SQLAlchemyError as e:
+            logger.error(f"Error predicting passes: {str(e)}")
+            raise HTTPException(
+                status_code=503,
+                detail=f"Database error while predicting passes: {str(e)}",
+            )
+        except Exception as e:
+            logger.error(f"Error predicting passes: {str(e)}")
+            raise HTTPException(
+                status_code=500,
+                detail=f"Error predicting passes: {str(e)}",
+            )
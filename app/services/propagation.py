@@ -0,0 +1,154 @@
+import datetime
+import hashlib
+import logging
+import os
+import threading
+import numpy as np
+from skyfield.api import EarthSatellite, load, Time, Timescale
+from skyfield.framelib import itrs
+from skyfield.sgp4lib import theta_GMST1982
+from app.services.lru import BoundedLRU
+
+logger = logging.getLogger(__name__)
+
+PROPAGATOR_CACHE_SIZE = int(os.getenv("PROPAGATOR_CACHE_SIZE", "1024"))
+
+_timescale: Timescale | None = None
+_timescale_lock = threading.Lock()
+
+
+def get_timescale() -> Timescale:
+    """Return the process-wide Skyfield timescale, creating it on first use
+
+    Returns:
+        Timescale: The shared timescale
+    """
+    global _timescale
+    if _timescale is None:
+        with _timescale_lock:
+            if _timescale is None:
+                _timescale = load.timescale()
+    return _timescale
+
+
+def as_utc(time: datetime.datetime) -> datetime.datetime:
+    """Attach UTC to naive datetimes, convert aware ones to UTC"""
+    if time.tzinfo is None:
+        return time.replace(tzinfo=datetime.timezone.utc)
+    return time.astimezone(datetime.timezone.utc)
+
+
+def tle_hash(tle: str) -> str:
+    """Hash the content of a TLE, ignoring surrounding whitespace on each line
+
+    Args:
+        tle (str): TLE with two lines, optionally preceded by a name line
+
+    Returns:
+        str: Hex digest identifying the TLE content
+    """
+    lines = [line.strip() for line in tle.strip().splitlines() if line.strip()]
+    return hashlib.sha256("\n".join(lines).encode()).hexdigest()
+
+
+def parse_tle(tle: str, name: str = "") -> EarthSatellite:
+    """Build an EarthSatellite from a two or three line TLE
+
+    Args:
+        tle (str): TLE with two lines, optionally preceded by a name line
+        name (str, optional): Name used when the TLE has no name line. Defaults to "".
+
+    Returns:
+        EarthSatellite: The initialized SGP4 propagator
+    """
+    lines = [line.strip() for line in tle.strip().splitlines() if line.strip()]
+    if len(lines) == 3:
+        return EarthSatellite(lines[1], lines[2], lines[0])
+    if len(lines) == 2:
+        return EarthSatellite(lines[0], lines[1], name or None)
+    raise ValueError(f"Expected a TLE with 2 or 3 lines, got {len(lines)}")
+
+
+def satellite_itrf(satellite: EarthSatellite, times: Time) -> np.ndarray:
+    """Propagate a satellite over a time array
+
+    Args:
+        satellite (EarthSatellite): Satellite to propagate
+        times (Time): Times to propagate to
+
+    Returns:
+        np.ndarray: ITRF positions in km, shape [3, times]
+    """
+    if times.ts.polar_motion_table is not None:
+        return satellite.at(times).frame_xyz(itrs).km
+
+    # TEME to GCRS to ITRS reduces to a rotation about z by the GMST that SGP4 uses,
+    # the precession-nutation matrices cancel out, so skip computing them. SGP4 takes
+    # the TLE epoch as UTC, the UTC fraction of the day follows from UT1 and DUT1
+    utc_fraction = times.ut1_fraction - times.dut1 / 86400.0
+    _, position, _ = satellite.model.sgp4_array(
+        np.atleast_1d(times.whole).astype(float),
+        np.atleast_1d(utc_fraction).astype(float),
+    )
+    position = position.T.reshape((3,) + np.shape(times.whole))
+    theta, _ = theta_GMST1982(times.whole, times.ut1_fraction)
+    cos_theta = np.cos(theta)
+    sin_theta = np.sin(theta)
+    return np.array(
+        [
+            cos_theta * position[0] + sin_theta * position[1],
+            cos_theta * position[1] - sin_theta * position[0],
+            position[2],
+        ]
+    )
+
+
+class PropagatorCache:
+    """Bounded LRU cache of EarthSatellite objects keyed by TLE content hash
+
+    The cached objects are shared between callers and must not be mutated.
+    """
+
+    def __init__(self, max_size: int = PROPAGATOR_CACHE_SIZE):
+        self._entries: BoundedLRU[str, EarthSatellite] = BoundedLRU(max_size)
+
+    def get(self, tle: str, name: str = "") -> EarthSatellite:
+        """Return the propagator for the TLE, parsing it on a cache miss
+
+        Args:
+            tle (str): TLE with two lines, optionally preceded by a name line
+            name (str, optional): Name used when the TLE has no name line. Defaults to "".
+
+        Returns:
+            EarthSatellite: The cached propagator
+        """
+        key = tle_hash(tle)
+        satellite = self._entries.get(key)
+        if satellite is None:
+            # parse outside of the lock, SGP4 initialization is the expensive part
+            satellite = parse_tle(tle, name)
+            self._entries.put(key, satellite)
+        return satellite
+
+    def invalidate(self, tle: str) -> bool:
+        """Drop the propagator for the TLE
+
+        Args:
+            tle (str): TLE to drop
+
+        Returns:
+            bool: True if an entry was removed
+        """
+        removed = self._entries.pop(tle_hash(tle)) is not None
+        if removed:
+            logger.debug("Invalidated cached propagator")
+        return removed
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        return self._entries.stats()
+
+
+propagator_cache = PropagatorCache()
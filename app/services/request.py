@@ -1,18 +1,31 @@
-from collections import defaultdict
 from dataclasses import dataclass
 import datetime
-from pprint import pprint
+import os
 import random
 import numpy as np
-from skyfield.api import EarthSatellite, load, Timescale, Time
+from skyfield.api import EarthSatellite, Timescale, Time
+from skyfield.searchlib import find_discrete
 from skyfield.toposlib import GeographicPosition
-from sqlmodel import select, Session
+from sqlalchemy import and_, delete, func, text, true
+from sqlalchemy.sql.elements import ColumnElement
+from sqlmodel import col, select, Session
 from app.models.request import GeneralContactResponseModel
 from app.services.ground_station import GroundStationService
+from app.services.occupancy import OccupancyIndex
+from app.services.pagination import after_key, decode_cursor
 from app.services.satellite import SatelliteService
+from app.services.timeline import (
+    Occupancy,
+    create_occupancy,
+    from_epoch,
+    to_epoch,
+)
+from app.services.propagation import as_utc, get_timescale
+from app.services.passes import find_windows, pass_windows, visible_window
 from app.entities.Satellite import Satellite
 from app.entities.GroundStation import GroundStation
 from app.entities.Request import RFRequest, ContactRequest
+from app.entities.StationBooking import StationBooking
 from app.models.request import ContactRequestModel, RFTimeRequestModel
 import uuid
 import logging
@@ -24,6 +37,13 @@ logger = logging.getLogger(__name__)
 
 random.seed(42)
 
+# seconds a ground station is held before and after every booking, e.g. to slew
+# the antenna and to release the link
+SCHEDULER_SETUP_SECONDS = int(os.getenv("SCHEDULER_SETUP_SECONDS", "0"))
+SCHEDULER_TEARDOWN_SECONDS = int(os.getenv("SCHEDULER_TEARDOWN_SECONDS", "0"))
+# key of the PostgreSQL advisory lock taken by every writer of the bookings table
+BOOKINGS_LOCK_KEY = 0x5B00C
+
 
 @dataclass
 class Slot:
@@ -40,6 +60,76 @@ class Booking:
 
 
 Request = RFRequest | ContactRequest
+
+# stored bookings are naive UTC, used as the like argument of from_epoch
+NAIVE_UTC = datetime.datetime(1970, 1, 1)
+
+
+def naive_utc(time: datetime.datetime) -> datetime.datetime:
+    """Naive UTC datetime, as stored in the bookings table"""
+    return as_utc(time).replace(tzinfo=None)
+
+
+def overlaps_window(
+    db: Session,
+    entity: type[RFRequest] | type[ContactRequest] | type[StationBooking],
+    start: datetime.datetime | None,
+    end: datetime.datetime | None,
+) -> ColumnElement[bool]:
+    """Condition selecting the rows of entity whose [start_time, end_time) overlaps [start, end)
+
+    On PostgreSQL this is a tsrange && tsrange test matching the GiST index of the
+    table (see window_index), elsewhere two comparisons on the indexed columns.
+    A missing bound leaves that side of the window open.
+
+    Args:
+        db (Session): Database session, for its dialect
+        entity (type[RFRequest] | type[ContactRequest] | type[StationBooking]): Table with start_time and end_time
+        start (datetime.datetime | None): Start of the window
+        end (datetime.datetime | None): End of the window
+
+    Returns:
+        ColumnElement[bool]: The condition
+    """
+    start = None if start is None else naive_utc(start)
+    end = None if end is None else naive_utc(end)
+    if db.get_bind().dialect.name == "postgresql":
+        return func.tsrange(col(entity.start_time), col(entity.end_time)).op("&&")(
+            func.tsrange(start, end)
+        )
+    conditions = []
+    if start is not None:
+        conditions.append(col(entity.end_time) > start)
+    if end is not None:
+        conditions.append(col(entity.start_time) < end)
+    return and_(true(), *conditions)
+
+
+def lock_bookings(db: Session):
+    """Hold the bookings lock until the end of the transaction
+
+    Serializes the writers of the bookings table, the incremental repairs and the
+    full reschedule. On PostgreSQL this is a transaction level advisory lock, other
+    databases such as SQLite already serialize writing transactions.
+
+    Args:
+        db (Session): Database session
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        db.connection().execute(
+            text("SELECT pg_advisory_xact_lock(:key)"), {"key": BOOKINGS_LOCK_KEY}
+        )
+
+
+def booking_from_row(row: StationBooking) -> Booking:
+    return Booking(
+        slot=Slot(start_time=row.start_time, end_time=row.end_time),
+        gs_id=row.gs_id,
+        request_id=row.request_id,
+        id=row.id,
+    )
+
+
 # we have to take in a list of requests and generate a list of contacts
 # the goal is to maximize the number of contacts we can make
 # we can only make a contact if it is within the time window of the request
@@ -71,24 +161,112 @@ def divide_into_slots(
     return slots
 
 
+def earliest_gap(
+    occupancy: Occupancy,
+    gs_id: int,
+    start: int,
+    end: int,
+    remaining: int,
+    max_length: int,
+    windows: list[tuple[int, int]] | None = None,
+    setup: int = 0,
+    teardown: int = 0,
+) -> tuple[int, int] | None:
+    """Find the earliest booking of up to max_length seconds of the remaining time
+
+    The booked time lies within [start, end), and within a single window when
+    windows are given. The station is also held for setup seconds before and
+    teardown seconds after it, which may fall outside of the windows.
+
+    Args:
+        occupancy (Occupancy): Station occupancy, holding the margins of earlier bookings
+        gs_id (int): ID of the ground station
+        start (int): Earliest start in Unix seconds
+        end (int): Latest end in Unix seconds
+        remaining (int): Seconds still to book
+        max_length (int): Longest single booking in seconds
+        windows (list[tuple[int, int]] | None, optional): Sorted visibility windows, see visible_window. Defaults to None, [start, end) is one window.
+        setup (int, optional): Seconds held before the booking. Defaults to 0.
+        teardown (int, optional): Seconds held after the booking. Defaults to 0.
+
+    Returns:
+        tuple[int, int] | None: Start and length of the booking, None if nothing fits
+    """
+    while start < end:
+        window: tuple[int, int] | None = (start, end)
+        if windows is not None:
+            window = visible_window(windows, start, end)
+        if window is None:
+            return None
+        first, last = window
+        length = min(remaining, max_length, last - first)
+        found = occupancy.find_gap(
+            gs_id, first - setup, last + teardown, length + setup + teardown
+        )
+        if found is not None:
+            return int(found) + setup, length
+        start = last
+    return None
+
+
 def schedule_with_slots(
-    requests: list[Request], stations: list[GroundStation]
+    requests: list[Request],
+    stations: list[GroundStation],
+    occupancy: Occupancy | None = None,
+    slot_duration: int = 15 * 60,
+    passes: dict[tuple[UUID, int], list[tuple[int, int]]] | None = None,
+    setup: int = SCHEDULER_SETUP_SECONDS,
+    teardown: int = SCHEDULER_TEARDOWN_SECONDS,
 ) -> list[Booking]:
-    """Schedule the requests with the given slots
+    """Schedule the requests into the free gaps of the ground stations
+
+    Every request is booked for exactly the time it asked for, in bookings of at
+    most slot_duration placed at the earliest free gap of its window. RF requests
+    take the station with the earliest gap, and their next booking starts after
+    the previous one ends. Each booking also holds its station for setup seconds
+    before and teardown seconds after it.
+
+    Times are handled as integer Unix seconds and only converted back to datetimes
+    for the bookings that are made. When pass windows are given, RF time is only
+    booked while the satellite is above the station mask: bookings stay within a
+    single pass and stations the satellite does not pass over are skipped.
 
     Args:
         requests (list[Request]): List of requests to schedule
         stations (list[GroundStation]): List of GroundStations to schedule the requests with
+        occupancy (Occupancy | None, optional): Station occupancy to schedule into, bookings already in it are kept. Defaults to an empty one of the SCHEDULER_OCCUPANCY kind.
+        slot_duration (int, optional): The longest single booking in seconds. Defaults to 15*60. 15 minutes.
+        passes (dict[tuple[UUID, int], list[tuple[int, int]]] | None, optional): Pass windows by (satellite id, ground station id), see pass_windows. Defaults to None, RF time is then booked without checking visibility.
+        setup (int, optional): Seconds a station is held before each booking. Defaults to SCHEDULER_SETUP_SECONDS.
+        teardown (int, optional): Seconds a station is held after each booking. Defaults to SCHEDULER_TEARDOWN_SECONDS.
 
     Returns:
         list[Booking]: List of bookings that were scheduled
     """
-    slots: dict[str, dict[tuple[datetime.datetime, datetime.datetime], Booking]] = (
-        defaultdict(dict)
-    )
+    if occupancy is None:
+        occupancy = create_occupancy(
+            min((to_epoch(r.start_time) for r in requests), default=0) - setup,
+            max((to_epoch(r.end_time) for r in requests), default=0)
+            + slot_duration
+            + teardown,
+        )
     bookings: list[Booking] = []
     # sort the requests by earliest end time
-    requests.sort(key=lambda r: r.end_time)
+    requests.sort(key=lambda x: x.end_time)
+
+    def book(request: Request, gs_id: int, start: int, length: int):
+        booking = Booking(
+            slot=Slot(
+                start_time=from_epoch(start, request.start_time),
+                end_time=from_epoch(start + length, request.start_time),
+            ),
+            request_id=request.id,
+            gs_id=gs_id,
+            id=uuid.uuid4(),
+        )
+        occupancy.book(gs_id, start - setup, start + length + teardown, booking)
+        bookings.append(booking)
+
     # set all requests to not scheduled
     for request in requests:
         request.scheduled = False
@@ -97,44 +275,37 @@ def schedule_with_slots(
     for request in requests:
         if isinstance(request, ContactRequest):
             remaining_time: int = request.duration
-            request_slots = divide_into_slots(request.start_time, request.end_time)
-            for start, end in request_slots:
-                if remaining_time <= 0:
-                    break
-
-                slot_duration: datetime.timedelta = min(
-                    end - start, datetime.timedelta(seconds=remaining_time)
+            cursor = to_epoch(request.start_time)
+            window_end = to_epoch(request.end_time)
+            while remaining_time > 0:
+                found = earliest_gap(
+                    occupancy,
+                    request.ground_station_id,
+                    cursor,
+                    window_end,
+                    remaining_time,
+                    slot_duration,
+                    setup=setup,
+                    teardown=teardown,
                 )
-                start_time = start
-                end_time = start_time + slot_duration
-
-                station_id = str(request.ground_station_id)
-
-                if (start, start + slot_duration) in slots[station_id]:
-                    continue
-
-                booking = Booking(
-                    slot=Slot(start_time=start_time, end_time=end_time),
-                    request_id=request.id,
-                    gs_id=request.ground_station_id,
-                    id=uuid.uuid4(),
-                )
-
-                slots[station_id][(start, start + slot_duration)] = booking
-                bookings.append(booking)
-                # converting from float to int could cause issues in the future
-                remaining_time -= int(slot_duration.total_seconds())
+                if found is None:
+                    break
+                start, length = found
+                book(request, request.ground_station_id, start, length)
+                remaining_time -= length
+                cursor = start + length
                 request.scheduled = True
 
             if not request.scheduled:
-                print(
+                logger.debug(
                     f"Could not schedule request: {request.mission} - {request.satellite_id} - {request.ground_station_id}"
                 )
 
     # Schedule RFRequests next
     for request in requests:
         if isinstance(request, RFRequest):
-            request_slots = divide_into_slots(request.start_time, request.end_time)
+            cursor = to_epoch(request.start_time)
+            window_end = to_epoch(request.end_time)
             remaining_time = max(
                 [
                     request.downlink_time_requested,
@@ -142,50 +313,70 @@ def schedule_with_slots(
                     request.science_time_requested,
                 ]
             )
-            for start, end in request_slots:
-                if remaining_time <= 0:
-                    request.scheduled = True
-                    break
-
-                slot_duration = end - start
-                start_time = start
-                end_time = end
+            while remaining_time > 0:
+                best: tuple[int, int, int] | None = None
                 for gs in stations:
-                    station_name = gs.name
-                    if (start, end) not in slots[station_name]:
-                        request.ground_station_id = gs.id
-                        booking = Booking(
-                            request_id=request.id,
-                            slot=Slot(
-                                start_time=start_time,
-                                end_time=end_time,
-                            ),
-                            gs_id=gs.id,
-                            id=uuid.uuid4(),
-                        )
-
-                        slots[station_name][(start, end)] = booking
-                        bookings.append(booking)
-                        # converting from float to int could cause issues in the future
-                        remaining_time -= int((end - start).total_seconds())
-                if request.scheduled:
+                    windows = None
+                    if passes is not None:
+                        windows = passes.get((request.satellite_id, gs.id))
+                        if not windows:
+                            continue
+                    found = earliest_gap(
+                        occupancy,
+                        gs.id,
+                        cursor,
+                        window_end,
+                        remaining_time,
+                        slot_duration,
+                        windows,
+                        setup,
+                        teardown,
+                    )
+                    if found is not None and (best is None or found[0] < best[1]):
+                        best = (gs.id, *found)
+                if best is None:
                     break
+
+                gs_id, start, length = best
+                request.ground_station_id = gs_id
+                book(request, gs_id, start, length)
+                remaining_time -= length
+                # the satellite only needs one station at a time
+                cursor = start + length
+            request.scheduled = remaining_time <= 0
             if not request.scheduled:
-                print(
+                logger.debug(
                     f"Could not schedule request: {request.mission} - {request.satellite_id}"
                 )
-    pprint(requests)
     return bookings
 
 
-def angle_diff(
+@dataclass
+class AngleDiffSeries:
+    """Topocentric altitudes and separation of two satellites over a time grid"""
+
+    times: Time
+    sat1_altitude: np.ndarray
+    sat2_altitude: np.ndarray
+    separation: np.ndarray
+
+    @property
+    def visible(self) -> np.ndarray:
+        """Boolean mask of the instants where both satellites are above the horizon"""
+        return (self.sat1_altitude > 0) & (self.sat2_altitude > 0)
+
+
+def angle_diff_batch(
     start_t: datetime.datetime,
     end_t: datetime.datetime,
     sat1: EarthSatellite,
     sat2: EarthSatellite,
     gs: GeographicPosition,
-) -> list[tuple[datetime.datetime, float]]:
-    """Calculate the angle difference between two satellites in a given time window
+) -> AngleDiffSeries:
+    """Calculate the altitudes and angle difference of two satellites over a time window
+
+    Every minute of the window is evaluated in a single vectorized Skyfield call per
+    satellite instead of one propagation per instant.
 
     Args:
         start_t (datetime.datetime): Start time of the time window
@@ -195,12 +386,12 @@ def angle_diff(
         gs (GeographicPosition): Geographic position of the ground GroundStation
 
     Returns:
-        list[tuple[datetime.datetime, float]]: List of tuples containing the time and angle difference between the two satellites
+        AngleDiffSeries: Time array with the altitude of each satellite and their separation (in degrees)
     """
 
     total_mins = int((end_t - start_t).total_seconds() / 60)
 
-    ts = load.timescale()
+    ts = get_timescale()
     times = ts.utc(
         start_t.year,
         start_t.month,
@@ -209,20 +400,52 @@ def angle_diff(
         start_t.minute + np.arange(total_mins),  # type: ignore
     )
 
-    angles = []
-    for t in times:
-        sat1_observed = (sat1 - gs).at(t)
-        sat2_observed = (sat2 - gs).at(t)
+    sat1_observed = (sat1 - gs).at(times)
+    sat2_observed = (sat2 - gs).at(times)
+
+    # altaz command used to check visibility wrt ground GroundStation
+    # third field left blank since we don't need distance
+    sat1_altitude, _, _ = sat1_observed.altaz()
+    sat2_altitude, _, _ = sat2_observed.altaz()
+
+    return AngleDiffSeries(
+        times=times,
+        sat1_altitude=sat1_altitude.degrees,  # type: ignore
+        sat2_altitude=sat2_altitude.degrees,  # type: ignore
+        separation=sat1_observed.separation_from(sat2_observed).degrees,  # type: ignore
+    )
+
+
+def angle_diff(
+    start_t: datetime.datetime,
+    end_t: datetime.datetime,
+    sat1: EarthSatellite,
+    sat2: EarthSatellite,
+    gs: GeographicPosition,
+) -> list[tuple[datetime.datetime, float]]:
+    """Calculate the angle difference between two satellites in a given time window
 
-        # altaz command used to check visibility wrt ground GroundStation
-        # third field left blank since we don't need distance
-        sat1_altitude, _, _ = sat1_observed.altaz()
-        sat2_altitude, _, _ = sat2_observed.altaz()
+    Args:
+        start_t (datetime.datetime): Start time of the time window
+        end_t (datetime.datetime): End time of the time window
+        sat1 (EarthSatellite): First satellite
+        sat2 (EarthSatellite): Second satellite
+        gs (GeographicPosition): Geographic position of the ground GroundStation
 
-        if sat1_altitude.degrees > 0 and sat2_altitude.degrees > 0:  # type: ignore
-            degree_diff = sat1_observed.separation_from(sat2_observed).degrees
-            angles.append((t.utc_datetime(), degree_diff))
-    return angles
+    Returns:
+        list[tuple[datetime.datetime, float]]: List of tuples containing the time and angle difference between the two satellites
+    """
+    series = angle_diff_batch(start_t, end_t, sat1, sat2, gs)
+    visible = series.visible
+    if not visible.any():
+        return []
+
+    return list(
+        zip(
+            series.times[visible].utc_datetime(),
+            series.separation[visible].tolist(),
+        )
+    )
 
 
 def get_excl_times(
@@ -256,6 +479,134 @@ def get_excl_times(
     return exclusion_times
 
 
+def get_excl_times_array(
+    times: np.ndarray,
+    angles: np.ndarray,
+    excl_angle: float,
+    chunk_size: int = 1_000_000,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Vectorized get_excl_times over arrays of samples
+
+    Runs of consecutive samples below excl_angle are found with boolean diffs, working
+    through the samples chunk_size at a time so temporary memory stays bounded however
+    long the horizon is. Samples where the satellites are not both visible should be
+    NaN; they end a run, whereas get_excl_times only sees the visible samples and
+    would join the runs on either side of them.
+
+    Args:
+        times (np.ndarray): Time of each sample, in any representation (datetime64, epoch seconds, ...)
+        angles (np.ndarray): Angle difference at each sample, NaN where not visible
+        excl_angle (float): The angle difference threshold
+        chunk_size (int, optional): Number of samples processed at once. Defaults to 1_000_000.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: Start and end time of each exclusion, both inclusive
+    """
+    if len(times) != len(angles):
+        raise ValueError("times and angles must have the same length")
+
+    start_idx: list[np.ndarray] = []
+    end_idx: list[np.ndarray] = []
+    previous = np.zeros(1, dtype=np.int8)
+    for lo in range(0, len(angles), chunk_size):
+        below = (angles[lo : lo + chunk_size] < excl_angle).astype(np.int8)
+        edges = np.diff(below, prepend=previous)
+        start_idx.append(np.flatnonzero(edges == 1) + lo)
+        # a run ends on the sample before the first one back above the threshold
+        end_idx.append(np.flatnonzero(edges == -1) + lo - 1)
+        previous = below[-1:]
+
+    if previous[0]:
+        end_idx.append(np.array([len(angles) - 1]))
+
+    starts = np.concatenate(start_idx) if start_idx else np.empty(0, dtype=np.intp)
+    ends = np.concatenate(end_idx) if end_idx else np.empty(0, dtype=np.intp)
+    return times[starts], times[ends]
+
+
+def _intersect_windows(
+    windows1: list[tuple[datetime.datetime, datetime.datetime]],
+    windows2: list[tuple[datetime.datetime, datetime.datetime]],
+) -> list[tuple[datetime.datetime, datetime.datetime]]:
+    """Intersect two sorted lists of non-overlapping windows"""
+    overlaps: list[tuple[datetime.datetime, datetime.datetime]] = []
+    i = j = 0
+    while i < len(windows1) and j < len(windows2):
+        start = max(windows1[i][0], windows2[j][0])
+        end = min(windows1[i][1], windows2[j][1])
+        if start < end:
+            overlaps.append((start, end))
+        if windows1[i][1] < windows2[j][1]:
+            i += 1
+        else:
+            j += 1
+    return overlaps
+
+
+def get_excl_times_adaptive(
+    start_t: datetime.datetime,
+    end_t: datetime.datetime,
+    sat1: EarthSatellite,
+    sat2: EarthSatellite,
+    gs: GeographicPosition,
+    excl_angle: float,
+    coarse_step: float = 30,
+    precision: float = 0.5,
+) -> list[tuple[datetime.datetime, datetime.datetime]]:
+    """Get the exclusion times by root-finding the threshold crossings of the angle difference
+
+    As with angle_diff, an instant is only excluded while both satellites are above the
+    horizon, so the rise and set times of each satellite are found first. Only the
+    windows where both are up are then sampled every coarse_step seconds, and every
+    crossing of excl_angle is refined to within precision seconds.
+
+    Args:
+        start_t (datetime.datetime): Start time of the time window
+        end_t (datetime.datetime): End time of the time window
+        sat1 (EarthSatellite): First satellite
+        sat2 (EarthSatellite): Second satellite
+        gs (GeographicPosition): Geographic position of the ground GroundStation
+        excl_angle (float): The angle difference threshold
+        coarse_step (float, optional): Spacing of the samples while both satellites are up, in seconds. Defaults to 30.
+        precision (float, optional): Precision of the boundaries in seconds. Defaults to 0.5.
+
+    Returns:
+        list[tuple[datetime.datetime, datetime.datetime]]: List of tuples containing the start and end time of the exclusion times
+    """
+    sat1_gs = sat1 - gs
+    sat2_gs = sat2 - gs
+
+    def excluded(t: Time) -> np.ndarray:
+        separation = sat1_gs.at(t).separation_from(sat2_gs.at(t)).degrees
+        return separation < excl_angle  # type: ignore
+
+    excluded.step_days = coarse_step / 86400  # type: ignore
+
+    ts = get_timescale()
+    exclusion_times: list[tuple[datetime.datetime, datetime.datetime]] = []
+    overlaps = _intersect_windows(
+        find_windows(sat1, gs, start_t, end_t),
+        find_windows(sat2, gs, start_t, end_t),
+    )
+    for overlap_start, overlap_end in overlaps:
+        t0 = ts.from_datetime(overlap_start)
+        t1 = ts.from_datetime(overlap_end)
+        times, values = find_discrete(t0, t1, excluded, epsilon=precision / 86400)
+
+        excl_start = overlap_start if excluded(ts.tt_jd([t0.tt]))[0] else None
+        for t, value in zip(times.utc_datetime(), values):
+            if value and excl_start is None:
+                excl_start = t
+            elif not value and excl_start is not None:
+                exclusion_times.append((excl_start, t))
+                excl_start = None
+
+        if excl_start is not None:
+            exclusion_times.append((excl_start, overlap_end))
+
+    return exclusion_times
+
+
 def is_visible(
     satellite: EarthSatellite,
     GroundStation: GroundStation,
@@ -274,7 +625,7 @@ def is_visible(
         np.bool: _description_
     """
 
-    ts = load.timescale()
+    ts = get_timescale()
     time_obj = ts.from_datetime(time)
 
     # Skyfield Topos object for ground GroundStation
@@ -287,6 +638,40 @@ def is_visible(
     return altitude.degrees > visibility_threshold  # type: ignore
 
 
+def general_response(
+    request: Request, satellite_name: str
+) -> GeneralContactResponseModel:
+    """Build the general response of a request
+
+    Args:
+        request (Request): RF time or contact request
+        satellite_name (str): Name of the satellite of the request
+
+    Returns:
+        GeneralContactResponseModel: The request in the general response format
+    """
+    return GeneralContactResponseModel(
+        requestType="RFTime" if isinstance(request, RFRequest) else "Contact",
+        id=request.id,
+        mission=request.mission,
+        satellite_name=satellite_name,
+        station_id=(
+            -1 if request.ground_station_id is None else request.ground_station_id
+        ),
+        uplink=request.uplink if isinstance(request, ContactRequest) else 0,
+        telemetry=(request.telemetry if isinstance(request, ContactRequest) else 0),
+        science=request.science if isinstance(request, ContactRequest) else 0,
+        startTime=request.start_time,
+        endTime=request.end_time,
+        duration=((request.end_time - request.start_time).total_seconds()),
+        aos=request.aos if isinstance(request, ContactRequest) else None,
+        rf_on=request.rf_on if isinstance(request, ContactRequest) else None,
+        rf_off=request.rf_off if isinstance(request, ContactRequest) else None,
+        los=request.los if isinstance(request, ContactRequest) else None,
+        orbit=request.orbit if isinstance(request, ContactRequest) else None,
+    )
+
+
 class RequestService:
 
     # crud requests
@@ -400,6 +785,7 @@ class RequestService:
                 tzinfo=datetime.timezone.utc
             )
             db.add(rf_request)
+            RequestService.repair_bookings(db, [rf_request])
             db.commit()
             db.refresh(rf_request)
             return rf_request
@@ -462,6 +848,24 @@ class RequestService:
                 scheduled=False,
             )
             db.add(contact_request)
+            # contacts take precedence, RF time booked on the station during the
+            # contact is rescheduled around it
+            displaced_ids = {
+                row.request_id
+                for row in RequestService.get_station_bookings(
+                    db,
+                    contact_request.start_time,
+                    contact_request.end_time,
+                    [contact_request.ground_station_id],
+                )
+                if row.request_type == "RFTime"
+            }
+            displaced: list[Request] = list(
+                db.exec(
+                    select(RFRequest).where(col(RFRequest.id).in_(displaced_ids))
+                ).all()
+            )
+            RequestService.repair_bookings(db, [contact_request, *displaced])
             db.commit()
             db.refresh(contact_request)
             return contact_request
@@ -484,6 +888,7 @@ class RequestService:
         try:
             rf_request = RFRequest(**request.model_dump())
             db.add(rf_request)
+            RequestService.repair_bookings(db, [rf_request])
             db.commit()
             db.refresh(rf_request)
             return rf_request
@@ -512,6 +917,7 @@ class RequestService:
                     status_code=404,
                     detail=f"RF Time Request with ID {request_id} not found",
                 )
+            RequestService.release_bookings(db, request)
             db.delete(request)
             db.commit()
             return None
@@ -542,6 +948,7 @@ class RequestService:
                     status_code=404,
                     detail=f"Contact Request with ID {request_id} not found",
                 )
+            RequestService.release_bookings(db, request)
             db.delete(request)
             db.commit()
             return None
@@ -562,18 +969,93 @@ class RequestService:
             )
 
     @staticmethod
-    def get_all_transformed_requests(db: Session) -> list[GeneralContactResponseModel]:
+    def get_all_transformed_requests(
+        db: Session,
+        limit: int | None = None,
+        cursor: str | None = None,
+        start: datetime.datetime | None = None,
+        end: datetime.datetime | None = None,
+        satellite_id: UUID | None = None,
+        station_id: int | None = None,
+        request_type: str | None = None,
+    ) -> list[GeneralContactResponseModel]:
+        """Get the requests in the general response format, ordered by start time and id
+
+        The satellite name and the ground station of the requests are joined in,
+        so this runs one query per request type however many requests there are.
+        With a limit, each type is read from the cursor on up to the limit and the
+        two are merged, so the cost of a page does not grow with the tables.
+
+        Args:
+            db (Session): Database session
+            limit (int | None, optional): Number of requests to return. Defaults to None, all of them.
+            cursor (str | None, optional): Cursor of the last request of the previous page, see encode_cursor. Defaults to None.
+            start (datetime.datetime | None, optional): Only requests whose window ends after this time. Defaults to None.
+            end (datetime.datetime | None, optional): Only requests whose window starts before this time. Defaults to None.
+            satellite_id (UUID | None, optional): Only requests for this satellite. Defaults to None.
+            station_id (int | None, optional): Only requests on this ground station. Defaults to None.
+            request_type (str | None, optional): "RFTime" or "Contact". Defaults to None, both.
+
+        Returns:
+            list[GeneralContactResponseModel]: The requests
+        """
         try:
-            rf_requests: list[RFRequest] = list(db.exec(select(RFRequest)).all())
-            c_requests: list[ContactRequest] = list(
-                db.exec(select(ContactRequest)).all()
+            after = (
+                None
+                if cursor is None
+                else decode_cursor(cursor, datetime.datetime.fromisoformat, UUID)
             )
+            rows: list[tuple[Request, str | None, int | None]] = []
+            for entity, name in ((RFRequest, "RFTime"), (ContactRequest, "Contact")):
+                if request_type is not None and request_type != name:
+                    continue
+                statement = (
+                    select(entity, Satellite.name, GroundStation.id)
+                    .outerjoin(Satellite, col(Satellite.id) == entity.satellite_id)
+                    .outerjoin(
+                        GroundStation,
+                        col(GroundStation.id) == entity.ground_station_id,
+                    )
+                    .order_by(col(entity.start_time), col(entity.id))
+                )
+                if start is not None or end is not None:
+                    statement = statement.where(overlaps_window(db, entity, start, end))
+                if satellite_id is not None:
+                    statement = statement.where(
+                        col(entity.satellite_id) == satellite_id
+                    )
+                if station_id is not None:
+                    statement = statement.where(
+                        col(entity.ground_station_id) == station_id
+                    )
+                if after is not None:
+                    statement = statement.where(
+                        after_key([col(entity.start_time), col(entity.id)], after)
+                    )
+                if limit is not None:
+                    statement = statement.limit(limit)
+                rows.extend(db.exec(statement).all())  # type: ignore[arg-type]
+
+            rows.sort(key=lambda row: (row[0].start_time, row[0].id))
+            if limit is not None:
+                rows = rows[:limit]
             contacts: list[GeneralContactResponseModel] = []
-            all_requests: list[Request] = [*rf_requests, *c_requests]
-            for request in all_requests:
-                result = RequestService.transform_request_to_general(db, request)
-                if result is not None:
-                    contacts.append(result)
+            for request, satellite_name, gs_id in rows:
+                if request.ground_station_id is not None and gs_id is None:
+                    logger.error(
+                        f"Ground Station with ID {request.ground_station_id} not found"
+                    )
+                    raise HTTPException(
+                        status_code=404,
+                        detail=f"Ground Station with ID {request.ground_station_id} not found",
+                    )
+                if satellite_name is None:
+                    logger.error(f"Satellite with ID {request.satellite_id} not found")
+                    raise HTTPException(
+                        status_code=404,
+                        detail=f"Satellite with ID {request.satellite_id} not found",
+                    )
+                contacts.append(general_response(request, satellite_name))
             return contacts
         except SQLAlchemyError as e:
             db.rollback()
@@ -605,6 +1087,49 @@ class RequestService:
                 detail=f"Error getting all requests: {str(e)}",
             )
 
+    @staticmethod
+    def get_requests_in_window(
+        db: Session,
+        start: datetime.datetime,
+        end: datetime.datetime,
+        gs_ids: list[int] | None = None,
+        satellite_ids: list[UUID] | None = None,
+        request_type: str | None = None,
+        scheduled: bool | None = None,
+    ) -> list[Request]:
+        """Get the requests whose window overlaps [start, end)
+
+        The overlap test uses the window indexes of the request tables (see
+        overlaps_window), so the cost follows the size of the horizon rather
+        than the number of stored requests.
+
+        Args:
+            db (Session): Database session
+            start (datetime.datetime): Start of the horizon
+            end (datetime.datetime): End of the horizon
+            gs_ids (list[int] | None, optional): Only requests on these ground stations. Defaults to None, any.
+            satellite_ids (list[UUID] | None, optional): Only requests for these satellites. Defaults to None, any.
+            request_type (str | None, optional): "RFTime" or "Contact". Defaults to None, both.
+            scheduled (bool | None, optional): Only requests that are, or are not, scheduled. Defaults to None, both.
+
+        Returns:
+            list[Request]: RF requests then contacts, each sorted by start time
+        """
+        requests: list[Request] = []
+        for entity, name in ((RFRequest, "RFTime"), (ContactRequest, "Contact")):
+            if request_type is not None and request_type != name:
+                continue
+            statement = select(entity).where(overlaps_window(db, entity, start, end))
+            if gs_ids is not None:
+                statement = statement.where(col(entity.ground_station_id).in_(gs_ids))
+            if satellite_ids is not None:
+                statement = statement.where(col(entity.satellite_id).in_(satellite_ids))
+            if scheduled is not None:
+                statement = statement.where(col(entity.scheduled).is_(scheduled))
+            statement = statement.order_by(col(entity.start_time), col(entity.id))
+            requests.extend(db.exec(statement).all())  # type: ignore[arg-type]
+        return requests
+
     @staticmethod
     def transform_request_to_general(
         db: Session,
@@ -631,37 +1156,53 @@ class RequestService:
                 detail=f"Satellite with ID {request.satellite_id} not found",
             )
 
-        return GeneralContactResponseModel(
-            requestType="RFTime" if isinstance(request, RFRequest) else "Contact",
-            id=request.id,
-            mission=request.mission,
-            satellite_name=sat.name,
-            station_id=(
-                -1 if request.ground_station_id is None else request.ground_station_id
-            ),
-            uplink=request.uplink if isinstance(request, ContactRequest) else 0,
-            telemetry=(request.telemetry if isinstance(request, ContactRequest) else 0),
-            science=request.science if isinstance(request, ContactRequest) else 0,
-            startTime=request.start_time,
-            endTime=request.end_time,
-            duration=((request.end_time - request.start_time).total_seconds()),
-            aos=request.aos if isinstance(request, ContactRequest) else None,
-            rf_on=request.rf_on if isinstance(request, ContactRequest) else None,
-            rf_off=request.rf_off if isinstance(request, ContactRequest) else None,
-            los=request.los if isinstance(request, ContactRequest) else None,
-            orbit=request.orbit if isinstance(request, ContactRequest) else None,
+        return general_response(request, sat.name)
+
+    @staticmethod
+    def get_rf_pass_windows(
+        db: Session,
+        requests: list[Request],
+        stations: list[GroundStation],
+        slot_duration: int = 15 * 60,
+    ) -> dict[tuple[UUID, int], list[tuple[int, int]]]:
+        """Predict the passes of the RF request satellites over the request horizon
+
+        Args:
+            db (Session): Database session
+            requests (list[Request]): Requests that will be scheduled
+            stations (list[GroundStation]): Ground stations the requests can be scheduled on
+            slot_duration (int, optional): The length of each slot in seconds. Defaults to 15*60. 15 minutes.
+
+        Returns:
+            dict[tuple[UUID, int], list[tuple[int, int]]]: Pass windows by (satellite id, ground station id)
+        """
+        rf_requests = [r for r in requests if isinstance(r, RFRequest)]
+        if not rf_requests or not stations:
+            return {}
+        satellite_ids = {r.satellite_id for r in rf_requests}
+        satellites = [
+            sat
+            for sat in SatelliteService.get_satellites(db)
+            if sat.id in satellite_ids
+        ]
+        # the last slot of a window may run past its end
+        return pass_windows(
+            satellites,
+            stations,
+            min(r.start_time for r in rf_requests),
+            max(r.end_time for r in rf_requests)
+            + datetime.timedelta(seconds=slot_duration),
         )
 
     @staticmethod
     def get_bookings(db: Session) -> list[Booking]:
-        # get all requests and schedule them
         try:
-            requests = RequestService.get_all_requests(db)
-            bookings = schedule_with_slots(
-                requests,
-                list(GroundStationService.get_ground_stations(db)),
-            )
-            return bookings
+            rows = db.exec(
+                select(StationBooking).order_by(
+                    col(StationBooking.start_time), col(StationBooking.id)
+                )
+            ).all()
+            return [booking_from_row(row) for row in rows]
         except SQLAlchemyError as e:
             db.rollback()
             logger.error(f"Error getting bookings: {str(e)}")
@@ -676,6 +1217,304 @@ class RequestService:
                 detail=f"Error getting bookings: {str(e)}",
             )
 
+    @staticmethod
+    def reschedule_bookings(
+        db: Session,
+        mode: str | None = None,
+        improve_ms: int = 0,
+        start: datetime.datetime | None = None,
+    ) -> list[Booking]:
+        """Schedule the requests that have not ended yet from scratch and store their bookings
+
+        Only the requests whose window ends after start are read and rescheduled, the
+        bookings of earlier requests are kept as they are. replace_bookings repairs
+        any new booking that clashes with a kept one.
+
+        Args:
+            db (Session): Database session
+            mode (str | None, optional): "greedy" or "optimal". Defaults to None, SCHEDULER_MODE.
+            improve_ms (int, optional): Milliseconds of local search after scheduling. Defaults to 0.
+            start (datetime.datetime | None, optional): Start of the horizon. Defaults to None, now.
+
+        Returns:
+            list[Booking]: All stored bookings
+        """
+        # imported here as these build on the scheduler in this module
+        from app.services.components import schedule_components
+        from app.services.local_search import improve_schedule
+        from app.services.optimizer import SCHEDULER_MODE
+
+        mode = mode or SCHEDULER_MODE
+        if start is None:
+            start = datetime.datetime.now(datetime.timezone.utc)
+        try:
+            if mode not in ("greedy", "optimal"):
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Unknown scheduler mode {mode!r}, expected greedy or optimal",
+                )
+            requests = RequestService.get_requests_in_window(
+                db, start, datetime.datetime.max
+            )
+            stations = list(GroundStationService.get_ground_stations(db))
+            passes = RequestService.get_rf_pass_windows(db, requests, stations)
+            bookings = schedule_components(requests, stations, passes=passes, mode=mode)
+            if improve_ms > 0:
+                bookings = improve_schedule(
+                    requests, stations, bookings, improve_ms, passes=passes
+                )
+
+            RequestService.replace_bookings(db, requests, bookings)
+            db.commit()
+            return RequestService.get_bookings(db)
+        except HTTPException:
+            raise
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.error(f"Error rescheduling bookings: {str(e)}")
+            raise HTTPException(
+                status_code=503,
+                detail=f"Database error while rescheduling bookings: {str(e)}",
+            )
+        except Exception as e:
+            logger.error(f"Error rescheduling bookings: {str(e)}")
+            raise HTTPException(
+                status_code=500,
+                detail=f"Error rescheduling bookings: {str(e)}",
+            )
+
+    @staticmethod
+    def replace_bookings(db: Session, requests: list[Request], bookings: list[Booking]):
+        """Store the bookings of a full reschedule of requests, without committing
+
+        The scheduler works on a snapshot of the requests, and requests may have been
+        written while it ran. With the bookings lock held, only the bookings of the
+        snapshot requests that still exist are replaced: requests deleted since are
+        left out, and the bookings of requests created since are kept. A snapshot
+        request whose new bookings now clash with those is repaired instead.
+
+        Args:
+            db (Session): Database session the requests were read in
+            requests (list[Request]): The snapshot that was scheduled
+            bookings (list[Booking]): Its new bookings
+        """
+        lock_bookings(db)
+        # the snapshot holds unflushed changes of requests that may be gone
+        with db.no_autoflush:
+            alive = {
+                *db.exec(
+                    select(RFRequest.id).where(
+                        col(RFRequest.id).in_([r.id for r in requests])
+                    )
+                ).all(),
+                *db.exec(
+                    select(ContactRequest.id).where(
+                        col(ContactRequest.id).in_([r.id for r in requests])
+                    )
+                ).all(),
+            }
+        for request in requests:
+            if request.id not in alive:
+                db.expunge(request)
+        requests = [r for r in requests if r.id in alive]
+        db.exec(
+            delete(StationBooking).where(  # type: ignore[call-overload]
+                col(StationBooking.request_id).in_(alive)
+            )
+        )
+
+        # bookings made for other requests while the scheduler ran; with the margins
+        # each side holds, two bookings clash when they are closer than both margins
+        margin = SCHEDULER_SETUP_SECONDS + SCHEDULER_TEARDOWN_SECONDS
+        kept = OccupancyIndex()
+        bookings = [b for b in bookings if b.request_id in alive]
+        if bookings:
+            for row in RequestService.get_station_bookings(
+                db,
+                min(b.slot.start_time for b in bookings)
+                - datetime.timedelta(seconds=margin),
+                max(b.slot.end_time for b in bookings)
+                + datetime.timedelta(seconds=margin),
+            ):
+                kept.book(row.gs_id, to_epoch(row.start_time), to_epoch(row.end_time))
+        clashing = {
+            b.request_id
+            for b in bookings
+            if not kept.is_free(
+                b.gs_id,
+                to_epoch(b.slot.start_time) - margin,
+                to_epoch(b.slot.end_time) + margin,
+            )
+        }
+        RequestService.store_bookings(
+            db, requests, [b for b in bookings if b.request_id not in clashing]
+        )
+        db.add_all(requests)
+        if clashing:
+            logger.info(
+                f"Repairing {len(clashing)} requests that clash with bookings made "
+                "during the reschedule"
+            )
+            db.flush()
+            RequestService.repair_bookings(
+                db, [r for r in requests if r.id in clashing]
+            )
+
+    @staticmethod
+    def get_station_bookings(
+        db: Session,
+        start_time: datetime.datetime,
+        end_time: datetime.datetime,
+        gs_ids: list[int] | None = None,
+    ) -> list[StationBooking]:
+        """Get the stored bookings that overlap [start_time, end_time)
+
+        Args:
+            db (Session): Database session
+            start_time (datetime.datetime): Start of the time range
+            end_time (datetime.datetime): End of the time range
+            gs_ids (list[int] | None, optional): Only return the bookings of these ground stations. Defaults to None, all of them.
+
+        Returns:
+            list[StationBooking]: The bookings, sorted by start time
+        """
+        statement = select(StationBooking).where(
+            overlaps_window(db, StationBooking, start_time, end_time)
+        )
+        if gs_ids is not None:
+            statement = statement.where(col(StationBooking.gs_id).in_(gs_ids))
+        return list(db.exec(statement.order_by(col(StationBooking.start_time))).all())
+
+    @staticmethod
+    def store_bookings(db: Session, requests: list[Request], bookings: list[Booking]):
+        """Add the rows of new bookings to the session, without committing"""
+        types = {
+            r.id: "RFTime" if isinstance(r, RFRequest) else "Contact" for r in requests
+        }
+        db.add_all(
+            StationBooking(
+                id=booking.id,
+                request_id=booking.request_id,
+                request_type=types[booking.request_id],
+                gs_id=booking.gs_id,
+                start_time=naive_utc(booking.slot.start_time),
+                end_time=naive_utc(booking.slot.end_time),
+            )
+            for booking in bookings
+        )
+
+    @staticmethod
+    def repair_bookings(
+        db: Session, requests: list[Request], slot_duration: int = 15 * 60
+    ) -> list[Booking]:
+        """Reschedule some requests around the stored bookings of all the others
+
+        The bookings of requests are dropped, then only the bookings stored over their
+        windows are loaded and the requests are scheduled into the gaps. The cost
+        depends on the requests being repaired, not on the size of the schedule.
+        Nothing is committed.
+
+        Args:
+            db (Session): Database session
+            requests (list[Request]): Requests to reschedule, e.g. one that was just created
+            slot_duration (int, optional): The length of each slot in seconds. Defaults to 15*60. 15 minutes.
+
+        Returns:
+            list[Booking]: The new bookings of requests
+        """
+        if not requests:
+            return []
+        lock_bookings(db)
+        for row in db.exec(
+            select(StationBooking).where(
+                col(StationBooking.request_id).in_([r.id for r in requests])
+            )
+        ).all():
+            db.delete(row)
+        db.flush()
+
+        stations = list(GroundStationService.get_ground_stations(db))
+        known = {gs.id for gs in stations}
+        # a contact on a station that does not exist cannot be booked
+        schedulable = [
+            r
+            for r in requests
+            if isinstance(r, RFRequest) or r.ground_station_id in known
+        ]
+        for request in requests:
+            request.scheduled = False
+            db.add(request)
+        if not schedulable:
+            return []
+
+        start = min(to_epoch(r.start_time) for r in schedulable)
+        start -= SCHEDULER_SETUP_SECONDS
+        end = max(to_epoch(r.end_time) for r in schedulable) + slot_duration
+        end += SCHEDULER_TEARDOWN_SECONDS
+        occupancy = create_occupancy(start, end)
+        # stored bookings hold their stations for the margins too, clipped to the
+        # previous booking in case the margins grew since they were made
+        held: dict[int, int] = {}
+        for row in RequestService.get_station_bookings(
+            db,
+            from_epoch(start - SCHEDULER_TEARDOWN_SECONDS, NAIVE_UTC),
+            from_epoch(end + SCHEDULER_SETUP_SECONDS, NAIVE_UTC),
+        ):
+            first = max(
+                to_epoch(row.start_time) - SCHEDULER_SETUP_SECONDS,
+                held.get(row.gs_id, start),
+            )
+            last = min(to_epoch(row.end_time) + SCHEDULER_TEARDOWN_SECONDS, end)
+            if first < last:
+                occupancy.book(row.gs_id, first, last, row)
+                held[row.gs_id] = last
+
+        bookings = schedule_with_slots(
+            schedulable,
+            stations,
+            occupancy,
+            slot_duration,
+            passes=RequestService.get_rf_pass_windows(
+                db, schedulable, stations, slot_duration
+            ),
+        )
+        RequestService.store_bookings(db, schedulable, bookings)
+        return bookings
+
+    @staticmethod
+    def release_bookings(db: Session, request: Request):
+        """Drop the bookings of a request that is being deleted and repair the
+        unscheduled requests that could use the freed time. Nothing is committed.
+        """
+        lock_bookings(db)
+        rows = list(
+            db.exec(
+                select(StationBooking).where(StationBooking.request_id == request.id)
+            ).all()
+        )
+        if not rows:
+            return
+        start = min(row.start_time for row in rows)
+        end = max(row.end_time for row in rows)
+        gs_ids = list({row.gs_id for row in rows})
+        for row in rows:
+            db.delete(row)
+        db.flush()
+
+        waiting = [
+            r
+            for r in [
+                *RequestService.get_requests_in_window(
+                    db, start, end, request_type="RFTime", scheduled=False
+                ),
+                *RequestService.get_requests_in_window(
+                    db, start, end, gs_ids, request_type="Contact", scheduled=False
+                ),
+            ]
+            if r.id != request.id
+        ]
+        RequestService.repair_bookings(db, waiting)
+
     @staticmethod
     def sample(
         db: Session,
@@ -756,6 +1595,7 @@ class RequestService:
         # commit requests to db
         for request in requests:
             db.add(request)
+        RequestService.repair_bookings(db, requests)
         db.commit()
         for request in requests:
             result = RequestService.transform_request_to_general(db, request)
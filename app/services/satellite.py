@@ -1,13 +1,18 @@
 import uuid
 from fastapi import HTTPException
 from sqlalchemy.exc import SQLAlchemyError
-from sqlmodel import select, Session
-from sqlalchemy.orm import joinedload
+from sqlmodel import col, select, Session
+from sqlalchemy.orm import joinedload, selectinload
 from app.models.satellite import (
     SatelliteCreateModel,
     SatelliteUpdateModel,
 )
 from app.entities.Satellite import Satellite
+from app.services.entity_cache import entity_cache
+from app.services.ephemeris import ephemeris_store
+from app.services.exclusion_cache import exclusion_window_cache
+from app.services.pagination import after_key, decode_cursor
+from app.services.propagation import propagator_cache
 
 
 class SatelliteService:
@@ -20,6 +25,8 @@ class SatelliteService:
             db.add(sat)
             db.commit()
             db.refresh(sat)
+            exclusion_window_cache.invalidate()
+            entity_cache.invalidate()
             return sat
 
         except SQLAlchemyError as e:
@@ -49,11 +56,18 @@ class SatelliteService:
                 )
 
             update_data = satellite.model_dump(exclude_unset=True)
+            old_tle = existing_sat.tle
             for key, value in update_data.items():
                 setattr(existing_sat, key, value)
 
             db.commit()
             db.refresh(existing_sat)
+
+            if existing_sat.tle != old_tle:
+                propagator_cache.invalidate(old_tle)
+                ephemeris_store.invalidate(sat_id)
+            exclusion_window_cache.invalidate()
+            entity_cache.invalidate()
             return existing_sat
 
         except HTTPException as http_e:
@@ -71,14 +85,47 @@ class SatelliteService:
             )
 
     @staticmethod
-    def get_satellites(db: Session) -> list[Satellite]:
+    def get_satellites(
+        db: Session, limit: int | None = None, cursor: str | None = None
+    ) -> list[Satellite]:
+        """Get the satellites ordered by id, optionally one page at a time
+
+        Exclusion cones are loaded with a second query rather than joined, so the
+        limit applies to satellites and not to satellite and cone pairs. The full
+        list is read through the entity cache.
+
+        Args:
+            db (Session): Database session
+            limit (int | None, optional): Number of satellites to return. Defaults to None, all of them.
+            cursor (str | None, optional): Cursor of the last satellite of the previous page, see encode_cursor. Defaults to None.
+
+        Returns:
+            list[Satellite]: The satellites
+        """
         # TODO: Before we service the request in the future we must first validate that request is legitimate (token validation)
         # TODO: Check user permissions to filter which satellites to return
         try:
-            statement = select(Satellite).options(joinedload(Satellite.ex_cones))
-            satellites = db.exec(statement).unique().all()
+            statement = (
+                select(Satellite)
+                .options(selectinload(Satellite.ex_cones))
+                .order_by(col(Satellite.id))
+            )
+            if cursor is not None:
+                statement = statement.where(
+                    after_key([col(Satellite.id)], decode_cursor(cursor, uuid.UUID))
+                )
+            if limit is not None:
+                statement = statement.limit(limit)
+            if limit is None and cursor is None:
+                return entity_cache.load(
+                    db, ("satellites",), lambda: list(db.exec(statement).all())
+                )
+            satellites = db.exec(statement).all()
             return list(satellites)
 
+        except HTTPException as http_e:
+            raise http_e
+
         except SQLAlchemyError as e:
             raise HTTPException(
                 status_code=503,
@@ -100,7 +147,9 @@ class SatelliteService:
                 .where(Satellite.id == sat_id)
                 .options(joinedload(Satellite.ex_cones))
             )
-            satellite = db.exec(statement).unique().first()
+            satellite = entity_cache.load(
+                db, ("satellite", sat_id), lambda: db.exec(statement).unique().first()
+            )
 
             if satellite is None:
                 raise HTTPException(
@@ -141,6 +190,10 @@ class SatelliteService:
 
             db.delete(satellite)
             db.commit()
+            propagator_cache.invalidate(satellite.tle)
+            ephemeris_store.invalidate(sat_id)
+            exclusion_window_cache.invalidate()
+            entity_cache.invalidate()
             return satellite
 
         except HTTPException as http_e:
@@ -0,0 +1,266 @@
+import datetime
+import logging
+import os
+import threading
+import time
+from typing import Callable
+import uuid
+from fastapi import HTTPException
+from pydantic import TypeAdapter
+from sqlmodel import Session, col, delete, select
+from app.entities.SchedulerJob import SchedulerJob, utc_now
+from app.services.db import engine
+from app.services.optimizer import SCHEDULER_MODE
+from app.services.request import Booking, RequestService, lock_bookings
+
+logger = logging.getLogger(__name__)
+
+# quiet time after the last submission before a queued job starts, so a burst of
+# request writes results in a single rerun
+SCHEDULER_JOB_DEBOUNCE_SECONDS = float(os.getenv("SCHEDULER_JOB_DEBOUNCE_SECONDS", "2"))
+# finished jobs kept for status polling
+SCHEDULER_JOB_HISTORY = int(os.getenv("SCHEDULER_JOB_HISTORY", "100"))
+# how often a worker process looks again for a job while another one runs a job
+SCHEDULER_JOB_POLL_SECONDS = float(os.getenv("SCHEDULER_JOB_POLL_SECONDS", "1"))
+# a job running for longer is taken as abandoned by a worker process that died
+SCHEDULER_JOB_STALE_SECONDS = float(os.getenv("SCHEDULER_JOB_STALE_SECONDS", "3600"))
+# submit a full reschedule after every request create or delete; off by default
+# since writes already repair the bookings they touch, and a full rerun issues new
+# ids for every booking
+SCHEDULER_RERUN_ON_WRITE = (
+    os.getenv("SCHEDULER_RERUN_ON_WRITE", "false").lower() == "true"
+)
+
+
+_bookings_adapter = TypeAdapter(list[Booking])
+
+
+def _open_session() -> Session:
+    return Session(engine, expire_on_commit=False)
+
+
+class SchedulerQueue:
+    """Queue of reschedule jobs stored in the database, run one at a time
+
+    Every worker process has a queue with a thread that runs the jobs. Jobs are
+    rows of the scheduler_jobs table, so a job submitted to one process can be
+    polled through any other, and a process only starts a job while no job is
+    running in any of them. Submissions and job starts take the bookings lock, so
+    on PostgreSQL they are serialized across processes.
+
+    A submission joins the queued job with the same parameters if there is one, and
+    a queued job only starts once no submission joined it for debounce_seconds. A
+    job that is already running is never joined, since it may have read the
+    requests before the write that triggered the submission.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = _open_session,
+        debounce_seconds: float = SCHEDULER_JOB_DEBOUNCE_SECONDS,
+        history: int = SCHEDULER_JOB_HISTORY,
+        poll_seconds: float = SCHEDULER_JOB_POLL_SECONDS,
+        stale_seconds: float = SCHEDULER_JOB_STALE_SECONDS,
+    ) -> None:
+        self.session_factory = session_factory
+        self.debounce_seconds = debounce_seconds
+        self.history = history
+        self.poll_seconds = poll_seconds
+        self.stale_seconds = stale_seconds
+        self._submit_lock = threading.Lock()
+        self._condition = threading.Condition()
+        # bumped by every submission, so the worker never sleeps through one
+        self._submissions = 0
+        self._worker: threading.Thread | None = None
+        self._stopping = False
+
+    def submit(self, mode: str | None = None, improve_ms: int = 0) -> SchedulerJob:
+        """Queue a full reschedule, or join the queued one with the same parameters
+
+        Args:
+            mode (str | None, optional): "greedy" or "optimal". Defaults to None, the SCHEDULER_MODE setting.
+            improve_ms (int, optional): Milliseconds of local search after scheduling. Defaults to 0.
+
+        Returns:
+            SchedulerJob: The job that will run the reschedule
+        """
+        mode = mode or SCHEDULER_MODE
+        with self._submit_lock, self.session_factory() as db:
+            lock_bookings(db)
+            job = db.exec(
+                select(SchedulerJob).where(
+                    SchedulerJob.status == "queued",
+                    SchedulerJob.mode == mode,
+                    SchedulerJob.improve_ms == improve_ms,
+                )
+            ).first()
+            if job is None:
+                job = SchedulerJob(mode=mode, improve_ms=improve_ms)
+                db.add(job)
+            else:
+                job.submissions += 1
+                job.last_submitted_at = utc_now()
+            db.commit()
+            db.refresh(job)
+
+        with self._condition:
+            self._submissions += 1
+            if self._worker is None or not self._worker.is_alive():
+                self._stopping = False
+                self._worker = threading.Thread(
+                    target=self._run, name="scheduler-jobs", daemon=True
+                )
+                self._worker.start()
+            self._condition.notify_all()
+        return job
+
+    def get(self, job_id: uuid.UUID) -> SchedulerJob | None:
+        with self.session_factory() as db:
+            return db.get(SchedulerJob, job_id)
+
+    def wait(self, job: SchedulerJob, timeout: float | None = None) -> bool:
+        """Block until job finished, True unless the timeout was reached"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            current = self.get(job.id)
+            if current is None or current.status in ("done", "failed"):
+                return True
+            wait = self.poll_seconds
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            with self._condition:
+                self._condition.wait(wait)
+
+    def shutdown(self, timeout: float | None = None):
+        """Stop the worker once the running job, if any, is done. Queued jobs stay stored."""
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+            worker = self._worker
+        if worker is not None:
+            worker.join(timeout)
+
+    def _claim(self, db: Session) -> SchedulerJob | float | None:
+        """Start the next due job
+
+        Returns:
+            SchedulerJob | float | None: The started job, else the seconds to wait before
+                looking again, or None if no job is queued
+        """
+        lock_bookings(db)
+        now = utc_now()
+        stale = now - datetime.timedelta(seconds=self.stale_seconds)
+        busy = False
+        for running in db.exec(
+            select(SchedulerJob).where(SchedulerJob.status == "running")
+        ).all():
+            if running.started_at is not None and running.started_at < stale:
+                running.status = "failed"
+                running.error = "Abandoned by the worker process running it"
+                running.finished_at = now
+                db.add(running)
+            else:
+                busy = True
+        if busy:
+            db.commit()
+            return self.poll_seconds
+
+        job = db.exec(
+            select(SchedulerJob)
+            .where(SchedulerJob.status == "queued")
+            .order_by(col(SchedulerJob.submitted_at))
+        ).first()
+        if job is None:
+            db.commit()
+            return None
+        remaining = (
+            job.last_submitted_at
+            + datetime.timedelta(seconds=self.debounce_seconds)
+            - now
+        ).total_seconds()
+        if remaining > 0:
+            db.commit()
+            return remaining
+
+        job.status = "running"
+        job.started_at = now
+        db.commit()
+        db.refresh(job)
+        return job
+
+    def _next_job(self) -> SchedulerJob | None:
+        while True:
+            with self._condition:
+                if self._stopping:
+                    return None
+                submissions = self._submissions
+            try:
+                with self.session_factory() as db:
+                    claimed = self._claim(db)
+            except Exception as e:
+                logger.error(f"Error looking for scheduler jobs: {str(e)}")
+                claimed = self.poll_seconds
+            if isinstance(claimed, SchedulerJob):
+                return claimed
+            with self._condition:
+                if not self._stopping and submissions == self._submissions:
+                    self._condition.wait(claimed)
+
+    def _finish(
+        self, job_id: uuid.UUID, result: list[Booking] | None, error: str | None
+    ):
+        """Store the outcome of a job and drop the oldest finished jobs beyond history"""
+        with self.session_factory() as db:
+            job = db.get(SchedulerJob, job_id)
+            if job is not None:
+                job.result = (
+                    None
+                    if result is None
+                    else _bookings_adapter.dump_python(result, mode="json")
+                )
+                job.error = error
+                job.status = "failed" if error is not None else "done"
+                job.finished_at = utc_now()
+                db.add(job)
+                db.flush()
+            finished = col(SchedulerJob.status).in_(["done", "failed"])
+            old = db.exec(
+                select(SchedulerJob.id)
+                .where(finished)
+                .order_by(col(SchedulerJob.finished_at).desc())
+                .offset(self.history)
+            ).all()
+            if old:
+                db.exec(delete(SchedulerJob).where(col(SchedulerJob.id).in_(old)))  # type: ignore[call-overload]
+            db.commit()
+
+    def _run(self):
+        while (job := self._next_job()) is not None:
+            logger.info(
+                f"Running scheduler job {job.id} ({job.submissions} submissions)"
+            )
+            result, error = None, None
+            try:
+                with self.session_factory() as db:
+                    result = RequestService.reschedule_bookings(
+                        db, job.mode, job.improve_ms
+                    )
+            except HTTPException as e:
+                error = str(e.detail)
+            except Exception as e:
+                error = str(e)
+            if error is not None:
+                logger.error(f"Scheduler job {job.id} failed: {error}")
+
+            try:
+                self._finish(job.id, result, error)
+            except Exception as e:
+                logger.error(f"Error storing scheduler job {job.id}: {str(e)}")
+            with self._condition:
+                self._condition.notify_all()
+
+
+scheduler_queue = SchedulerQueue()
@@ -0,0 +1,186 @@
+from dataclasses import dataclass
+import math
+import os
+from typing import Callable
+import numpy as np
+from skyfield.api import EarthSatellite
+
+SCREENING_ENABLED = os.getenv("SCREENING_ENABLED", "true").lower() == "true"
+# spacing of the coarse samples used to rule out windows
+SCREENING_STEP_SECONDS = int(os.getenv("SCREENING_STEP_SECONDS", "300"))
+# extra angle added to every coverage test, covers the spherical Earth approximation
+SCREENING_MARGIN_DEGREES = float(os.getenv("SCREENING_MARGIN_DEGREES", "1.0"))
+
+_MU_EARTH = 398600.4418  # km^3/s^2
+_EARTH_ROTATION = 7.2921159e-5  # rad/s
+# headroom on the ground track rate, for drag lowering the orbit over the horizon
+_RATE_SAFETY = 1.05
+
+
+@dataclass(frozen=True)
+class OrbitBounds:
+    """Bounds on where a satellite can be, derived from its mean elements"""
+
+    # highest geocentric latitude reached, in radians
+    max_latitude: float
+    # largest distance from the Earth's center, in km
+    apogee_radius: float
+    # upper bound on how fast the sub-satellite point moves, in radians per second
+    max_rate: float
+
+
+def orbit_bounds(satellite: EarthSatellite) -> OrbitBounds:
+    """Get the bounds of a satellite's orbit from its SGP4 elements
+
+    Args:
+        satellite (EarthSatellite): Satellite to bound
+
+    Returns:
+        OrbitBounds: Latitude, altitude and ground track rate bounds
+    """
+    model = satellite.model
+    inclination = model.inclo
+    eccentricity = model.ecco
+    semi_major_axis = model.a * model.radiusearthkm
+
+    perigee = semi_major_axis * (1 - eccentricity)
+    # the inertial angular rate peaks at perigee: h / r_p^2
+    angular_momentum = math.sqrt(_MU_EARTH * semi_major_axis * (1 - eccentricity**2))
+    return OrbitBounds(
+        max_latitude=min(inclination, math.pi - inclination),
+        apogee_radius=semi_major_axis * (1 + eccentricity),
+        max_rate=(angular_momentum / perigee**2 + _EARTH_ROTATION) * _RATE_SAFETY,
+    )
+
+
+def coverage_angle(
+    orbit_radius: float, station_radius: np.ndarray, mask_degrees: np.ndarray
+) -> np.ndarray:
+    """Earth central angle between a station and the farthest sub-satellite point it can see
+
+    Args:
+        orbit_radius (float): Distance of the satellite from the Earth's center in km
+        station_radius (np.ndarray): Distance of each station from the Earth's center in km
+        mask_degrees (np.ndarray): Minimum elevation of each station
+
+    Returns:
+        np.ndarray: Angle in radians, one per station
+    """
+    mask = np.radians(mask_degrees)
+    ratio = np.clip(station_radius * np.cos(mask) / orbit_radius, -1.0, 1.0)
+    return np.maximum(np.arccos(ratio) - mask, 0.0)
+
+
+def reachable_stations(
+    bounds: OrbitBounds, station_positions: np.ndarray, masks: np.ndarray
+) -> np.ndarray:
+    """Rule out the stations a satellite can never see, whatever the time
+
+    A station can only see the satellite if its latitude is within the coverage angle
+    of the highest latitude reached by the ground track.
+
+    Args:
+        bounds (OrbitBounds): Bounds of the satellite's orbit
+        station_positions (np.ndarray): Station ITRF positions in km, shape [stations, 3]
+        masks (np.ndarray): Minimum elevation of each station in degrees
+
+    Returns:
+        np.ndarray: Boolean mask, False for the stations that can be skipped
+    """
+    radius = np.linalg.norm(station_positions, axis=1)
+    latitude = np.arcsin(station_positions[:, 2] / radius)
+    reach = coverage_angle(bounds.apogee_radius, radius, masks)
+    return np.abs(latitude) - bounds.max_latitude <= reach + np.radians(
+        SCREENING_MARGIN_DEGREES
+    )
+
+
+def candidate_samples(
+    bounds: OrbitBounds,
+    sat_positions: np.ndarray,
+    station_positions: np.ndarray,
+    masks: np.ndarray,
+    spacing_seconds: float,
+) -> np.ndarray:
+    """Flag the coarse samples around which a station might see the satellite
+
+    Between two samples the sub-satellite point moves by at most max_rate times the
+    spacing, so any instant the satellite is visible lies within half a spacing of a
+    sample whose central angle to the station is below the coverage angle plus that
+    distance.
+
+    Args:
+        bounds (OrbitBounds): Bounds of the satellite's orbit
+        sat_positions (np.ndarray): Satellite ITRF positions in km at the coarse samples, shape [3, samples]
+        station_positions (np.ndarray): Station ITRF positions in km, shape [stations, 3]
+        masks (np.ndarray): Minimum elevation of each station in degrees
+        spacing_seconds (float): Time between two coarse samples
+
+    Returns:
+        np.ndarray: Boolean array of shape [stations, samples]
+    """
+    station_radius = np.linalg.norm(station_positions, axis=1)
+    limit = (
+        coverage_angle(bounds.apogee_radius, station_radius, masks)
+        + bounds.max_rate * spacing_seconds / 2
+        + np.radians(SCREENING_MARGIN_DEGREES)
+    )
+
+    sat_unit = sat_positions / np.linalg.norm(sat_positions, axis=0)
+    station_unit = station_positions / station_radius[:, np.newaxis]
+    cos_angle = station_unit @ sat_unit
+    return cos_angle >= np.cos(np.minimum(limit, math.pi))[:, np.newaxis]
+
+
+def candidate_indices(
+    satellite: EarthSatellite,
+    count: int,
+    step_seconds: float,
+    station_positions: np.ndarray,
+    masks: np.ndarray,
+    positions_at: Callable[[np.ndarray], np.ndarray],
+) -> np.ndarray | None:
+    """Indices of a regular time grid at which any station might see a satellite
+
+    The grid is subsampled to roughly SCREENING_STEP_SECONDS, and every fine sample
+    within half a coarse spacing of a candidate coarse sample is kept. Only those
+    samples need fine propagation and elevation checks.
+
+    Args:
+        satellite (EarthSatellite): Satellite to screen
+        count (int): Number of samples in the grid
+        step_seconds (float): Spacing of the grid in seconds
+        station_positions (np.ndarray): Station ITRF positions in km, shape [stations, 3]
+        masks (np.ndarray): Minimum elevation of each station in degrees
+        positions_at (Callable[[np.ndarray], np.ndarray]): Satellite ITRF positions in km at some sample indices, shape [3, indices]
+
+    Returns:
+        np.ndarray | None: Sorted sample indices, or None when the grid is already
+            coarser than the screening step and screening would not save anything
+    """
+    stride = int(SCREENING_STEP_SECONDS // step_seconds)
+    if stride < 2 or count == 0:
+        return None
+
+    bounds = orbit_bounds(satellite)
+    reachable = reachable_stations(bounds, station_positions, masks)
+    if not reachable.any():
+        return np.empty(0, dtype=np.intp)
+
+    coarse = np.unique(np.append(np.arange(0, count, stride), count - 1))
+    hits = coarse[
+        candidate_samples(
+            bounds,
+            positions_at(coarse),
+            station_positions[reachable],
+            masks[reachable],
+            stride * step_seconds,
+        ).any(axis=0)
+    ]
+
+    # every visible instant is within half a stride of a candidate coarse sample
+    reach = stride // 2 + 1
+    edges = np.zeros(count + 1, dtype=np.int32)
+    np.add.at(edges, np.maximum(hits - reach, 0), 1)
+    np.add.at(edges, np.minimum(hits + reach + 1, count), -1)
+    return np.flatnonzero(np.cumsum(edges[:-1]) > 0)
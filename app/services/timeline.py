@@ -0,0 +1,183 @@
+import datetime
+import os
+from typing import Any, Protocol
+import numpy as np
+from app.services.occupancy import OccupancyIndex
+from app.services.propagation import as_utc
+
+# "intervals" for the exact sorted interval index, "bitmap" for Timeline
+SCHEDULER_OCCUPANCY = os.getenv("SCHEDULER_OCCUPANCY", "intervals")
+TIMELINE_RESOLUTION_SECONDS = int(os.getenv("TIMELINE_RESOLUTION_SECONDS", "60"))
+
+
+def to_epoch(time: datetime.datetime) -> int:
+    """Whole Unix seconds of a datetime, naive datetimes are taken as UTC"""
+    return int(as_utc(time).timestamp())
+
+
+def from_epoch(seconds: int, like: datetime.datetime) -> datetime.datetime:
+    """Convert Unix seconds back to a datetime, naive if like is naive"""
+    time = datetime.datetime.fromtimestamp(seconds, datetime.timezone.utc)
+    return time.replace(tzinfo=None) if like.tzinfo is None else time
+
+
+def slot_starts(start: int, end: int, slot_duration: int = 15 * 60) -> np.ndarray:
+    """Integer counterpart of divide_into_slots: the start of every slot in [start, end)
+
+    Args:
+        start (int): Start of the time window in Unix seconds
+        end (int): End of the time window in Unix seconds
+        slot_duration (int, optional): The length of each slot in seconds. Defaults to 15*60. 15 minutes.
+
+    Returns:
+        np.ndarray: Slot starts in Unix seconds, each slot lasting slot_duration
+    """
+    return np.arange(start, end, slot_duration, dtype=np.int64)
+
+
+class Occupancy(Protocol):
+    """What the scheduler needs from a station occupancy representation"""
+
+    def is_free(self, gs_id: int, start: int, end: int) -> bool: ...
+
+    def find_gap(
+        self, gs_id: int, start: int, end: int, duration: int
+    ) -> float | None: ...
+
+    def copy(self) -> "Occupancy": ...
+
+    def book(self, gs_id: int, start: int, end: int, item: Any = None) -> None: ...
+
+
+class Timeline:
+    """Occupancy of the ground stations over a fixed horizon, one bitmap per station
+
+    Each cell covers resolution seconds and is set when any booking touches it, so
+    bookings that do not fall on cell boundaries block the whole cells they touch.
+    Checking an interval is a slice and any(); a year at 60 s is 512 KiB per station.
+    Station bitmaps are allocated on first use.
+    """
+
+    def __init__(
+        self, start: int, end: int, resolution: int = TIMELINE_RESOLUTION_SECONDS
+    ):
+        if end <= start:
+            raise ValueError(f"Timeline [{start}, {end}) is empty")
+        self.start = start
+        self.resolution = resolution
+        self.size = -(-(end - start) // resolution)
+        self._bitmaps: dict[int, np.ndarray] = {}
+
+    @property
+    def end(self) -> int:
+        return self.start + self.size * self.resolution
+
+    def bitmap(self, gs_id: int) -> np.ndarray:
+        bitmap = self._bitmaps.get(gs_id)
+        if bitmap is None:
+            bitmap = self._bitmaps[gs_id] = np.zeros(self.size, dtype=np.bool_)
+        return bitmap
+
+    def cells(self, start: int, end: int) -> slice:
+        """Slice of the cells touched by [start, end)
+
+        Raises:
+            ValueError: If the interval is empty or falls outside of the timeline
+        """
+        if end <= start:
+            raise ValueError(f"Interval [{start}, {end}) is empty")
+        if start < self.start or end > self.end:
+            raise ValueError(
+                f"Interval [{start}, {end}) is outside of the timeline [{self.start}, {self.end})"
+            )
+        first = (start - self.start) // self.resolution
+        last = -(-(end - self.start) // self.resolution)
+        return slice(first, last)
+
+    def is_free(self, gs_id: int, start: int, end: int) -> bool:
+        bitmap = self._bitmaps.get(gs_id)
+        return bitmap is None or not bitmap[self.cells(start, end)].any()
+
+    def free_stations(self, gs_ids: list[int], start: int, end: int) -> np.ndarray:
+        """Check several stations at once
+
+        Args:
+            gs_ids (list[int]): IDs of the ground stations
+            start (int): Start of the interval in Unix seconds
+            end (int): End of the interval in Unix seconds
+
+        Returns:
+            np.ndarray: Boolean mask, True for the stations free for the whole interval
+        """
+        cells = self.cells(start, end)
+        return np.array([not self.bitmap(gs_id)[cells].any() for gs_id in gs_ids])
+
+    def find_gap(self, gs_id: int, start: int, end: int, duration: int) -> int | None:
+        """Find the earliest free interval of a given length within [start, end)
+
+        Busy cells block their whole resolution, so a gap starts at start or at the
+        end of a busy cell. The search is clipped to the timeline.
+
+        Args:
+            gs_id (int): ID of the ground station
+            start (int): Earliest start of the gap in Unix seconds
+            end (int): Latest end of the gap in Unix seconds
+            duration (int): Length of the gap in seconds
+
+        Returns:
+            int | None: Start of the gap, None if there is no such gap
+        """
+        start, end = max(start, self.start), min(end, self.end)
+        if start + duration > end:
+            return None
+        bitmap = self._bitmaps.get(gs_id)
+        if bitmap is None:
+            return start
+
+        cells = self.cells(start, end)
+        t = start
+        for cell in (np.flatnonzero(bitmap[cells]) + cells.start).tolist():
+            cell_start = self.start + cell * self.resolution
+            if t + duration <= cell_start:
+                return t
+            t = max(t, cell_start + self.resolution)
+            if t + duration > end:
+                return None
+        return t
+
+    def book(self, gs_id: int, start: int, end: int, item: Any = None):
+        cells = self.cells(start, end)
+        bitmap = self.bitmap(gs_id)
+        if bitmap[cells].any():
+            raise ValueError(f"Interval [{start}, {end}) overlaps a busy interval")
+        bitmap[cells] = True
+
+    def copy(self) -> "Timeline":
+        other = Timeline(self.start, self.end, self.resolution)
+        other._bitmaps = {
+            gs_id: bitmap.copy() for gs_id, bitmap in self._bitmaps.items()
+        }
+        return other
+
+    def nbytes(self) -> int:
+        return sum(bitmap.nbytes for bitmap in self._bitmaps.values())
+
+
+def create_occupancy(
+    start: int, end: int, kind: str = SCHEDULER_OCCUPANCY
+) -> Occupancy:
+    """Create an empty occupancy for a scheduling horizon
+
+    Args:
+        start (int): Start of the horizon in Unix seconds
+        end (int): End of the horizon in Unix seconds
+        kind (str, optional): "intervals" or "bitmap". Defaults to SCHEDULER_OCCUPANCY.
+
+    Returns:
+        Occupancy: The occupancy
+    """
+    if kind == "bitmap":
+        return Timeline(start, max(end, start + 1))
+    if kind == "intervals":
+        return OccupancyIndex()
+    raise ValueError(f"Unknown occupancy representation {kind!r}")
@@ -1,9 +1,10 @@
 from fastapi import HTTPException
 from sqlalchemy.exc import SQLAlchemyError
-from sqlmodel import select, Session
+from sqlmodel import col, select, Session
 from app.models.user import UserModel, UserUpdateModel
 from app.entities.User import User
 from app.services.auth import get_password_hash
+from app.services.pagination import after_key, decode_cursor
 
 
 class UserService:
@@ -41,12 +42,23 @@ class UserService:
             )
 
     @staticmethod
-    def get_users(db: Session, current_user: UserModel) -> list[User]:
+    def get_users(
+        db: Session,
+        current_user: UserModel,
+        limit: int | None = None,
+        cursor: str | None = None,
+    ) -> list[User]:
         try:
             if current_user.role != "admin":
                 raise HTTPException(status_code=403, detail="Permission denied")
 
-            statement = select(User)
+            statement = select(User).order_by(col(User.id))
+            if cursor is not None:
+                statement = statement.where(
+                    after_key([col(User.id)], decode_cursor(cursor, int))
+                )
+            if limit is not None:
+                statement = statement.limit(limit)
             users = db.exec(statement).all()
 
             return list(users)
@@ -0,0 +1,281 @@
+import base64
+import datetime
+import logging
+import numpy as np
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.exc import SQLAlchemyError
+from sqlmodel import Session
+from app.entities.GroundStation import GroundStation
+from app.entities.Satellite import Satellite
+from app.models.visibility import (
+    VISIBILITY_MATRIX_MAX_CELLS,
+    VisibilityMatrixRequestModel,
+)
+from app.services.compute_pool import (
+    chunked,
+    read_shared_array,
+    run_chunks,
+    shared_block,
+    write_shared_array,
+)
+from app.services.ephemeris import EphemerisStore, EPHEMERIS_ENABLED, ephemeris_store
+from app.services.geometry import station_frames, time_grid
+from app.services.passes import load_network
+from app.services.propagation import satellite_itrf
+from app.services.screening import SCREENING_ENABLED, candidate_indices
+
+logger = logging.getLogger(__name__)
+
+
+def elevations_from_itrf(
+    sat_positions: np.ndarray, positions: np.ndarray, zeniths: np.ndarray
+) -> np.ndarray:
+    """Elevation of a satellite above each station's horizon
+
+    Args:
+        sat_positions (np.ndarray): Satellite ITRF positions in km, shape [3, times]
+        positions (np.ndarray): Station ITRF positions in km, shape [stations, 3]
+        zeniths (np.ndarray): Station unit zenith vectors, shape [stations, 3]
+
+    Returns:
+        np.ndarray: Elevations in degrees, shape [stations, times]
+    """
+    # line of sight from every station to every sample, shape [stations, 3, times]
+    los = sat_positions[np.newaxis, :, :] - positions[:, :, np.newaxis]
+    sin_elevation = np.einsum("gk,gkt->gt", zeniths, los) / np.linalg.norm(los, axis=1)
+    return np.degrees(np.arcsin(np.clip(sin_elevation, -1.0, 1.0)))
+
+
+def visibility_matrix(
+    satellites: list[Satellite],
+    stations: list[GroundStation],
+    start_time: datetime.datetime,
+    end_time: datetime.datetime,
+    step_seconds: float = 60,
+    elevations: bool = False,
+    ephemeris: EphemerisStore | None = None,
+    out: np.ndarray | None = None,
+    screening: bool = SCREENING_ENABLED,
+) -> np.ndarray:
+    """Compute who can see whom, and when, for a whole network at once
+
+    Each satellite is propagated once over the time grid, or sliced out of the ephemeris
+    store when one is given and covers the grid, and the result is reused for every
+    ground station. With screening, the satellite is first checked on a coarse grid
+    and only the samples at which a station might see it are propagated and tested at
+    full resolution.
+
+    Args:
+        satellites (list[Satellite]): Satellites, first axis of the result
+        stations (list[GroundStation]): Ground stations, second axis of the result
+        start_time (datetime.datetime): Start of the time grid
+        end_time (datetime.datetime): End of the time grid, not included
+        step_seconds (float, optional): Spacing of the time grid in seconds. Defaults to 60.
+        elevations (bool, optional): Return elevations in degrees instead of visibility. Defaults to False.
+        ephemeris (EphemerisStore | None, optional): Store of precomputed positions. Defaults to None.
+        out (np.ndarray | None, optional): Array to write the result into instead of allocating one. Defaults to None.
+        screening (bool, optional): Skip the samples ruled out by screening, ignored for elevations. Defaults to SCREENING_ENABLED.
+
+    Returns:
+        np.ndarray: Array of shape [satellites, stations, time steps]; booleans that are True
+            when the satellite is above the station mask, or float32 elevations
+    """
+    times = time_grid(start_time, end_time, step_seconds)
+    positions, zeniths = station_frames(stations)
+    masks = np.array([float(gs.mask) for gs in stations])[:, np.newaxis]
+
+    shape = (len(satellites), len(stations), len(times))
+    dtype = np.float32 if elevations else np.bool_
+    result = np.zeros(shape, dtype=dtype) if out is None else out
+    if result.shape != shape or result.dtype != dtype:
+        raise ValueError(f"out must have shape {shape} and dtype {np.dtype(dtype)}")
+    if result.size == 0:
+        return result
+
+    for i, sat in enumerate(satellites):
+        sat_positions = None
+        if ephemeris is not None:
+            sat_positions = ephemeris.positions(
+                sat, start_time, len(times), step_seconds
+            )
+
+        samples = None
+        if screening and not elevations:
+            sf_sat = sat.get_sf_sat()
+            samples = candidate_indices(
+                sf_sat,
+                len(times),
+                step_seconds,
+                positions,
+                masks[:, 0],
+                lambda index: (
+                    satellite_itrf(sf_sat, times[index])
+                    if sat_positions is None
+                    else sat_positions[:, index]
+                ),
+            )
+
+        if samples is not None and len(samples) > len(times) // 2:
+            # screening barely ruled anything out, the full grid is cheaper to propagate
+            samples = None
+
+        if samples is not None:
+            # the satellite is below every mask outside of the candidate samples
+            result[i] = False
+            if len(samples) > 0:
+                if sat_positions is None:
+                    sample_positions = satellite_itrf(sf_sat, times[samples])
+                else:
+                    sample_positions = sat_positions[:, samples]
+                elevation = elevations_from_itrf(sample_positions, positions, zeniths)
+                result[i][:, samples] = elevation > masks
+            continue
+
+        if sat_positions is None:
+            sat_positions = satellite_itrf(sat.get_sf_sat(), times)
+        elevation = elevations_from_itrf(sat_positions, positions, zeniths)
+        result[i] = elevation if elevations else elevation > masks
+
+    return result
+
+
+def _visibility_chunk(
+    satellites: list[dict],
+    stations: list[dict],
+    start_time: datetime.datetime,
+    end_time: datetime.datetime,
+    step_seconds: float,
+    elevations: bool,
+    use_ephemeris: bool,
+    block_name: str,
+    shape: tuple[int, int, int],
+    rows: range,
+):
+    """Propagation pool task: fill the rows of a shared visibility matrix"""
+    chunk_satellites = [Satellite(**sat) for sat in satellites]
+    chunk_stations = [GroundStation(**gs) for gs in stations]
+
+    def write(matrix: np.ndarray):
+        visibility_matrix(
+            chunk_satellites,
+            chunk_stations,
+            start_time,
+            end_time,
+            step_seconds,
+            elevations=elevations,
+            ephemeris=ephemeris_store if use_ephemeris else None,
+            out=matrix[rows.start : rows.stop],
+        )
+
+    dtype = np.float32 if elevations else np.bool_
+    write_shared_array(block_name, shape, dtype, write)
+
+
+async def visibility_matrix_async(
+    satellites: list[Satellite],
+    stations: list[GroundStation],
+    start_time: datetime.datetime,
+    end_time: datetime.datetime,
+    step_seconds: float = 60,
+    elevations: bool = False,
+    use_ephemeris: bool = EPHEMERIS_ENABLED,
+    chunk_size: int | None = None,
+) -> np.ndarray:
+    """visibility_matrix split per satellite over the propagation pool
+
+    Workers write their rows straight into a shared memory block, so the matrix is
+    never pickled; it is copied out once every chunk is done.
+    """
+    count = len(time_grid(start_time, end_time, step_seconds))
+    shape = (len(satellites), len(stations), count)
+    dtype = np.float32 if elevations else np.bool_
+    station_data = [gs.model_dump() for gs in stations]
+
+    with shared_block(int(np.prod(shape)) * np.dtype(dtype).itemsize) as block:
+        await run_chunks(
+            _visibility_chunk,
+            [
+                (
+                    [
+                        {"id": sat.id, "name": sat.name, "tle": sat.tle}
+                        for sat in satellites[rows.start : rows.stop]
+                    ],
+                    station_data,
+                    start_time,
+                    end_time,
+                    step_seconds,
+                    elevations,
+                    use_ephemeris,
+                    block.name,
+                    shape,
+                    rows,
+                )
+                for rows in chunked(satellites, chunk_size)
+            ],
+        )
+        return read_shared_array(block, shape, dtype)
+
+
+def encode_matrix(matrix: np.ndarray, encoding: str) -> list | str:
+    """Encode a visibility matrix for a JSON response
+
+    "list" keeps nested JSON lists. "packed" packs booleans into bits (row-major,
+    most significant bit first, see numpy.packbits) and sends elevations as
+    little-endian float32; both are then base64 encoded.
+    """
+    if encoding == "list":
+        return matrix.tolist()
+    if matrix.dtype == np.bool_:
+        data = np.packbits(matrix, axis=None).tobytes()
+    else:
+        data = matrix.astype("<f4").tobytes()
+    return base64.b64encode(data).decode("ascii")
+
+
+class VisibilityService:
+    @staticmethod
+    async def get_matrix(
+        db: Session, request: VisibilityMatrixRequestModel
+    ) -> tuple[list[Satellite], list[GroundStation], np.ndarray]:
+        try:
+            if request.start >= request.end:
+                raise HTTPException(
+                    status_code=400,
+                    detail="Start time must be before end time",
+                )
+
+            satellites, stations = await run_in_threadpool(
+                load_network, db, request.satellite_ids, request.station_ids
+            )
+            cells = len(satellites) * len(stations) * request.steps()
+            if cells > VISIBILITY_MATRIX_MAX_CELLS:
+                raise HTTPException(
+                    status_code=422,
+                    detail=f"Matrix would have {cells} values, "
+                    f"at most {VISIBILITY_MATRIX_MAX_CELLS} are allowed",
+                )
+            matrix = await visibility_matrix_async(
+                satellites,
+                stations,
+                request.start,
+                request.end,
+                request.step_seconds,
+                elevations=request.values == "elevation",
+            )
+            return satellites, stations, matrix
+
+        except HTTPException:
+            raise
+        except SQLAlchemyError as e:
+            logger.error(f"Error computing visibility matrix: {str(e)}")
+            raise HTTPException(
+                status_code=503,
+                detail=f"Database error while computing visibility matrix: {str(e)}",
+            )
+        except Exception as e:
+            logger.error(f"Error computing visibility matrix: {str(e)}")
+            raise HTTPException(
+                status_code=500,
+                detail=f"Error computing visibility matrix: {str(e)}",
+            )
@@ -0,0 +1,156 @@
+from dataclasses import dataclass
+import datetime
+import random
+import uuid
+from app.entities.GroundStation import GroundStation
+from app.entities.Request import ContactRequest, RFRequest
+from app.entities.Satellite import Satellite
+from app.services.request import Request
+
+EPOCH = datetime.datetime(2025, 1, 21, tzinfo=datetime.timezone.utc)
+SLOT_SECONDS = 15 * 60
+# requests per day of the horizon, so station load stays the same at every size
+REQUESTS_PER_DAY = 600
+
+
+@dataclass
+class Scenario:
+    """Synthetic constellation, ground segment and request mix"""
+
+    satellites: list[Satellite]
+    stations: list[GroundStation]
+    requests: list[Request]
+    start_time: datetime.datetime
+    end_time: datetime.datetime
+
+
+def tle_checksum(line: str) -> int:
+    """Modulo 10 checksum of a TLE line: the sum of its digits, minus signs count as 1"""
+    return sum(int(c) if c.isdigit() else 1 if c == "-" else 0 for c in line[:68]) % 10
+
+
+def synthetic_tle(rng: random.Random, catalog_number: int, name: str) -> str:
+    """A valid three line TLE for a random low earth orbit at EPOCH
+
+    Args:
+        rng (random.Random): Source of the orbital elements
+        catalog_number (int): NORAD catalog number, 1 to 99999
+        name (str): Name line of the TLE
+
+    Returns:
+        str: Name line and the two element lines
+    """
+    day = EPOCH.timetuple().tm_yday + EPOCH.hour / 24
+    line1 = (
+        f"1 {catalog_number:05d}U {'25001A':<8} {EPOCH.year % 100:02d}{day:012.8f} "
+        f" .00000000  00000+0  00000+0 0  999"
+    )
+    line2 = (
+        f"2 {catalog_number:05d} {rng.uniform(45, 99):8.4f} {rng.uniform(0, 360):8.4f} "
+        f"{rng.randrange(1, 2000):07d} {rng.uniform(0, 360):8.4f} "
+        f"{rng.uniform(0, 360):8.4f} {rng.uniform(14.2, 15.6):11.8f}{1:5d}"
+    )
+    return "\n".join(
+        [name, line1 + str(tle_checksum(line1)), line2 + str(tle_checksum(line2))]
+    )
+
+
+def generate_scenario(
+    requests: int,
+    seed: int = 0,
+    satellites: int | None = None,
+    stations: int = 8,
+    rf_share: float = 0.6,
+) -> Scenario:
+    """Generate a reproducible scheduling scenario
+
+    The horizon grows with the number of requests (REQUESTS_PER_DAY), so the ratio
+    of requests that can be scheduled stays comparable between sizes. Windows start
+    on slot boundaries like the requests the API receives.
+
+    Args:
+        requests (int): Number of requests
+        seed (int, optional): Seed of every random choice. Defaults to 0.
+        satellites (int | None, optional): Number of satellites. Defaults to one per 20 requests, between 2 and 500.
+        stations (int, optional): Number of ground stations. Defaults to 8.
+        rf_share (float, optional): Share of RF time requests, the rest are contacts. Defaults to 0.6.
+
+    Returns:
+        Scenario: The generated scenario
+    """
+    rng = random.Random(seed)
+    if satellites is None:
+        satellites = min(max(requests // 20, 2), 500)
+    days = max(requests // REQUESTS_PER_DAY, 1)
+    start_time = EPOCH
+    end_time = EPOCH + datetime.timedelta(days=days)
+
+    sats = [
+        Satellite(
+            id=uuid.UUID(int=rng.getrandbits(128)),
+            name=f"SYNTH-{i + 1}",
+            tle=synthetic_tle(rng, i + 1, f"SYNTH-{i + 1}"),
+            priority=rng.randrange(1, 4),
+        )
+        for i in range(satellites)
+    ]
+    gss = [
+        GroundStation(
+            id=i + 1,
+            name=f"Synthetic {i + 1}",
+            lat=round(rng.uniform(-70, 70), 4),
+            lon=round(rng.uniform(-180, 180), 4),
+            height=round(rng.uniform(0, 1500), 1),
+            mask=5,
+            uplink=0,
+            downlink=0,
+            science=0,
+        )
+        for i in range(stations)
+    ]
+
+    slots = days * 24 * 3600 // SLOT_SECONDS
+    made: list[Request] = []
+    for _ in range(requests):
+        sat = rng.choice(sats)
+        window_start = start_time + datetime.timedelta(
+            seconds=SLOT_SECONDS * rng.randrange(slots)
+        )
+        if rng.random() < rf_share:
+            made.append(
+                RFRequest(
+                    id=uuid.UUID(int=rng.getrandbits(128)),
+                    mission=sat.name,
+                    satellite_id=sat.id,
+                    start_time=window_start,
+                    end_time=window_start
+                    + datetime.timedelta(hours=rng.randrange(1, 7)),
+                    contact_id=None,
+                    priority=rng.randrange(1, 4),
+                    downlink_time_requested=SLOT_SECONDS * rng.randrange(1, 5),
+                )
+            )
+        else:
+            window_end = window_start + datetime.timedelta(minutes=rng.randrange(8, 16))
+            made.append(
+                ContactRequest(
+                    id=uuid.UUID(int=rng.getrandbits(128)),
+                    mission=sat.name,
+                    satellite_id=sat.id,
+                    start_time=window_start,
+                    end_time=window_end,
+                    booking_id=None,
+                    priority=rng.randrange(1, 4),
+                    ground_station_id=rng.choice(gss).id,
+                    orbit=1,
+                    uplink=True,
+                    telemetry=True,
+                    science=True,
+                    aos=window_start,
+                    los=window_end,
+                    rf_on=window_start,
+                    rf_off=window_end,
+                    duration=int((window_end - window_start).total_seconds()),
+                )
+            )
+    return Scenario(sats, gss, made, start_time, end_time)
@@ -0,0 +1,236 @@
+"""Scheduler benchmarks, compared against the stored baselines
+
+    python -m benchmarks.run                       # default sizes, fail on regressions
+    python -m benchmarks.run --sizes 10 100000     # any sizes from 10 to 100k
+    python -m benchmarks.run --update              # store the results as baselines
+
+Exits with status 1 when a case is slower, uses more memory or schedules fewer
+requests than its baseline allows.
+"""
+
+import argparse
+from dataclasses import dataclass
+import datetime
+import json
+from pathlib import Path
+import sys
+import time
+import tracemalloc
+from typing import Callable
+from benchmarks.generator import Scenario, generate_scenario
+from app.services.request import angle_diff, is_visible, schedule_with_slots
+
+BASELINES = Path(__file__).with_name("baselines.json")
+DEFAULT_SIZES = [10, 100, 1000, 10000]
+MIN_SIZE, MAX_SIZE = 10, 100_000
+# allowed growth over the baseline before a case counts as a regression
+TIME_TOLERANCE = 0.5
+MEMORY_TOLERANCE = 0.2
+# growth that is always allowed, so the smallest cases do not fail on noise
+TIME_SLACK_S = 0.01
+MEMORY_SLACK_MB = 1.0
+# geometry cases: satellite pairs compared, and visibility checks made
+ANGLE_DIFF_PAIRS = 5
+VISIBILITY_CHECKS = 1000
+
+
+@dataclass
+class Result:
+    case: str
+    wall_s: float
+    peak_mb: float
+    scheduled_ratio: float | None = None
+
+
+def _measure(
+    setup: Callable[[], Scenario], work: Callable[[Scenario], float | None], repeat: int
+) -> tuple[float, float, float | None]:
+    """Best wall time of repeat runs, then the peak memory of one more run
+
+    Peak memory is taken in a separate run since tracemalloc slows allocations down.
+    Scenarios are generated outside of the measurement, one per run, because
+    scheduling changes the requests.
+    """
+    wall, outcome = float("inf"), None
+    for _ in range(repeat):
+        scenario = setup()
+        started = time.perf_counter()
+        outcome = work(scenario)
+        wall = min(wall, time.perf_counter() - started)
+
+    scenario = setup()
+    tracemalloc.start()
+    try:
+        work(scenario)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return wall, peak / 2**20, outcome
+
+
+def _schedule(scenario: Scenario) -> float:
+    schedule_with_slots(scenario.requests, scenario.stations)
+    return sum(r.scheduled for r in scenario.requests) / len(scenario.requests)
+
+
+def _angle_diff(scenario: Scenario) -> None:
+    gs = scenario.stations[0].get_sf_geo_position()
+    sats = [s.get_sf_sat() for s in scenario.satellites]
+    for i in range(ANGLE_DIFF_PAIRS):
+        angle_diff(
+            scenario.start_time,
+            scenario.start_time + datetime.timedelta(days=1),
+            sats[2 * i],
+            sats[2 * i + 1],
+            gs,
+        )
+
+
+def _is_visible(scenario: Scenario) -> None:
+    sat = scenario.satellites[0].get_sf_sat()
+    for i in range(VISIBILITY_CHECKS):
+        is_visible(
+            sat,
+            scenario.stations[i % len(scenario.stations)],
+            scenario.start_time + datetime.timedelta(minutes=i),
+        )
+
+
+def run_benchmarks(
+    sizes: list[int] = DEFAULT_SIZES, seed: int = 0, repeat: int = 3
+) -> list[Result]:
+    """Run every case: scheduling at each size, then the geometry functions
+
+    Args:
+        sizes (list[int], optional): Numbers of requests to schedule. Defaults to DEFAULT_SIZES.
+        seed (int, optional): Seed of the generated scenarios. Defaults to 0.
+        repeat (int, optional): Runs per case, the fastest is kept. Defaults to 3.
+
+    Returns:
+        list[Result]: One result per case
+    """
+    results = []
+    for size in sizes:
+        if not MIN_SIZE <= size <= MAX_SIZE:
+            raise ValueError(f"Size {size} is outside of {MIN_SIZE} to {MAX_SIZE}")
+        wall, peak, ratio = _measure(
+            lambda: generate_scenario(size, seed), _schedule, repeat
+        )
+        results.append(Result(f"schedule_with_slots/{size}", wall, peak, ratio))
+
+    geometry = generate_scenario(MIN_SIZE, seed, satellites=2 * ANGLE_DIFF_PAIRS)
+    for name, work in (("angle_diff", _angle_diff), ("is_visible", _is_visible)):
+        wall, peak, _ = _measure(lambda: geometry, work, repeat)
+        results.append(Result(name, wall, peak))
+    return results
+
+
+def compare(
+    results: list[Result],
+    baselines: dict[str, dict],
+    time_tolerance: float = TIME_TOLERANCE,
+    memory_tolerance: float = MEMORY_TOLERANCE,
+) -> list[str]:
+    """Describe every regression of the results against the baselines
+
+    Cases without a baseline are not compared, and growth below TIME_SLACK_S and
+    MEMORY_SLACK_MB is never a regression. The scheduled ratio is deterministic
+    for a seed, so any drop counts.
+
+    Args:
+        results (list[Result]): Results of run_benchmarks
+        baselines (dict[str, dict]): Stored results by case
+        time_tolerance (float, optional): Allowed relative growth of the wall time. Defaults to TIME_TOLERANCE.
+        memory_tolerance (float, optional): Allowed relative growth of the peak memory. Defaults to MEMORY_TOLERANCE.
+
+    Returns:
+        list[str]: One line per regression, empty when there is none
+    """
+    regressions = []
+    for result in results:
+        baseline = baselines.get(result.case)
+        if baseline is None:
+            continue
+        if result.wall_s > max(
+            baseline["wall_s"] * (1 + time_tolerance), baseline["wall_s"] + TIME_SLACK_S
+        ):
+            regressions.append(
+                f"{result.case}: {result.wall_s:.3f} s, baseline {baseline['wall_s']:.3f} s"
+            )
+        if result.peak_mb > max(
+            baseline["peak_mb"] * (1 + memory_tolerance),
+            baseline["peak_mb"] + MEMORY_SLACK_MB,
+        ):
+            regressions.append(
+                f"{result.case}: {result.peak_mb:.1f} MB, baseline {baseline['peak_mb']:.1f} MB"
+            )
+        if (
+            result.scheduled_ratio is not None
+            and baseline.get("scheduled_ratio") is not None
+            and result.scheduled_ratio < baseline["scheduled_ratio"] - 1e-9
+        ):
+            regressions.append(
+                f"{result.case}: scheduled {result.scheduled_ratio:.1%}, "
+                f"baseline {baseline['scheduled_ratio']:.1%}"
+            )
+    return regressions
+
+
+def load_baselines(seed: int, path: Path = BASELINES) -> dict[str, dict]:
+    """Stored results by case, empty when they were recorded with another seed"""
+    if not path.exists():
+        return {}
+    stored = json.loads(path.read_text())
+    return stored["cases"] if stored["seed"] == seed else {}
+
+
+def store_baselines(results: list[Result], seed: int, path: Path = BASELINES):
+    """Merge the results into the baselines file, keeping cases that were not run"""
+    cases = load_baselines(seed, path)
+    for result in results:
+        cases[result.case] = {
+            "wall_s": round(result.wall_s, 4),
+            "peak_mb": round(result.peak_mb, 2),
+            "scheduled_ratio": result.scheduled_ratio,
+        }
+    path.write_text(json.dumps({"seed": seed, "cases": cases}, indent=2) + "\n")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--time-tolerance", type=float, default=TIME_TOLERANCE)
+    parser.add_argument("--memory-tolerance", type=float, default=MEMORY_TOLERANCE)
+    parser.add_argument(
+        "--update", action="store_true", help="store the results as baselines"
+    )
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.sizes, args.seed, args.repeat)
+    for result in results:
+        ratio = (
+            ""
+            if result.scheduled_ratio is None
+            else f"  scheduled {result.scheduled_ratio:6.1%}"
+        )
+        print(
+            f"{result.case:<28} {result.wall_s:9.3f} s {result.peak_mb:9.1f} MB{ratio}"
+        )
+
+    if args.update:
+        store_baselines(results, args.seed)
+        print(f"Stored baselines in {BASELINES}")
+        return 0
+
+    regressions = compare(
+        results, load_baselines(args.seed), args.time_tolerance, args.memory_tolerance
+    )
+    for regression in regressions:
+        print(f"Regression: {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,52 @@
+from benchmarks.generator import generate_scenario, tle_checksum
+from benchmarks.run import Result, compare, run_benchmarks
+from app.entities.Request import RFRequest
+from app.services.propagation import get_timescale
+
+
+def test_generator_is_reproducible():
+    first = generate_scenario(50, seed=4)
+    second = generate_scenario(50, seed=4)
+    other = generate_scenario(50, seed=5)
+
+    assert [s.tle for s in first.satellites] == [s.tle for s in second.satellites]
+    assert [(r.id, r.start_time) for r in first.requests] == [
+        (r.id, r.start_time) for r in second.requests
+    ]
+    assert [r.id for r in first.requests] != [r.id for r in other.requests]
+    assert any(isinstance(r, RFRequest) for r in first.requests)
+    assert any(not isinstance(r, RFRequest) for r in first.requests)
+
+
+def test_synthetic_tles_are_valid_leo_orbits():
+    scenario = generate_scenario(10, seed=1, satellites=5)
+    t = get_timescale().from_datetime(scenario.start_time)
+
+    for satellite in scenario.satellites:
+        _, line1, line2 = satellite.tle.splitlines()
+        assert len(line1) == len(line2) == 69
+        assert int(line1[-1]) == tle_checksum(line1)
+        assert int(line2[-1]) == tle_checksum(line2)
+        altitude = satellite.get_sf_sat().at(t).distance().km - 6378
+        assert 200 < altitude < 1200
+
+
+def test_run_benchmarks_reports_every_case():
+    results = run_benchmarks([10], repeat=1)
+
+    assert [r.case for r in results] == [
+        "schedule_with_slots/10",
+        "angle_diff",
+        "is_visible",
+    ]
+    assert 0 <= results[0].scheduled_ratio <= 1
+    assert all(r.wall_s > 0 and r.peak_mb >= 0 for r in results)
+
+
+def test_compare_flags_regressions():
+    baselines = {"case": {"wall_s": 1.0, "peak_mb": 10.0, "scheduled_ratio": 0.5}}
+
+    assert compare([Result("case", 1.2, 11.0, 0.5)], baselines) == []
+    assert compare([Result("unknown", 100.0, 100.0, 0.0)], baselines) == []
+    assert len(compare([Result("case", 2.0, 10.0, 0.5)], baselines)) == 1
+    assert len(compare([Result("case", 1.0, 20.0, 0.4)], baselines)) == 2
@@ -6,6 +6,7 @@ from app.models.ground_station import GroundStationModel
 from app.main import app
 from app.services.db import get_db
 from app.services.ground_station import GroundStationService
+from app.services.pagination import decode_cursor
 from fastapi import HTTPException
 
 
@@ -117,6 +118,21 @@ def test_get_ground_stations(client: TestClient):
     assert isinstance(response.json(), list)
 
 
+def test_get_ground_stations_next_cursor(client: TestClient):
+    stations = [
+        GroundStationModel(**{**_gs_data, "id": gs_id}) for gs_id in range(1, 4)
+    ]
+    with patch.object(
+        GroundStationService, "get_ground_stations", return_value=stations
+    ) as get:
+        response = client.get(f"{_ver_prefix}/gs", params={"limit": 2})
+
+    assert get.call_args.args[1:] == (3, None)
+    assert [gs["id"] for gs in response.json()] == [1, 2]
+    cursor = response.headers["X-Next-Cursor"]
+    assert decode_cursor(cursor, int) == (2,)
+
+
 def test_get_ground_station(client: TestClient):
     gs_id = 1
 
@@ -0,0 +1,50 @@
+# type: ignore
+from unittest.mock import MagicMock
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.exc import OperationalError
+from app.main import app
+from app.services.db import get_db
+
+
+@pytest.fixture(name="mock_db")
+def session_fixture():
+    mock_db = MagicMock()
+    yield mock_db
+
+
+@pytest.fixture(name="client")
+def client_fixture(mock_db: MagicMock):
+    def override_get_db():
+        return mock_db
+
+    app.dependency_overrides[get_db] = override_get_db
+    client = TestClient(app)
+    yield client
+    app.dependency_overrides.clear()
+
+
+def test_health(client: TestClient, mock_db: MagicMock):
+    response = client.get("/api/v1/health/")
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "ok"
+    assert response.json()["database"]["pool"] == "MonitoredQueuePool"
+    mock_db.execute.assert_called_once()
+
+
+def test_health_database_down(client: TestClient, mock_db: MagicMock):
+    mock_db.execute.side_effect = OperationalError("SELECT 1", {}, Exception("down"))
+
+    response = client.get("/api/v1/health/")
+
+    assert response.status_code == 503
+
+
+def test_db_metrics(client: TestClient):
+    response = client.get("/api/v1/metrics/db")
+
+    assert response.status_code == 200
+    assert {"checked_out", "overflow", "wait_seconds", "timeouts"} <= set(
+        response.json()
+    )
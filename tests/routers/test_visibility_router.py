@@ -0,0 +1,161 @@
+# type: ignore
+from datetime import datetime, timezone
+from unittest.mock import MagicMock, patch
+from uuid import uuid4
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from app.entities.GroundStation import GroundStation
+from app.entities.Satellite import Satellite
+from app.entities.Visibility import Visibility
+from app.main import app
+from app.services.db import get_db
+from app.services.passes import PassService
+from app.services.visibility import VisibilityService
+
+
+@pytest.fixture(name="client")
+def client_fixture():
+    app.dependency_overrides[get_db] = lambda: MagicMock()
+    client = TestClient(app)
+    yield client
+    app.dependency_overrides.clear()
+
+
+_ver_prefix = "/api/v1"
+
+_sat = Satellite(name="SCISAT 1")
+_gs = GroundStation(
+    id=1,
+    name="Inuvik NorthWest",
+    lat=68.3195,
+    lon=-133.549,
+    height=102.5,
+    mask=5,
+    uplink=0,
+    downlink=0,
+    science=0,
+)
+
+
+def test_get_passes(client: TestClient):
+    aos = datetime(2025, 1, 21, 9, 23, tzinfo=timezone.utc)
+    los = datetime(2025, 1, 21, 9, 31, tzinfo=timezone.utc)
+
+    with patch.object(
+        PassService, "get_passes", return_value=[Visibility(_gs, _sat, aos, los)]
+    ):
+        response = client.post(
+            f"{_ver_prefix}/visibility/passes",
+            json={"start": "2025-01-21T00:00:00Z", "end": "2025-01-22T00:00:00Z"},
+        )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data) == 1
+    assert data[0]["satellite_id"] == str(_sat.id)
+    assert data[0]["satellite_name"] == "SCISAT 1"
+    assert data[0]["gs_id"] == 1
+    assert data[0]["duration"] == 480.0
+
+
+def test_get_passes_invalid_json(client: TestClient):
+    response = client.post(
+        f"{_ver_prefix}/visibility/passes", json={"start": "2025-01-21T00:00:00Z"}
+    )
+
+    assert response.status_code == 422
+
+
+def test_get_passes_too_large(client: TestClient):
+    response = client.post(
+        f"{_ver_prefix}/visibility/passes",
+        json={"start": "2025-01-21T00:00:00Z", "end": "2035-01-21T00:00:00Z"},
+    )
+    assert response.status_code == 422
+
+    response = client.post(
+        f"{_ver_prefix}/visibility/passes",
+        json={
+            "start": "2025-01-21T00:00:00Z",
+            "end": "2025-02-21T00:00:00Z",
+            "satellite_ids": [str(uuid4()) for _ in range(20)],
+            "station_ids": list(range(20)),
+        },
+    )
+    assert response.status_code == 422
+
+    # without ids the size is checked against the loaded network
+    with patch(
+        "app.services.passes.load_network", return_value=([_sat] * 20, [_gs] * 20)
+    ), patch(
+        "app.services.passes.predict_passes_async", side_effect=AssertionError
+    ) as predict:
+        response = client.post(
+            f"{_ver_prefix}/visibility/passes",
+            json={"start": "2025-01-21T00:00:00Z", "end": "2025-02-21T00:00:00Z"},
+        )
+    assert response.status_code == 422
+    assert not predict.called
+
+
+def test_get_matrix_packed(client: TestClient):
+    matrix = np.zeros((1, 1, 16), dtype=np.bool_)
+    matrix[0, 0, :8] = True
+
+    with patch.object(
+        VisibilityService, "get_matrix", return_value=([_sat], [_gs], matrix)
+    ):
+        response = client.post(
+            f"{_ver_prefix}/visibility/matrix",
+            json={"start": "2025-01-21T00:00:00Z", "end": "2025-01-21T00:16:00Z"},
+        )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["shape"] == [1, 1, 16]
+    assert data["encoding"] == "packed"
+    assert data["data"] == "/wA="
+
+
+def test_get_matrix_list(client: TestClient):
+    matrix = np.array([[[True, False]]])
+
+    with patch.object(
+        VisibilityService, "get_matrix", return_value=([_sat], [_gs], matrix)
+    ):
+        response = client.post(
+            f"{_ver_prefix}/visibility/matrix",
+            json={
+                "start": "2025-01-21T00:00:00Z",
+                "end": "2025-01-21T00:02:00Z",
+                "encoding": "list",
+            },
+        )
+
+    assert response.status_code == 200
+    assert response.json()["data"] == [[[True, False]]]
+
+
+def test_get_matrix_too_large(client: TestClient):
+    response = client.post(
+        f"{_ver_prefix}/visibility/matrix",
+        json={
+            "start": "2025-01-21T00:00:00Z",
+            "end": "2035-01-21T00:00:00Z",
+            "step_seconds": 1,
+        },
+    )
+    assert response.status_code == 422
+
+    response = client.post(
+        f"{_ver_prefix}/visibility/matrix",
+        json={
+            "start": "2025-01-21T00:00:00Z",
+            "end": "2025-01-22T00:00:00",
+            "step_seconds": 1,
+            "satellite_ids": [str(uuid4()) for _ in range(20)],
+            "station_ids": list(range(20)),
+        },
+    )
+    assert response.status_code == 422
@@ -0,0 +1,147 @@
+from datetime import datetime, timedelta, timezone
+import random
+from uuid import uuid4
+import pytest
+from app.entities.GroundStation import GroundStation
+from app.entities.Request import ContactRequest, RFRequest
+from app.services import compute_pool
+from app.services.components import conflict_components, schedule_components
+from app.services.request import schedule_with_slots
+from app.services.timeline import to_epoch
+
+_start = datetime(2025, 1, 21, 10, 0, tzinfo=timezone.utc)
+
+
+def _station(id: int) -> GroundStation:
+    return GroundStation(
+        id=id,
+        name=f"Station {id}",
+        lat=53.2124,
+        lon=-105.934,
+        height=490.3,
+        mask=5,
+        uplink=0,
+        downlink=0,
+        science=0,
+    )
+
+
+def _contact(start: datetime, minutes: int, gs_id: int):
+    return ContactRequest(
+        mission="SCISAT",
+        satellite_id=uuid4(),
+        start_time=start,
+        end_time=start + timedelta(minutes=minutes),
+        booking_id=None,
+        priority=1,
+        ground_station_id=gs_id,
+        orbit=1,
+        uplink=True,
+        telemetry=True,
+        science=True,
+        aos=start,
+        los=start + timedelta(minutes=minutes),
+        rf_on=start,
+        rf_off=start + timedelta(minutes=minutes),
+        duration=minutes * 60,
+    )
+
+
+def _rf(start: datetime, minutes: int, requested: int):
+    return RFRequest(
+        mission="SCISAT",
+        satellite_id=uuid4(),
+        start_time=start,
+        end_time=start + timedelta(minutes=minutes),
+        contact_id=None,
+        priority=1,
+        downlink_time_requested=requested,
+    )
+
+
+@pytest.fixture(params=[0, 2], ids=["inline", "processes"])
+def workers(request, monkeypatch):
+    monkeypatch.setattr(compute_pool, "PROPAGATION_WORKERS", request.param)
+    yield request.param
+    compute_pool.shutdown_executor()
+
+
+def test_conflict_components_split_by_station_and_time():
+    stations = [_station(1), _station(2)]
+    requests = [
+        _contact(_start, 30, 1),
+        _contact(_start + timedelta(minutes=20), 30, 1),
+        _contact(_start, 30, 2),
+        _contact(_start + timedelta(hours=5), 30, 1),
+    ]
+
+    components = conflict_components(requests, stations)
+
+    assert sorted(map(sorted, components)) == [[0, 1], [2], [3]]
+
+
+def test_rf_requests_join_the_stations_they_pass_over():
+    stations = [_station(1), _station(2)]
+    rf = _rf(_start, 30, 900)
+    requests = [_contact(_start, 30, 1), _contact(_start, 30, 2), rf]
+
+    assert len(conflict_components(requests, stations)) == 1
+
+    start = to_epoch(_start)
+    passes = {(rf.satellite_id, 2): [(start + 300, start + 900)]}
+    components = conflict_components(requests, stations, passes=passes)
+    assert sorted(map(sorted, components)) == [[0], [1, 2]]
+
+
+def test_margins_join_requests_they_bring_within_reach():
+    stations = [_station(1)]
+    requests = [
+        _contact(_start, 30, 1),
+        _contact(_start + timedelta(minutes=50), 30, 1),
+    ]
+
+    assert len(conflict_components(requests, stations)) == 2
+    assert len(conflict_components(requests, stations, setup=300, teardown=300)) == 1
+
+
+def test_schedule_components_matches_serial(workers):
+    rng = random.Random(5)
+    stations = [_station(i) for i in range(1, 5)]
+
+    def requests():
+        rng.seed(5)
+        made = []
+        for region in range(6):
+            base = _start + timedelta(days=region)
+            for _ in range(8):
+                offset = timedelta(minutes=15 * rng.randrange(12))
+                if rng.random() < 0.4:
+                    made.append(_contact(base + offset, 30, rng.randrange(1, 5)))
+                else:
+                    made.append(
+                        _rf(
+                            base + offset,
+                            15 * rng.randrange(1, 6),
+                            rng.choice([600, 1800]),
+                        )
+                    )
+        return made
+
+    serial_requests = requests()
+    parallel_requests = requests()
+    serial_order = list(serial_requests)
+    parallel_order = list(parallel_requests)
+    serial = schedule_with_slots(serial_requests, stations)
+    parallel = schedule_components(parallel_requests, stations, min_parallel=0)
+
+    def key(bookings, order):
+        index = {r.id: i for i, r in enumerate(order)}
+        return sorted(
+            (index[b.request_id], b.gs_id, b.slot.start_time, b.slot.end_time)
+            for b in bookings
+        )
+
+    assert key(parallel, parallel_order) == key(serial, serial_order)
+    assert [(r.scheduled, r.ground_station_id) for r in parallel_order] == [
+        (r.scheduled, r.ground_station_id) for r in serial_order
+    ]
@@ -0,0 +1,113 @@
+import asyncio
+from datetime import datetime, timezone
+import numpy as np
+import pytest
+from app.entities.GroundStation import GroundStation
+from app.entities.Satellite import Satellite
+from app.services import compute_pool
+from app.services.compute_pool import chunked
+from app.services.passes import predict_passes, predict_passes_async
+from app.services.visibility import visibility_matrix, visibility_matrix_async
+
+_tle_scisat = """SCISAT 1
+1 27858U 03036A   24271.51787419  .00002340  00000+0  31635-3 0  9999
+2 27858  73.9336 337.0907 0007403 194.1129 165.9841 14.79656508138550"""
+
+_tle_neossat = """NEOSSAT
+1 39089U 13009D   24271.52543360  .00000662  00000+0  24595-3 0  9997
+2 39089  98.4054  96.2203 0010420 322.4732  37.5725 14.35304192606691"""
+
+_start = datetime(2025, 1, 21, 6, 0, tzinfo=timezone.utc)
+_end = datetime(2025, 1, 21, 18, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def satellites():
+    return [
+        Satellite(name="SCISAT 1", tle=_tle_scisat),
+        Satellite(name="NEOSSAT", tle=_tle_neossat),
+        Satellite(name="SCISAT 1 copy", tle=_tle_scisat),
+    ]
+
+
+@pytest.fixture
+def stations():
+    return [
+        GroundStation(
+            id=1,
+            name="Inuvik NorthWest",
+            lat=68.3195,
+            lon=-133.549,
+            height=102.5,
+            mask=5,
+            uplink=0,
+            downlink=0,
+            science=0,
+        ),
+        GroundStation(
+            id=2,
+            name="Prince Albert",
+            lat=53.2124,
+            lon=-105.934,
+            height=490.3,
+            mask=5,
+            uplink=0,
+            downlink=0,
+            science=0,
+        ),
+    ]
+
+
+@pytest.fixture(params=[0, 2], ids=["threads", "processes"])
+def workers(request, monkeypatch):
+    monkeypatch.setattr(compute_pool, "PROPAGATION_WORKERS", request.param)
+    yield request.param
+    compute_pool.shutdown_executor()
+
+
+def test_chunked():
+    assert list(chunked(range(5), 2)) == [range(0, 2), range(2, 4), range(4, 5)]
+    assert list(chunked([], 2)) == []
+
+
+def test_visibility_matrix_async_matches(satellites, stations, workers):
+    expected = visibility_matrix(satellites, stations, _start, _end)
+
+    matrix = asyncio.run(
+        visibility_matrix_async(
+            satellites, stations, _start, _end, use_ephemeris=False, chunk_size=2
+        )
+    )
+
+    assert matrix.dtype == np.bool_
+    assert np.array_equal(matrix, expected)
+
+
+def test_visibility_matrix_async_elevations(satellites, stations, workers):
+    expected = visibility_matrix(satellites, stations, _start, _end, elevations=True)
+
+    matrix = asyncio.run(
+        visibility_matrix_async(
+            satellites,
+            stations,
+            _start,
+            _end,
+            elevations=True,
+            use_ephemeris=False,
+            chunk_size=1,
+        )
+    )
+
+    assert np.allclose(matrix, expected)
+
+
+def test_predict_passes_async_matches(satellites, stations, workers):
+    expected = predict_passes(satellites, stations, _start, _end)
+
+    passes = asyncio.run(
+        predict_passes_async(satellites, stations, _start, _end, chunk_size=2)
+    )
+
+    assert [(p.sat.id, p.gs.id, p.start, p.end) for p in passes] == [
+        (p.sat.id, p.gs.id, p.start, p.end) for p in expected
+    ]
@@ -0,0 +1,38 @@
+import pytest
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlmodel import create_engine
+from app.services.db import MonitoredQueuePool, engine_options, pool_stats
+
+
+def test_engine_options():
+    options = engine_options("postgresql://user:password@db:5432/database")
+
+    assert options["poolclass"] is MonitoredQueuePool
+    assert options["pool_pre_ping"] is True
+    assert options["connect_args"] == {"options": "-c statement_timeout=30000"}
+    assert engine_options("sqlite://") == {}
+
+
+def test_pool_stats_track_checkouts_and_waits(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=MonitoredQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+    )
+
+    with engine.connect():
+        stats = pool_stats(engine)
+        assert stats["pool"] == "MonitoredQueuePool"
+        assert (stats["size"], stats["checked_out"], stats["overflow"]) == (1, 1, 0)
+        with pytest.raises(PoolTimeoutError):
+            engine.connect()
+
+    stats = pool_stats(engine)
+    assert stats["checked_out"] == 0
+    assert stats["checkouts"] == 2
+    assert stats["waits"] == 1
+    assert stats["timeouts"] == 1
+    assert stats["max_wait_seconds"] >= 0.05
+    assert stats["wait_seconds"] >= stats["max_wait_seconds"]
@@ -0,0 +1,128 @@
+from unittest.mock import patch
+import pytest
+from sqlalchemy import event
+from app.entities.Satellite import Satellite
+from app.entities.ExclusionCone import ExclusionCone
+from app.entities.GroundStation import GroundStation
+from app.models.ground_station import GroundStationCreateModel
+from app.models.satellite import SatelliteUpdateModel
+from app.services.entity_cache import EntityCache, entity_cache
+from app.services.ground_station import GroundStationService
+from app.services.satellite import SatelliteService
+from sqlmodel import Session, SQLModel, create_engine, select
+from sqlmodel.pool import StaticPool
+
+_gs_create_model = GroundStationCreateModel(
+    name="Test Station",
+    lat=68.3,
+    lon=133.5,
+    height=100.0,
+    mask=5,
+    uplink=50,
+    downlink=100,
+    science=100,
+)
+
+
+@pytest.fixture(name="engine")
+def engine_fixture():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    SQLModel.metadata.create_all(
+        engine,
+        tables=[Satellite.__table__, ExclusionCone.__table__, GroundStation.__table__],  # type: ignore
+    )
+    return engine
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    entity_cache.clear()
+    yield
+    entity_cache.clear()
+
+
+def _count_queries(engine) -> list[str]:
+    statements: list[str] = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    return statements
+
+
+def test_hits_are_attached_without_queries(engine):
+    with Session(engine) as db:
+        gs = GroundStation(**_gs_create_model.model_dump())
+        sat = Satellite(name="SCISAT 1", tle="")
+        db.add(gs)
+        db.add(sat)
+        db.commit()
+        db.add(
+            ExclusionCone(
+                mission="SCISAT",
+                angle_limit=10,
+                interfering_satellite="NEOSSAT",
+                satellite_id=sat.id,
+                gs_id=gs.id,
+            )
+        )
+        db.commit()
+        sat_id, gs_id = sat.id, gs.id
+
+    with Session(engine) as db:
+        SatelliteService.get_satellite(db, sat_id)
+        GroundStationService.get_ground_stations(db)
+
+    statements = _count_queries(engine)
+    with Session(engine) as db:
+        satellite = SatelliteService.get_satellite(db, sat_id)
+        stations = GroundStationService.get_ground_stations(db)
+        assert [c.gs_id for c in satellite.ex_cones] == [gs_id]
+        assert [s.id for s in stations] == [gs_id]
+        assert satellite in db and stations[0] in db
+    assert statements == []
+    assert entity_cache.stats()["hits"] == 2
+    assert entity_cache.stats()["hit_rate"] == 0.5
+
+    # changes to a hit are written like those to a queried row
+    with Session(engine) as db:
+        SatelliteService.update_satellite(
+            db, sat_id, SatelliteUpdateModel(name="SCISAT 2")
+        )
+    with Session(engine) as db:
+        assert SatelliteService.get_satellite(db, sat_id).name == "SCISAT 2"
+    assert entity_cache.stats()["invalidations"] == 1
+
+
+def test_writes_invalidate(engine):
+    with Session(engine) as db:
+        assert GroundStationService.get_ground_stations(db) == []
+        GroundStationService.create_ground_station(db, _gs_create_model)
+        assert len(GroundStationService.get_ground_stations(db)) == 1
+        assert entity_cache.stats()["hits"] == 0
+
+
+def test_version_file_is_shared(engine, tmp_path):
+    version_file = str(tmp_path / "version")
+    first = EntityCache(version_file=version_file)
+    second = EntityCache(version_file=version_file)
+    with Session(engine) as db:
+        GroundStationService.create_ground_station(db, _gs_create_model)
+        for cache in (first, second):
+            for _ in range(2):
+                cache.load(db, "stations", lambda: db.exec(select(GroundStation)).all())
+
+    assert first.stats()["size"] == second.stats()["size"] == 1
+    # the token is only read again once the file changed
+    with Session(engine) as db, patch.object(
+        second, "_read_shared_token", side_effect=AssertionError
+    ):
+        second.load(db, "stations", lambda: db.exec(select(GroundStation)).all())
+    first.invalidate()
+    assert second.stats()["size"] == 1
+    with Session(engine) as db:
+        second.load(db, "stations", lambda: db.exec(select(GroundStation)).all())
+    assert second.stats()["misses"] == 2
@@ -0,0 +1,138 @@
+from datetime import datetime, timedelta, timezone
+import os
+import numpy as np
+import pytest
+from app.entities.GroundStation import GroundStation
+from app.entities.Satellite import Satellite
+from app.services.ephemeris import EphemerisStore
+from app.services.propagation import satellite_itrf
+from app.services.visibility import time_grid, visibility_matrix
+
+_tle_scisat = """SCISAT 1
+1 27858U 03036A   24271.51787419  .00002340  00000+0  31635-3 0  9999
+2 27858  73.9336 337.0907 0007403 194.1129 165.9841 14.79656508138550"""
+
+_tle_neossat = """NEOSSAT
+1 39089U 13009D   24271.52543360  .00000662  00000+0  24595-3 0  9997
+2 39089  98.4054  96.2203 0010420 322.4732  37.5725 14.35304192606691"""
+
+# inside the span of both TLEs
+_start = datetime(2024, 9, 28, 6, 0, tzinfo=timezone.utc)
+_end = datetime(2024, 9, 28, 12, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return EphemerisStore(str(tmp_path), step_seconds=60, span_days=2)
+
+
+@pytest.fixture
+def satellite():
+    return Satellite(name="SCISAT 1", tle=_tle_scisat)
+
+
+def test_positions_match_propagation(store, satellite):
+    positions = store.positions(satellite, _start, 360, 60)
+
+    expected = satellite_itrf(satellite.get_sf_sat(), time_grid(_start, _end, 60))
+    assert positions is not None
+    assert positions.shape == (3, 360)
+    assert np.allclose(positions, expected, atol=1e-6)
+
+
+def test_positions_are_memory_mapped(store, satellite):
+    store.positions(satellite, _start, 10, 60)
+
+    files = os.listdir(store.directory)
+    assert len(files) == 1
+    assert files[0].startswith(f"{satellite.id}_")
+    _, array = store.load(satellite)
+    assert isinstance(array, np.memmap)
+    assert not array.flags.writeable
+
+
+def test_positions_with_stride(store, satellite):
+    every_minute = store.positions(satellite, _start, 360, 60)
+    every_ten_minutes = store.positions(satellite, _start, 36, 600)
+
+    assert every_minute is not None and every_ten_minutes is not None
+    assert np.array_equal(every_ten_minutes, every_minute[:, ::10])
+
+
+def test_positions_outside_of_grid(store, satellite):
+    # not aligned with the stored steps
+    assert store.positions(satellite, _start + timedelta(seconds=30), 10, 60) is None
+    assert store.positions(satellite, _start, 10, 90) is None
+    # outside of the stored span
+    assert store.positions(satellite, _start + timedelta(days=5), 10, 60) is None
+    assert store.positions(satellite, _start - timedelta(days=5), 10, 60) is None
+    # without generating an ephemeris
+    assert os.listdir(store.directory) == []
+
+
+def test_new_tle_gets_new_file(store, satellite):
+    store.positions(satellite, _start, 10, 60)
+    satellite.tle = _tle_neossat
+    store.positions(satellite, _start, 10, 60)
+
+    assert len(os.listdir(store.directory)) == 2
+
+    store.invalidate(satellite.id)
+
+    assert os.listdir(store.directory) == []
+
+
+def test_open_files_are_bounded(tmp_path, satellite):
+    store = EphemerisStore(str(tmp_path), step_seconds=60, span_days=2, max_size=1)
+    other = Satellite(name="NEOSSAT", tle=_tle_neossat)
+
+    store.load(satellite)
+    store.load(other)
+
+    assert len(store._arrays) == 1
+    assert store._arrays.evictions == 1
+
+    # a new TLE drops the file of the previous one
+    other.tle = _tle_scisat
+    store.load(other)
+    assert len(store._arrays) == 1
+    assert store._arrays.evictions == 1
+
+
+def test_rewritten_file_is_reopened(store, satellite):
+    _, first = store.load(satellite)
+    path = os.path.join(store.directory, os.listdir(store.directory)[0])
+
+    # another process removes and regenerates the file
+    os.remove(path)
+    _, second = store.load(satellite)
+
+    assert second is not first
+    assert os.path.exists(path)
+    assert np.array_equal(first, second)
+    _, third = store.load(satellite)
+    assert third is second
+
+
+def test_visibility_matrix_from_store(store, satellite):
+    station = GroundStation(
+        id=1,
+        name="Inuvik NorthWest",
+        lat=68.3195,
+        lon=-133.549,
+        height=102.5,
+        mask=5,
+        uplink=0,
+        downlink=0,
+        science=0,
+    )
+
+    stored = visibility_matrix(
+        [satellite], [station], _start, _end, elevations=True, ephemeris=store
+    )
+    propagated = visibility_matrix(
+        [satellite], [station], _start, _end, elevations=True
+    )
+
+    assert len(os.listdir(store.directory)) == 1
+    assert np.allclose(stored, propagated, atol=1e-4)
@@ -0,0 +1,266 @@
+from datetime import datetime, timedelta, timezone
+import uuid
+from fastapi import HTTPException
+from pydantic import ValidationError
+import pytest
+from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel.pool import StaticPool
+from app.entities.ExclusionCone import ExclusionCone
+from app.entities.GroundStation import GroundStation
+from app.entities.Satellite import Satellite
+from app.models.exclusion_cone import (
+    ExclusionConeCreateModel,
+    ExclusionWindowsRequestModel,
+)
+from app.models.ground_station import GroundStationCreateModel
+from app.models.satellite import SatelliteCreateModel
+from app.services.exclusion_cache import exclusion_window_cache
+from app.services import exclusion_evaluator
+from app.services.exclusion_cone import ExclusionConeService
+from app.services.exclusion_evaluator import (
+    ExclusionEvaluatorService,
+    evaluate_exclusion_cones,
+    satellite_name_index,
+)
+from app.services.ground_station import GroundStationService
+from app.services.request import angle_diff, get_excl_times
+from app.services.satellite import SatelliteService
+
+_tle_scisat = """1 27858U 03036A   24271.51787419  .00002340  00000+0  31635-3 0  9999
+2 27858  73.9336 337.0907 0007403 194.1129 165.9841 14.79656508138550"""
+
+_tle_neossat = """1 39089U 13009D   24271.52543360  .00000662  00000+0  24595-3 0  9997
+2 39089  98.4054  96.2203 0010420 322.4732  37.5725 14.35304192606691"""
+
+_start = datetime(2025, 1, 21, 6, 0, tzinfo=timezone.utc)
+_end = datetime(2025, 1, 21, 18, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture(name="db_session")
+def session_fixture():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    SQLModel.metadata.create_all(
+        engine,
+        tables=[Satellite.__table__, ExclusionCone.__table__, GroundStation.__table__],  # type: ignore
+    )
+    with Session(engine) as session:
+        yield session
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    exclusion_window_cache.clear()
+    yield
+    exclusion_window_cache.clear()
+
+
+@pytest.fixture
+def scisat():
+    return Satellite(name="SCISAT 1", tle=_tle_scisat)
+
+
+@pytest.fixture
+def neossat():
+    return Satellite(name="NEOSSAT", tle=_tle_neossat)
+
+
+@pytest.fixture
+def prince_albert():
+    return GroundStation(
+        id=2,
+        name="Prince Albert",
+        lat=53.2124,
+        lon=-105.934,
+        height=490.3,
+        mask=0,
+        uplink=0,
+        downlink=0,
+        science=0,
+    )
+
+
+def _create_network(db: Session) -> tuple[Satellite, Satellite, GroundStation]:
+    sats = [
+        SatelliteService.create_satellite(
+            db,
+            SatelliteCreateModel(
+                name=name,
+                tle=tle,
+                uplink=1,
+                telemetry=1,
+                science=1,
+                priority=1,
+            ),
+        )
+        for name, tle in [("SCISAT 1", _tle_scisat), ("NEOSSAT", _tle_neossat)]
+    ]
+    gs = GroundStationService.create_ground_station(
+        db,
+        GroundStationCreateModel(
+            name="Prince Albert",
+            lat=53.2124,
+            lon=-105.934,
+            height=490.3,
+            mask=0,
+            uplink=0,
+            downlink=0,
+            science=0,
+        ),
+    )
+    return sats[0], sats[1], gs
+
+
+def test_satellite_name_index(scisat, neossat):
+    index = satellite_name_index([scisat, neossat])
+
+    assert index["scisat 1"] is scisat
+    assert index["neossat"] is neossat
+
+
+def test_evaluate_matches_angle_diff(scisat, neossat, prince_albert):
+    cone = ExclusionCone(
+        angle_limit=10,
+        interfering_satellite="  neossat ",
+        satellite_id=scisat.id,
+        gs_id=prince_albert.id,
+    )
+
+    windows = evaluate_exclusion_cones(
+        [cone], [scisat, neossat], [prince_albert], _start, _end
+    )
+
+    expected = get_excl_times(
+        angle_diff(
+            _start,
+            _end,
+            scisat.get_sf_sat(),
+            neossat.get_sf_sat(),
+            prince_albert.get_sf_geo_position(),
+        ),
+        10,
+    )
+    assert len(expected) > 0
+    assert [(w.start, w.end) for w in windows] == expected
+    assert all(w.cone_id == cone.id for w in windows)
+    assert all(w.interfering_satellite_id == neossat.id for w in windows)
+
+
+def test_evaluate_groups_cones(scisat, neossat, prince_albert):
+    narrow = ExclusionCone(
+        angle_limit=5,
+        interfering_satellite="NEOSSAT",
+        satellite_id=scisat.id,
+        gs_id=prince_albert.id,
+    )
+    wide = ExclusionCone(
+        angle_limit=20,
+        interfering_satellite="NEOSSAT",
+        satellite_id=scisat.id,
+        gs_id=prince_albert.id,
+    )
+    unknown = ExclusionCone(
+        angle_limit=20,
+        interfering_satellite="NOT A SATELLITE",
+        satellite_id=scisat.id,
+        gs_id=prince_albert.id,
+    )
+
+    windows = evaluate_exclusion_cones(
+        [narrow, wide, unknown], [scisat, neossat], [prince_albert], _start, _end
+    )
+
+    narrow_windows = [w for w in windows if w.cone_id == narrow.id]
+    wide_windows = [w for w in windows if w.cone_id == wide.id]
+    assert len(wide_windows) > 0
+    assert not any(w.cone_id == unknown.id for w in windows)
+    # every narrow exclusion lies inside a wide one
+    for n in narrow_windows:
+        assert any(w.start <= n.start and n.end <= w.end for w in wide_windows)
+
+
+def test_service_caches_until_write(db_session):
+    scisat, _, gs = _create_network(db_session)
+    ExclusionConeService.create_exclusion_cone(
+        db_session,
+        ExclusionConeCreateModel(
+            mission="SCISAT",
+            angle_limit=10,
+            interfering_satellite="NEOSSAT",
+            satellite_id=scisat.id,
+            gs_id=gs.id,
+        ),
+    )
+    request = ExclusionWindowsRequestModel(start=_start, end=_end)
+
+    first = ExclusionEvaluatorService.get_exclusion_windows(db_session, request)
+    second = ExclusionEvaluatorService.get_exclusion_windows(db_session, request)
+
+    assert len(first) > 0
+    assert second is first
+    assert exclusion_window_cache.stats()["hits"] == 1
+
+    ExclusionConeService.create_exclusion_cone(
+        db_session,
+        ExclusionConeCreateModel(
+            mission="SCISAT",
+            angle_limit=20,
+            interfering_satellite="NEOSSAT",
+            satellite_id=scisat.id,
+            gs_id=gs.id,
+        ),
+    )
+    third = ExclusionEvaluatorService.get_exclusion_windows(db_session, request)
+
+    assert third is not first
+    assert len({w.cone_id for w in third}) == 2
+
+
+def test_service_filters(db_session):
+    scisat, _, gs = _create_network(db_session)
+    ExclusionConeService.create_exclusion_cone(
+        db_session,
+        ExclusionConeCreateModel(
+            mission="SCISAT",
+            angle_limit=10,
+            interfering_satellite="NEOSSAT",
+            satellite_id=scisat.id,
+            gs_id=gs.id,
+        ),
+    )
+
+    windows = ExclusionEvaluatorService.get_exclusion_windows(
+        db_session,
+        ExclusionWindowsRequestModel(
+            start=_start, end=_end, satellite_ids=[uuid.uuid4()]
+        ),
+    )
+
+    assert windows == []
+
+
+def test_service_rejects_oversized_horizons(db_session, monkeypatch):
+    with pytest.raises(ValidationError):
+        ExclusionWindowsRequestModel(
+            start=_start, end=_start + timedelta(days=365), step_seconds=1
+        )
+
+    scisat, _, gs = _create_network(db_session)
+    ExclusionConeService.create_exclusion_cone(
+        db_session,
+        ExclusionConeCreateModel(
+            mission="SCISAT",
+            angle_limit=10,
+            interfering_satellite="NEOSSAT",
+            satellite_id=scisat.id,
+            gs_id=gs.id,
+        ),
+    )
+    monkeypatch.setattr(exclusion_evaluator, "EXCLUSION_WINDOWS_MAX_CELLS", 10)
+
+    with pytest.raises(HTTPException) as e:
+        ExclusionEvaluatorService.get_exclusion_windows(
+            db_session, ExclusionWindowsRequestModel(start=_start, end=_end)
+        )
+    assert e.value.status_code == 422
@@ -4,6 +4,7 @@ from app.entities.Satellite import Satellite
 from app.entities.ExclusionCone import ExclusionCone
 from app.entities.GroundStation import GroundStation
 from app.services.ground_station import GroundStationService
+from app.services.pagination import encode_cursor
 from app.models.ground_station import (
     GroundStationModel,
     GroundStationCreateModel,
@@ -99,6 +100,22 @@ def test_get_ground_stations(db_session: Session):
     assert result[1].id == 2
 
 
+def test_get_ground_stations_pages(db_session: Session):
+    for _ in range(5):
+        GroundStationService.create_ground_station(db_session, _gs_create_model)
+
+    first = GroundStationService.get_ground_stations(db_session, limit=2)
+    second = GroundStationService.get_ground_stations(
+        db_session, limit=2, cursor=encode_cursor([first[-1].id])
+    )
+
+    assert [gs.id for gs in first] == [1, 2]
+    assert [gs.id for gs in second] == [3, 4]
+    with pytest.raises(HTTPException) as e:
+        GroundStationService.get_ground_stations(db_session, cursor="not a cursor")
+    assert e.value.status_code == 400
+
+
 def test_get_ground_station(db_session: Session):
     GroundStationService.create_ground_station(db_session, _gs_create_model)
 
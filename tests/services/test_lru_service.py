@@ -0,0 +1,38 @@
+from app.services.lru import BoundedLRU
+
+
+def test_evicts_least_recently_used():
+    lru: BoundedLRU[str, int] = BoundedLRU(2)
+    lru.put("a", 1)
+    lru.put("b", 2)
+    assert lru.get("a") == 1
+    lru.put("c", 3)
+
+    assert lru.get("b") is None
+    assert lru.get("a") == 1 and lru.get("c") == 3
+    assert lru.stats() == {
+        "size": 2,
+        "max_size": 2,
+        "hits": 3,
+        "misses": 1,
+        "evictions": 1,
+    }
+
+
+def test_remove_keeps_counts_until_cleared():
+    lru: BoundedLRU[str, int] = BoundedLRU(4)
+    for key, value in (("sat1_a", 1), ("sat1_b", 2), ("sat2_a", 3)):
+        lru.put(key, value)
+    lru.get("sat2_a")
+
+    assert lru.remove_if(lambda key: key.startswith("sat1_")) == 2
+    assert lru.pop("sat2_a") == 3
+    assert lru.pop("sat2_a") is None
+    assert len(lru) == 0
+
+    lru.put("sat3_a", 4)
+    lru.discard_all()
+    assert lru.stats()["hits"] == 1
+
+    lru.clear()
+    assert lru.stats()["hits"] == 0
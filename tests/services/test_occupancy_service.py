@@ -0,0 +1,187 @@
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+import pytest
+from app.entities.GroundStation import GroundStation
+from app.entities.Request import ContactRequest, RFRequest
+from app.services.occupancy import OccupancyIndex, StationOccupancy
+from app.services.request import schedule_with_slots
+from app.services.timeline import to_epoch
+
+_start = datetime(2025, 1, 21, 10, 0, tzinfo=timezone.utc)
+
+
+def _contact(start: datetime, end: datetime, duration: int, gs_id: int = 1):
+    return ContactRequest(
+        mission="SCISAT",
+        satellite_id=uuid4(),
+        start_time=start,
+        end_time=end,
+        booking_id=None,
+        priority=1,
+        ground_station_id=gs_id,
+        orbit=1,
+        uplink=True,
+        telemetry=True,
+        science=True,
+        aos=start,
+        los=end,
+        rf_on=start,
+        rf_off=end,
+        duration=duration,
+    )
+
+
+def _station(id: int) -> GroundStation:
+    return GroundStation(
+        id=id,
+        name=f"Station {id}",
+        lat=53.2124,
+        lon=-105.934,
+        height=490.3,
+        mask=5,
+        uplink=0,
+        downlink=0,
+        science=0,
+    )
+
+
+def test_station_occupancy_overlaps():
+    occupancy = StationOccupancy()
+    occupancy.add(10, 20, "a")
+    occupancy.add(30, 40, "b")
+
+    assert occupancy.is_free(0, 10)
+    assert occupancy.is_free(20, 30)
+    assert occupancy.is_free(40, 50)
+    assert not occupancy.is_free(15, 16)
+    assert not occupancy.is_free(19, 31)
+    assert not occupancy.is_free(0, 100)
+    assert occupancy.overlapping(15, 35) == ["a", "b"]
+    assert occupancy.overlapping(20, 30) == []
+
+
+def test_station_occupancy_keeps_order():
+    occupancy = StationOccupancy()
+    for start in [50, 10, 30, 0, 70]:
+        occupancy.add(start, start + 5, start)
+
+    assert [item for _, _, item in occupancy] == [0, 10, 30, 50, 70]
+
+
+def test_station_occupancy_rejects_overlap():
+    occupancy = StationOccupancy()
+    occupancy.add(10, 20)
+
+    with pytest.raises(ValueError):
+        occupancy.add(15, 25)
+    with pytest.raises(ValueError):
+        occupancy.add(5, 5)
+    assert len(occupancy) == 1
+
+
+def test_station_occupancy_remove():
+    occupancy = StationOccupancy()
+    occupancy.add(10, 20, "a")
+
+    assert occupancy.remove(10, 20) == "a"
+    assert occupancy.is_free(10, 20)
+    with pytest.raises(KeyError):
+        occupancy.remove(10, 20)
+
+
+def test_station_occupancy_find_gap():
+    occupancy = StationOccupancy()
+    occupancy.add(10, 20)
+    occupancy.add(25, 40)
+
+    assert occupancy.find_gap(0, 100, 10) == 0
+    assert occupancy.find_gap(5, 100, 10) == 40
+    assert occupancy.find_gap(5, 100, 5) == 5
+    assert occupancy.find_gap(6, 100, 5) == 20
+    assert occupancy.find_gap(12, 45, 5) == 20
+    assert occupancy.find_gap(12, 45, 6) is None
+    assert StationOccupancy().find_gap(0, 10, 10) == 0
+
+
+def test_occupancy_index_is_per_station():
+    index = OccupancyIndex()
+    index.book(1, 0, 600)
+
+    assert not index.is_free(1, 300, 900)
+    assert index.is_free(2, 0, 600)
+    assert index.release(1, 0, 600) is None
+    assert index.is_free(1, 300, 900)
+
+
+def test_schedule_rejects_partially_overlapping_contacts():
+    first = _contact(_start, _start + timedelta(minutes=10), 600)
+    second = _contact(
+        _start + timedelta(minutes=5), _start + timedelta(minutes=15), 600
+    )
+
+    bookings = schedule_with_slots([first, second], [_station(1)])
+
+    assert [b.request_id for b in bookings] == [first.id]
+    assert not second.scheduled
+
+
+def test_schedule_rf_avoids_contacts():
+    contact = _contact(_start, _start + timedelta(minutes=15), 900, gs_id=1)
+    rf = RFRequest(
+        mission="SCISAT",
+        satellite_id=uuid4(),
+        start_time=_start,
+        end_time=_start + timedelta(minutes=30),
+        contact_id=None,
+        priority=1,
+        downlink_time_requested=900,
+    )
+
+    bookings = schedule_with_slots([contact, rf], [_station(1), _station(2)])
+
+    rf_bookings = [b for b in bookings if b.request_id == rf.id]
+    assert len(rf_bookings) == 1
+    assert rf_bookings[0].gs_id == 2
+    assert rf_bookings[0].slot.start_time == _start
+
+
+def _rf(minutes: int, requested: int):
+    return RFRequest(
+        mission="SCISAT",
+        satellite_id=uuid4(),
+        start_time=_start,
+        end_time=_start + timedelta(minutes=minutes),
+        contact_id=None,
+        priority=1,
+        downlink_time_requested=requested,
+    )
+
+
+def test_schedule_rf_books_exact_time():
+    short, longer = _rf(15, 30), _rf(15, 600)
+
+    bookings = schedule_with_slots([short, longer], [_station(1)])
+
+    assert [(b.slot.start_time, b.slot.end_time) for b in bookings] == [
+        (_start, _start + timedelta(seconds=30)),
+        (_start + timedelta(seconds=30), _start + timedelta(seconds=630)),
+    ]
+    assert short.scheduled and longer.scheduled
+
+
+def test_schedule_holds_setup_and_teardown():
+    first, second = _rf(15, 300), _rf(15, 300)
+    occupancy = OccupancyIndex()
+
+    bookings = schedule_with_slots(
+        [first, second], [_station(1)], occupancy, setup=60, teardown=30
+    )
+
+    # setup may start before the request window
+    assert [b.slot.start_time for b in bookings] == [
+        _start,
+        _start + timedelta(seconds=300 + 30 + 60),
+    ]
+    assert not occupancy.is_free(1, to_epoch(_start) - 60, to_epoch(_start) - 59)
+    assert occupancy.is_free(1, to_epoch(_start) + 720, to_epoch(_start) + 900)
+    assert second.scheduled
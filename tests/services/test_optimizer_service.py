@@ -0,0 +1,299 @@
+from datetime import datetime, timedelta, timezone
+import random
+from uuid import uuid4
+from app.entities.GroundStation import GroundStation
+from app.entities.Request import ContactRequest, RFRequest
+from app.services.local_search import improve_schedule
+from app.services.occupancy import OccupancyIndex
+from app.services.optimizer import (
+    candidate_intervals,
+    request_weights,
+    requested_time,
+    schedule_optimal,
+    station_cliques,
+)
+from app.services.request import schedule_with_slots
+from app.services.timeline import to_epoch
+
+_start = datetime(2025, 1, 21, 10, 0, tzinfo=timezone.utc)
+
+
+def _station(id: int) -> GroundStation:
+    return GroundStation(
+        id=id,
+        name=f"Station {id}",
+        lat=53.2124,
+        lon=-105.934,
+        height=490.3,
+        mask=5,
+        uplink=0,
+        downlink=0,
+        science=0,
+    )
+
+
+def _rf(minutes: int, requested: int, priority: int = 1, min_passes: int = 1):
+    return RFRequest(
+        mission="SCISAT",
+        satellite_id=uuid4(),
+        start_time=_start,
+        end_time=_start + timedelta(minutes=minutes),
+        contact_id=None,
+        priority=priority,
+        downlink_time_requested=requested,
+        min_passes=min_passes,
+    )
+
+
+def _contact(start: datetime, minutes: int, duration: int, gs_id: int = 1):
+    return ContactRequest(
+        mission="SCISAT",
+        satellite_id=uuid4(),
+        start_time=start,
+        end_time=start + timedelta(minutes=minutes),
+        booking_id=None,
+        priority=1,
+        ground_station_id=gs_id,
+        orbit=1,
+        uplink=True,
+        telemetry=True,
+        science=True,
+        aos=start,
+        los=start + timedelta(minutes=minutes),
+        rf_on=start,
+        rf_off=start + timedelta(minutes=minutes),
+        duration=duration,
+    )
+
+
+def _booked(bookings, request) -> float:
+    return sum(
+        (b.slot.end_time - b.slot.start_time).total_seconds()
+        for b in bookings
+        if b.request_id == request.id
+    )
+
+
+def _assert_no_overlaps(bookings, setup: int = 0, teardown: int = 0):
+    occupancy = OccupancyIndex()
+    for b in bookings:
+        occupancy.book(
+            b.gs_id,
+            to_epoch(b.slot.start_time) - setup,
+            to_epoch(b.slot.end_time) + teardown,
+        )
+
+
+def _value(requests, bookings):
+    weights = request_weights(requests)
+    return sum(
+        w * min(_booked(bookings, r), requested_time(r))
+        for w, r in zip(weights, requests)
+    )
+
+
+def test_station_cliques_cover_overlaps():
+    requests = [_rf(30, 900), _rf(45, 900)]
+    requests[1].start_time = _start + timedelta(minutes=5)
+    candidates = candidate_intervals(requests, [_station(1)], OccupancyIndex())
+
+    cliques = station_cliques(candidates)
+
+    for a, first in enumerate(candidates):
+        for b, second in enumerate(candidates[a + 1 :], a + 1):
+            overlap = first.start < second.end and second.start < first.end
+            assert overlap == any(a in c and b in c for c in cliques)
+
+
+def test_optimal_prefers_priority_over_deadline():
+    urgent = _rf(15, 900, priority=1)
+    important = _rf(30, 1800, priority=10)
+
+    greedy = schedule_with_slots([urgent, important], [_station(1)])
+    optimal = schedule_optimal([urgent, important], [_station(1)])
+
+    assert _booked(greedy, important) == 900
+    assert _booked(optimal, important) == 1800
+    assert _booked(optimal, urgent) == 0
+    assert important.scheduled and not urgent.scheduled
+
+
+def test_optimal_leaves_unbooked_rf_without_station():
+    urgent = _rf(15, 900, priority=1)
+    important = _rf(30, 1800, priority=10)
+
+    optimal = schedule_optimal([urgent, important], [_station(1)])
+
+    assert _booked(optimal, urgent) == 0
+    assert urgent.ground_station_id is None
+    assert important.ground_station_id == 1
+
+
+def test_optimal_respects_min_passes():
+    rf = _rf(30, 900, min_passes=3)
+
+    assert schedule_optimal([rf], [_station(1)]) == []
+    assert not rf.scheduled
+
+
+def test_optimal_books_rf_on_one_station_at_a_time():
+    rf = _rf(15, 1800)
+
+    bookings = schedule_optimal([rf], [_station(1), _station(2)])
+
+    assert _booked(bookings, rf) == 900
+    intervals = sorted((b.slot.start_time, b.slot.end_time) for b in bookings)
+    assert all(a[1] <= b[0] for a, b in zip(intervals, intervals[1:]))
+    assert not rf.scheduled
+
+
+def test_optimal_and_improve_hold_margins():
+    def requests():
+        return [
+            _rf(60, 900),
+            _rf(60, 900, priority=2),
+            _contact(_start + timedelta(minutes=15), 15, 900),
+        ]
+
+    optimal_requests = requests()
+    optimal = schedule_optimal(optimal_requests, [_station(1)], setup=120, teardown=60)
+    _assert_no_overlaps(optimal, 120, 60)
+    assert len({b.request_id for b in optimal}) == 2
+
+    greedy_requests = requests()
+    greedy = schedule_with_slots(greedy_requests, [_station(1)], setup=120, teardown=60)
+    improved = improve_schedule(
+        greedy_requests, [_station(1)], greedy, 50, seed=2, setup=120, teardown=60
+    )
+    _assert_no_overlaps(improved, 120, 60)
+
+
+def test_optimal_books_rf_within_passes():
+    rf = _rf(60, 1200)
+    start = to_epoch(_start)
+    passes = {(rf.satellite_id, 2): [(start + 600, start + 1500)]}
+
+    bookings = schedule_optimal([rf], [_station(1), _station(2)], passes=passes)
+
+    assert {b.gs_id for b in bookings} == {2}
+    for b in bookings:
+        assert start + 600 <= to_epoch(b.slot.start_time)
+        assert to_epoch(b.slot.end_time) <= start + 1500
+    assert _booked(bookings, rf) == 900
+
+
+def test_optimal_keeps_existing_bookings():
+    occupancy = OccupancyIndex()
+    occupancy.book(1, to_epoch(_start), to_epoch(_start) + 900)
+    rf = _rf(30, 1800)
+
+    bookings = schedule_optimal([rf], [_station(1)], occupancy)
+
+    assert len(bookings) == 1
+    assert bookings[0].slot.start_time == _start + timedelta(minutes=15)
+
+
+def test_optimal_beats_greedy_on_random_requests():
+    rng = random.Random(7)
+    stations = [_station(1), _station(2)]
+
+    def requests():
+        rng.seed(7)
+        made = []
+        for _ in range(12):
+            offset = timedelta(minutes=15 * rng.randrange(8))
+            if rng.random() < 0.3:
+                made.append(_contact(_start + offset, 30, rng.choice([300, 900, 1200])))
+            else:
+                rf = _rf(15 * rng.randrange(1, 6), rng.choice([600, 900, 1800]))
+                rf.start_time += offset
+                rf.end_time += offset
+                rf.priority = rng.randrange(1, 4)
+                made.append(rf)
+        return made
+
+    greedy_requests = requests()
+    greedy = schedule_with_slots(greedy_requests, stations)
+    optimal_requests = requests()
+    optimal = schedule_optimal(optimal_requests, stations)
+
+    _assert_no_overlaps(optimal)
+    for request in optimal_requests:
+        assert _booked(optimal, request) <= requested_time(request)
+    assert _value(optimal_requests, optimal) >= _value(greedy_requests, greedy)
+
+
+def test_improve_without_budget_keeps_bookings():
+    requests = [_rf(30, 900)]
+    bookings = schedule_with_slots(requests, [_station(1)])
+
+    assert improve_schedule(requests, [_station(1)], bookings, 0) is bookings
+
+
+def test_improve_prefers_priority_over_deadline():
+    urgent = _rf(15, 900, priority=1)
+    important = _rf(30, 1800, priority=10)
+    requests = [urgent, important]
+    greedy = schedule_with_slots(requests, [_station(1)])
+
+    improved = improve_schedule(requests, [_station(1)], greedy, 200, seed=1)
+
+    assert _booked(improved, important) == 1800
+    assert important.scheduled and not urgent.scheduled
+
+
+def test_improve_keeps_unchanged_bookings():
+    requests = [_rf(30, 900), _rf(30, 900)]
+    stations = [_station(1), _station(2)]
+    greedy = schedule_with_slots(requests, stations)
+
+    improved = improve_schedule(requests, stations, greedy, 20, seed=1)
+
+    assert {b.id for b in improved} == {b.id for b in greedy}
+
+
+def test_improve_never_loses_value():
+    rng = random.Random(3)
+    stations = [_station(1), _station(2)]
+    requests = []
+    for _ in range(20):
+        offset = timedelta(minutes=15 * rng.randrange(8))
+        if rng.random() < 0.3:
+            requests.append(_contact(_start + offset, 30, rng.choice([300, 900])))
+        else:
+            rf = _rf(15 * rng.randrange(1, 6), rng.choice([600, 900, 1800]))
+            rf.start_time += offset
+            rf.end_time += offset
+            rf.priority = rng.randrange(1, 4)
+            requests.append(rf)
+    greedy = schedule_with_slots(requests, stations)
+    before = _value(requests, greedy)
+
+    improved = improve_schedule(requests, stations, greedy, 100, seed=3)
+
+    _assert_no_overlaps(improved)
+    for request in requests:
+        assert _booked(improved, request) <= requested_time(request)
+    assert _value(requests, improved) >= before
+
+
+def test_improve_handles_requests_booked_across_passes():
+    stations = [_station(1), _station(2)]
+    start = to_epoch(_start)
+    for seed in range(10):
+        rf = _rf(15, 600)
+        passes = {
+            (rf.satellite_id, 1): [(start, start + 100)],
+            (rf.satellite_id, 2): [(start, start + 3600)],
+        }
+        greedy = schedule_with_slots([rf], stations, passes=passes)
+        assert {b.gs_id for b in greedy} == {1, 2}
+
+        improved = improve_schedule(
+            [rf], stations, greedy, 20, passes=passes, seed=seed
+        )
+
+        _assert_no_overlaps(improved)
+        intervals = sorted((b.slot.start_time, b.slot.end_time) for b in improved)
+        assert all(a[1] <= b[0] for a, b in zip(intervals, intervals[1:]))
+        assert _booked(improved, rf) == 600
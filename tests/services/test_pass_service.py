@@ -0,0 +1,165 @@
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+import pytest
+from app.entities.GroundStation import GroundStation
+from app.entities.Request import RFRequest
+from app.entities.Satellite import Satellite
+from app.services.passes import (
+    find_passes,
+    pass_windows,
+    predict_passes,
+    visible_window,
+)
+from app.services.propagation import get_timescale
+from app.services.request import schedule_with_slots
+
+_tle_scisat = """SCISAT 1
+1 27858U 03036A   24271.51787419  .00002340  00000+0  31635-3 0  9999
+2 27858  73.9336 337.0907 0007403 194.1129 165.9841 14.79656508138550"""
+
+_tle_neossat = """NEOSSAT
+1 39089U 13009D   24271.52543360  .00000662  00000+0  24595-3 0  9997
+2 39089  98.4054  96.2203 0010420 322.4732  37.5725 14.35304192606691"""
+
+_start = datetime(2025, 1, 21, 6, 0, tzinfo=timezone.utc)
+_end = datetime(2025, 1, 21, 18, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def satellites():
+    return [
+        Satellite(name="SCISAT 1", tle=_tle_scisat),
+        Satellite(name="NEOSSAT", tle=_tle_neossat),
+    ]
+
+
+@pytest.fixture
+def stations():
+    return [
+        GroundStation(
+            id=1,
+            name="Inuvik NorthWest",
+            lat=68.3195,
+            lon=-133.549,
+            height=102.5,
+            mask=5,
+            uplink=0,
+            downlink=0,
+            science=0,
+        ),
+        GroundStation(
+            id=2,
+            name="Prince Albert",
+            lat=53.2124,
+            lon=-105.934,
+            height=490.3,
+            mask=5,
+            uplink=0,
+            downlink=0,
+            science=0,
+        ),
+    ]
+
+
+def _altitude(sat: Satellite, gs: GroundStation, time: datetime) -> float:
+    t = get_timescale().from_datetime(time)
+    altitude, _, _ = (sat.get_sf_sat() - gs.get_sf_geo_position()).at(t).altaz()
+    return altitude.degrees
+
+
+def test_find_passes_respects_mask(satellites, stations):
+    sat, gs = satellites[0], stations[1]
+
+    windows = find_passes(sat.get_sf_sat(), gs, _start, _end)
+
+    assert len(windows) > 0
+    for aos, los in windows:
+        assert _start <= aos < los <= _end
+        assert _altitude(sat, gs, aos + (los - aos) / 2) > gs.mask
+        assert _altitude(sat, gs, aos - timedelta(seconds=5)) < gs.mask
+        assert _altitude(sat, gs, los + timedelta(seconds=5)) < gs.mask
+
+
+def test_find_passes_clips_pass_in_progress(satellites, stations):
+    sat, gs = satellites[0], stations[1]
+    aos, los = find_passes(sat.get_sf_sat(), gs, _start, _end)[0]
+    middle = aos + (los - aos) / 2
+
+    clipped = find_passes(sat.get_sf_sat(), gs, middle, _end)
+
+    assert clipped[0][0] == middle
+    assert abs((clipped[0][1] - los).total_seconds()) < 1
+
+
+def test_find_passes_empty_window(satellites, stations):
+    assert find_passes(satellites[0].get_sf_sat(), stations[0], _end, _start) == []
+
+
+def test_predict_passes_covers_every_pair(satellites, stations):
+    visibilities = predict_passes(satellites, stations, _start, _end)
+
+    pairs = {(v.sat.name, v.gs.id) for v in visibilities}
+    assert pairs == {(s.name, gs.id) for s in satellites for gs in stations}
+    starts = [v.start for v in visibilities]
+    assert starts == sorted(starts)
+    assert all(v.dur > 0 for v in visibilities)
+
+
+def test_visible_window_clips_to_pass():
+    windows = [(100, 200), (300, 400)]
+
+    assert visible_window(windows, 0, 100) is None
+    assert visible_window(windows, 150, 250) == (150, 200)
+    assert visible_window(windows, 200, 300) is None
+    assert visible_window(windows, 250, 350) == (300, 350)
+    assert visible_window(windows, 310, 320) == (310, 320)
+    assert visible_window(windows, 400, 500) is None
+    assert visible_window([], 0, 100) is None
+
+
+def test_rf_bookings_stay_within_passes(satellites, stations):
+    sat = satellites[0]
+    sat.id = uuid4()
+    rf = RFRequest(
+        mission="SCISAT",
+        satellite_id=sat.id,
+        start_time=_start,
+        end_time=_end,
+        contact_id=None,
+        priority=1,
+        downlink_time_requested=1800,
+    )
+    passes = pass_windows([sat], stations, _start, _end + timedelta(minutes=15))
+
+    bookings = schedule_with_slots([rf], stations, passes=passes)
+
+    assert len(bookings) > 0
+    assert rf.scheduled
+    booked = sum(
+        (b.slot.end_time - b.slot.start_time).total_seconds() for b in bookings
+    )
+    assert booked >= 1800
+    for booking in bookings:
+        start, end = booking.slot.start_time, booking.slot.end_time
+        assert visible_window(
+            passes[(sat.id, booking.gs_id)],
+            int(start.timestamp()),
+            int(end.timestamp()),
+        ) == (int(start.timestamp()), int(end.timestamp()))
+        gs = next(gs for gs in stations if gs.id == booking.gs_id)
+        assert _altitude(sat, gs, start + (end - start) / 2) > gs.mask
+
+
+def test_rf_request_without_passes_is_not_booked(satellites, stations):
+    rf = RFRequest(
+        mission="SCISAT",
+        satellite_id=uuid4(),
+        start_time=_start,
+        end_time=_end,
+        contact_id=None,
+        priority=1,
+        downlink_time_requested=900,
+    )
+
+    assert schedule_with_slots([rf], stations, passes={}) == []
+    assert not rf.scheduled
@@ -0,0 +1,157 @@
+import numpy as np
+import pytest
+from skyfield.framelib import itrs
+from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel.pool import StaticPool
+from app.entities.Satellite import Satellite
+from app.entities.ExclusionCone import ExclusionCone
+from app.entities.GroundStation import GroundStation
+from app.models.satellite import SatelliteCreateModel, SatelliteUpdateModel
+from app.services.propagation import (
+    PropagatorCache,
+    get_timescale,
+    parse_tle,
+    propagator_cache,
+    satellite_itrf,
+    tle_hash,
+)
+from app.services.satellite import SatelliteService
+
+_tle_scisat = """SCISAT 1
+1 27858U 03036A   24271.51787419  .00002340  00000+0  31635-3 0  9999
+2 27858  73.9336 337.0907 0007403 194.1129 165.9841 14.79656508138550"""
+
+_tle_neossat = """NEOSSAT
+1 39089U 13009D   24271.52543360  .00000662  00000+0  24595-3 0  9997
+2 39089  98.4054  96.2203 0010420 322.4732  37.5725 14.35304192606691"""
+
+
+@pytest.fixture(name="db_session")
+def session_fixture():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    SQLModel.metadata.create_all(
+        engine,
+        tables=[Satellite.__table__, ExclusionCone.__table__, GroundStation.__table__],  # type: ignore
+    )
+    with Session(engine) as session:
+        yield session
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    propagator_cache.clear()
+    yield
+    propagator_cache.clear()
+
+
+def test_timescale_is_singleton():
+    assert get_timescale() is get_timescale()
+
+
+def test_tle_hash_ignores_whitespace():
+    assert tle_hash(_tle_scisat) == tle_hash(f"\n{_tle_scisat}  \n")
+    assert tle_hash(_tle_scisat) != tle_hash(_tle_neossat)
+
+
+@pytest.mark.parametrize(
+    "utc",
+    [
+        (2025, 1, 21, 6, np.arange(0, 1440, 7)),
+        (2025, 1, 21, 6, 30.5),
+        (2016, 12, 31, 23, 59, np.arange(50, 70, 0.5)),
+    ],
+    ids=["array", "scalar", "leap second"],
+)
+def test_satellite_itrf_matches_skyfield_frames(utc):
+    satellite = parse_tle(_tle_scisat)
+    times = get_timescale().utc(*utc)
+
+    expected = satellite.at(times).frame_xyz(itrs).km
+
+    assert np.allclose(satellite_itrf(satellite, times), expected, rtol=0, atol=1e-6)
+
+
+def test_cache_hit_and_miss():
+    cache = PropagatorCache(max_size=4)
+
+    first = cache.get(_tle_scisat)
+    second = cache.get(_tle_scisat)
+
+    assert first is second
+    assert first.name == "SCISAT 1"
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_cache_two_line_tle_uses_given_name():
+    two_lines = "\n".join(_tle_neossat.splitlines()[1:])
+
+    satellite = PropagatorCache().get(two_lines, "NEOSSAT")
+
+    assert satellite.name == "NEOSSAT"
+
+
+def test_cache_evicts_least_recently_used():
+    cache = PropagatorCache(max_size=1)
+
+    cache.get(_tle_scisat)
+    cache.get(_tle_neossat)
+    cache.get(_tle_scisat)
+
+    stats = cache.stats()
+    assert stats["size"] == 1
+    assert stats["misses"] == 3
+    assert stats["evictions"] == 2
+
+
+def test_get_sf_sat_uses_cache():
+    sat = Satellite(name="SCISAT 1", tle=_tle_scisat)
+
+    assert sat.get_sf_sat() is sat.get_sf_sat()
+    assert propagator_cache.stats()["hits"] == 1
+
+
+def test_update_satellite_tle_invalidates_cache(db_session: Session):
+    sat = SatelliteService.create_satellite(
+        db_session,
+        SatelliteCreateModel(
+            name="SCISAT 1",
+            tle=_tle_scisat,
+            uplink=1,
+            telemetry=1,
+            science=1,
+            priority=1,
+        ),
+    )
+    old_propagator = sat.get_sf_sat()
+
+    SatelliteService.update_satellite(
+        db_session, sat.id, SatelliteUpdateModel(tle=_tle_neossat)
+    )
+
+    assert propagator_cache.stats()["size"] == 0
+    assert sat.get_sf_sat() is not old_propagator
+    assert sat.get_sf_sat().name == "NEOSSAT"
+
+
+def test_update_satellite_without_tle_keeps_cache(db_session: Session):
+    sat = SatelliteService.create_satellite(
+        db_session,
+        SatelliteCreateModel(
+            name="SCISAT 1",
+            tle=_tle_scisat,
+            uplink=1,
+            telemetry=1,
+            science=1,
+            priority=1,
+        ),
+    )
+    propagator = sat.get_sf_sat()
+
+    SatelliteService.update_satellite(
+        db_session, sat.id, SatelliteUpdateModel(priority=5)
+    )
+
+    assert sat.get_sf_sat() is propagator
@@ -1,12 +1,27 @@
 import numpy as np
 import pytest
 from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
 from skyfield.api import EarthSatellite, load
-from app.services.request import angle_diff, get_excl_times, is_visible
+from app.services.request import (
+    angle_diff,
+    angle_diff_batch,
+    get_excl_times,
+    get_excl_times_adaptive,
+    get_excl_times_array,
+    is_visible,
+    Booking,
+    Slot,
+    overlaps_window,
+)
 from app.entities.GroundStation import GroundStation
 from uuid import UUID, uuid4
+from sqlalchemy import create_mock_engine, event
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateIndex
 from sqlmodel import Session, SQLModel, create_engine
 from app.services.request import RequestService
+from app.services.pagination import encode_cursor
 from app.models.request import RFTimeRequestModel, ContactRequestModel
 from app.entities.Request import RFRequest, ContactRequest
 from app.entities.Satellite import Satellite
@@ -137,6 +152,30 @@ def test_angle_diff(setup_satellites, setup_ground_station):
     assert angles == expected_angles
 
 
+def test_angle_diff_batch(setup_satellites, setup_ground_station):
+    sats = setup_satellites
+    gs_pos = setup_ground_station["prince_albert"].get_sf_geo_position()
+
+    start_time = datetime(2025, 1, 21, 6, 0, tzinfo=timezone.utc)
+    end_time = datetime(2025, 1, 21, 18, 0, tzinfo=timezone.utc)
+
+    series = angle_diff_batch(
+        start_time, end_time, sats["scisat"], sats["neossat"], gs_pos
+    )
+
+    # one sample per minute of the window
+    assert len(series.times) == 12 * 60
+    assert series.sat1_altitude.shape == (12 * 60,)
+    assert series.sat2_altitude.shape == (12 * 60,)
+    assert series.separation.shape == (12 * 60,)
+
+    # the list output is the visible subset of the arrays
+    angles = angle_diff(start_time, end_time, sats["scisat"], sats["neossat"], gs_pos)
+    visible = series.visible
+    assert int(visible.sum()) == len(angles)
+    assert series.separation[visible].tolist() == [angle for _, angle in angles]
+
+
 def test_get_excl_times(setup_satellites, setup_ground_station):
     # Get the fixtures
     sats = setup_satellites
@@ -175,6 +214,79 @@ def test_get_excl_times(setup_satellites, setup_ground_station):
             assert start <= end
 
 
+def test_get_excl_times_array(setup_satellites, setup_ground_station):
+    sats = setup_satellites
+    gs_pos = setup_ground_station["prince_albert"].get_sf_geo_position()
+
+    start_time = datetime(2025, 1, 21, 6, 0, tzinfo=timezone.utc)
+    end_time = datetime(2025, 1, 21, 18, 0, tzinfo=timezone.utc)
+
+    series = angle_diff_batch(
+        start_time, end_time, sats["scisat"], sats["neossat"], gs_pos
+    )
+    angles = np.where(series.visible, series.separation, np.nan)
+    times = np.array(series.times.utc_datetime())
+
+    starts, ends = get_excl_times_array(times, angles, 10)
+
+    expected = get_excl_times(
+        angle_diff(start_time, end_time, sats["scisat"], sats["neossat"], gs_pos), 10
+    )
+    assert list(zip(starts, ends)) == expected
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 5, 100])
+def test_get_excl_times_array_chunks(chunk_size):
+    times = np.arange(12)
+    angles = np.array([1, 1, 20, np.nan, 3, 4, 5, 20, 20, 2, 20, 1], dtype=float)
+
+    starts, ends = get_excl_times_array(times, angles, 10, chunk_size=chunk_size)
+
+    assert starts.tolist() == [0, 4, 9, 11]
+    assert ends.tolist() == [1, 6, 9, 11]
+
+
+def test_get_excl_times_array_empty():
+    starts, ends = get_excl_times_array(np.array([]), np.array([]), 10)
+
+    assert len(starts) == 0
+    assert len(ends) == 0
+
+
+def test_get_excl_times_adaptive(setup_satellites, setup_ground_station):
+    sats = setup_satellites
+    gs_pos = setup_ground_station["prince_albert"].get_sf_geo_position()
+    ts = sats["ts"]
+
+    start_time = datetime(2025, 1, 21, 6, 0, tzinfo=timezone.utc)
+    end_time = datetime(2025, 1, 21, 18, 0, tzinfo=timezone.utc)
+
+    exclusion_times = get_excl_times_adaptive(
+        start_time, end_time, sats["scisat"], sats["neossat"], gs_pos, 10
+    )
+
+    # every minute sample below the threshold lies inside a refined interval
+    sampled = get_excl_times(
+        angle_diff(start_time, end_time, sats["scisat"], sats["neossat"], gs_pos), 10
+    )
+    assert len(exclusion_times) == len(sampled)
+    for (start, end), (sampled_start, sampled_end) in zip(exclusion_times, sampled):
+        assert start <= sampled_start <= sampled_end <= end
+        assert (end - start) < timedelta(minutes=3)
+
+    # boundaries are either a threshold crossing or a satellite rising/setting
+    for boundary in [t for interval in exclusion_times for t in interval]:
+        t = ts.from_datetime(boundary)
+        sat1_observed = (sats["scisat"] - gs_pos).at(t)
+        sat2_observed = (sats["neossat"] - gs_pos).at(t)
+        separation = sat1_observed.separation_from(sat2_observed).degrees
+        altitudes = [
+            sat1_observed.altaz()[0].degrees,
+            sat2_observed.altaz()[0].degrees,
+        ]
+        assert abs(separation - 10) < 0.1 or min(abs(a) for a in altitudes) < 0.1
+
+
 def test_is_visible(setup_satellites, setup_ground_station):
     # Get the fixtures
     sats = setup_satellites
@@ -395,6 +507,229 @@ def test_transform_request_to_general(
     assert general_model.endTime == rf_request.end_time
 
 
+def test_get_all_transformed_requests_joins_satellites(
+    db: Session, sample_satellite, sample_ground_station
+):
+    start_time = datetime(2024, 9, 28, 12, 0)
+    for i in range(10):
+        db.add(
+            RFRequest(
+                mission="Test Mission",
+                satellite_id=sample_satellite.id,
+                start_time=start_time,
+                end_time=start_time + timedelta(hours=1),
+                contact_id=None,
+                priority=1,
+                downlink_time_requested=600,
+            )
+        )
+        db.add(
+            ContactRequest(
+                mission="Test Mission",
+                satellite_id=sample_satellite.id,
+                start_time=start_time,
+                end_time=start_time + timedelta(minutes=10),
+                booking_id=None,
+                priority=1,
+                ground_station_id=sample_ground_station.id,
+                orbit=i,
+                uplink=True,
+                telemetry=True,
+                science=False,
+                aos=start_time,
+                los=start_time + timedelta(minutes=10),
+                rf_on=start_time,
+                rf_off=start_time + timedelta(minutes=10),
+                duration=600,
+            )
+        )
+    db.commit()
+
+    statements = []
+
+    def listener(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(db.get_bind(), "before_cursor_execute", listener)
+    try:
+        general = RequestService.get_all_transformed_requests(db)
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", listener)
+
+    assert len(statements) == 2
+    assert len(general) == 20
+    assert {g.satellite_name for g in general} == {sample_satellite.name}
+    assert sorted({g.station_id for g in general}) == [-1, sample_ground_station.id]
+
+
+def test_get_all_transformed_requests_pages_and_filters(
+    db: Session, sample_satellite, sample_ground_station
+):
+    start_time = datetime(2024, 9, 28, 12, 0)
+    for i in range(6):
+        db.add(
+            RFRequest(
+                mission="Test Mission",
+                satellite_id=sample_satellite.id,
+                start_time=start_time + timedelta(hours=i),
+                end_time=start_time + timedelta(hours=i + 1),
+                contact_id=None,
+                priority=1,
+                downlink_time_requested=600,
+            )
+        )
+        db.add(
+            ContactRequest(
+                mission="Test Mission",
+                satellite_id=sample_satellite.id,
+                start_time=start_time + timedelta(hours=i, minutes=30),
+                end_time=start_time + timedelta(hours=i, minutes=40),
+                booking_id=None,
+                priority=1,
+                ground_station_id=sample_ground_station.id,
+                orbit=i,
+                uplink=True,
+                telemetry=True,
+                science=False,
+                aos=start_time,
+                los=start_time + timedelta(minutes=10),
+                rf_on=start_time,
+                rf_off=start_time + timedelta(minutes=10),
+                duration=600,
+            )
+        )
+    db.commit()
+    everything = RequestService.get_all_transformed_requests(db)
+
+    pages, cursor = [], None
+    while True:
+        page = RequestService.get_all_transformed_requests(db, 5, cursor)
+        pages.append(page)
+        if len(page) < 5:
+            break
+        cursor = encode_cursor([page[-1].startTime, page[-1].id])
+
+    assert [len(p) for p in pages] == [5, 5, 2]
+    assert [r.id for p in pages for r in p] == [r.id for r in everything]
+    assert [r.startTime for r in everything] == sorted(r.startTime for r in everything)
+
+    window = RequestService.get_all_transformed_requests(
+        db,
+        start=start_time + timedelta(hours=2),
+        end=start_time + timedelta(hours=4),
+    )
+    assert {r.startTime.hour for r in window} == {14, 15}
+    contacts = RequestService.get_all_transformed_requests(
+        db, request_type="Contact", station_id=sample_ground_station.id
+    )
+    assert len(contacts) == 6
+    assert {r.requestType for r in contacts} == {"Contact"}
+    assert RequestService.get_all_transformed_requests(db, satellite_id=uuid4()) == []
+
+
+def test_get_requests_in_window(db: Session, sample_satellite, sample_ground_station):
+    start_time = datetime(2024, 9, 28, 12, 0)
+    for i in range(4):
+        db.add(
+            RFRequest(
+                mission="Test Mission",
+                satellite_id=sample_satellite.id,
+                start_time=start_time + timedelta(hours=i),
+                end_time=start_time + timedelta(hours=i + 1),
+                contact_id=None,
+                priority=1,
+                downlink_time_requested=600,
+                scheduled=i == 1,
+            )
+        )
+    db.add(
+        ContactRequest(
+            mission="Test Mission",
+            satellite_id=sample_satellite.id,
+            start_time=start_time + timedelta(hours=1, minutes=30),
+            end_time=start_time + timedelta(hours=1, minutes=40),
+            booking_id=None,
+            priority=1,
+            ground_station_id=sample_ground_station.id,
+            orbit=1,
+            uplink=True,
+            telemetry=True,
+            science=False,
+            aos=start_time,
+            los=start_time + timedelta(minutes=10),
+            rf_on=start_time,
+            rf_off=start_time + timedelta(minutes=10),
+            duration=600,
+        )
+    )
+    db.commit()
+
+    # windows are half open, the requests ending at 13:00 and starting at 15:00 are out
+    window = RequestService.get_requests_in_window(
+        db,
+        datetime(2024, 9, 28, 13, 0, tzinfo=timezone.utc),
+        datetime(2024, 9, 28, 15, 0, tzinfo=timezone.utc),
+    )
+    assert [(type(r), r.start_time.hour) for r in window] == [
+        (RFRequest, 13),
+        (RFRequest, 14),
+        (ContactRequest, 13),
+    ]
+    waiting = RequestService.get_requests_in_window(
+        db, start_time, start_time + timedelta(hours=4), scheduled=False
+    )
+    assert [r.start_time.hour for r in waiting] == [12, 14, 15, 13]
+    assert RequestService.get_requests_in_window(
+        db,
+        start_time,
+        start_time + timedelta(hours=4),
+        gs_ids=[sample_ground_station.id],
+        request_type="Contact",
+    ) == [window[2]]
+    assert (
+        RequestService.get_requests_in_window(
+            db, start_time, start_time + timedelta(hours=4), satellite_ids=[uuid4()]
+        )
+        == []
+    )
+
+
+def test_window_queries_use_tsrange_on_postgresql():
+    engine = create_mock_engine("postgresql://", executor=None)
+    dialect = postgresql.dialect()
+    index = next(i for i in RFRequest.__table__.indexes if i.name.endswith("_window"))
+
+    assert "USING gist (tsrange(start_time, end_time))" in str(
+        CreateIndex(index).compile(dialect=dialect)
+    )
+    with Session(engine) as session:
+        condition = overlaps_window(
+            session, RFRequest, datetime(2024, 9, 28), datetime(2024, 9, 29)
+        )
+    assert "tsrange(rf_request.start_time, rf_request.end_time) && tsrange(" in str(
+        condition.compile(dialect=dialect)
+    )
+
+
+def test_get_all_transformed_requests_missing_satellite(db: Session):
+    db.add(
+        RFRequest(
+            mission="Test Mission",
+            satellite_id=uuid4(),
+            start_time=datetime(2024, 9, 28, 12, 0),
+            end_time=datetime(2024, 9, 28, 13, 0),
+            contact_id=None,
+            priority=1,
+            downlink_time_requested=600,
+        )
+    )
+    db.commit()
+
+    with pytest.raises(HTTPException) as exc_info:
+        RequestService.get_all_transformed_requests(db)
+    assert exc_info.value.status_code == 404
+
+
 def test_nonexistent_request(db: Session):
     # Try to get a request with a non-existent ID
     nonexistent_id = uuid4()
@@ -432,3 +767,202 @@ def test_invalid_request_data(db: Session, sample_satellite):
         RequestService.create_rf_request(db, invalid_request)
     assert exc_info.value.status_code == 400
     assert "Mission name cannot be empty" in str(exc_info.value.detail)
+
+
+def _contact_model(satellite_id, start_time, minutes=30):
+    end_time = start_time + timedelta(minutes=minutes)
+    return ContactRequestModel(
+        missionName="Test Mission",
+        satelliteId=satellite_id,
+        station_id=1,
+        orbit=0,
+        uplink=True,
+        telemetry=True,
+        science=False,
+        aosTime=start_time,
+        rfOnTime=start_time,
+        rfOffTime=end_time,
+        losTime=end_time,
+    )
+
+
+def test_bookings_are_stored(db: Session, sample_satellite, sample_ground_station):
+    start_time = datetime(2024, 9, 28, 12, 0)
+    contact = RequestService.create_contact_request(
+        db, _contact_model(sample_satellite.id, start_time)
+    )
+
+    bookings = RequestService.get_bookings(db)
+
+    assert contact.scheduled
+    assert [b.request_id for b in bookings] == [contact.id] * 2
+    assert bookings[0].slot.start_time == start_time
+    assert bookings[-1].slot.end_time == start_time + timedelta(minutes=30)
+    # a read returns the stored bookings instead of scheduling again
+    assert [b.id for b in RequestService.get_bookings(db)] == [b.id for b in bookings]
+
+
+def test_rf_request_is_booked_within_passes(
+    db: Session, sample_satellite, sample_ground_station
+):
+    rf_request = RequestService.create_rf_request(
+        db,
+        RFTimeRequestModel(
+            missionName="Test Mission",
+            satelliteId=sample_satellite.id,
+            startTime=datetime(2024, 9, 28, 0, 0),
+            endTime=datetime(2024, 9, 29, 0, 0),
+            uplinkTime=600,
+            downlinkTime=0,
+            scienceTime=0,
+            minimumNumberOfPasses=1,
+        ),
+    )
+
+    bookings = RequestService.get_bookings(db)
+
+    assert rf_request.scheduled
+    assert rf_request.ground_station_id == sample_ground_station.id
+    assert all(b.request_id == rf_request.id for b in bookings)
+    assert sum((b.slot.end_time - b.slot.start_time).seconds for b in bookings) >= 600
+
+
+def test_contact_displaces_rf_booking(
+    db: Session, sample_satellite, sample_ground_station
+):
+    rf_request = RequestService.create_rf_request(
+        db,
+        RFTimeRequestModel(
+            missionName="Test Mission",
+            satelliteId=sample_satellite.id,
+            startTime=datetime(2024, 9, 28, 0, 0),
+            endTime=datetime(2024, 9, 29, 0, 0),
+            uplinkTime=600,
+            downlinkTime=0,
+            scienceTime=0,
+            minimumNumberOfPasses=1,
+        ),
+    )
+    first = RequestService.get_bookings(db)[0]
+
+    contact = RequestService.create_contact_request(
+        db, _contact_model(sample_satellite.id, first.slot.start_time, minutes=15)
+    )
+
+    bookings = RequestService.get_bookings(db)
+    contact_bookings = [b for b in bookings if b.request_id == contact.id]
+    rf_bookings = [b for b in bookings if b.request_id == rf_request.id]
+    assert contact_bookings[0].slot.start_time == first.slot.start_time
+    assert rf_bookings and first.id not in {b.id for b in rf_bookings}
+    for rf_booking in rf_bookings:
+        for contact_booking in contact_bookings:
+            assert (
+                rf_booking.slot.end_time <= contact_booking.slot.start_time
+                or rf_booking.slot.start_time >= contact_booking.slot.end_time
+            )
+
+
+def test_delete_frees_time_for_waiting_request(
+    db: Session, sample_satellite, sample_ground_station
+):
+    start_time = datetime(2024, 9, 28, 12, 0)
+    first = RequestService.create_contact_request(
+        db, _contact_model(sample_satellite.id, start_time)
+    )
+    second = RequestService.create_contact_request(
+        db, _contact_model(sample_satellite.id, start_time)
+    )
+    assert first.scheduled and not second.scheduled
+
+    RequestService.delete_contact_request(db, first.id)
+
+    bookings = RequestService.get_bookings(db)
+    assert second.scheduled
+    assert {b.request_id for b in bookings} == {second.id}
+
+
+def test_reschedule_bookings_replaces_stored_bookings(
+    db: Session, sample_satellite, sample_ground_station
+):
+    start_time = datetime(2024, 9, 28, 12, 0)
+    RequestService.create_contact_request(
+        db, _contact_model(sample_satellite.id, start_time)
+    )
+    stored = RequestService.get_bookings(db)
+
+    rescheduled = RequestService.reschedule_bookings(db, "optimal", start=start_time)
+
+    assert [b.slot for b in rescheduled] == [b.slot for b in stored]
+    assert RequestService.get_bookings(db) == rescheduled
+
+
+def test_reschedule_bookings_keeps_ended_requests(
+    db: Session, sample_satellite, sample_ground_station
+):
+    start_time = datetime(2024, 9, 28, 12, 0)
+    ended = RequestService.create_contact_request(
+        db, _contact_model(sample_satellite.id, start_time)
+    )
+    upcoming = RequestService.create_contact_request(
+        db, _contact_model(sample_satellite.id, start_time + timedelta(hours=2))
+    )
+    stored = {b.request_id: b for b in RequestService.get_bookings(db)}
+
+    with patch.object(
+        RequestService, "get_all_requests", side_effect=AssertionError
+    ) as get_all_requests:
+        rescheduled = RequestService.reschedule_bookings(
+            db, start=start_time + timedelta(hours=1)
+        )
+
+    by_request = {b.request_id: b for b in rescheduled}
+    assert not get_all_requests.called
+    assert by_request[ended.id].id == stored[ended.id].id
+    assert by_request[upcoming.id].id != stored[upcoming.id].id
+    assert by_request[upcoming.id].slot == stored[upcoming.id].slot
+
+
+def test_reschedule_keeps_writes_made_while_it_ran(
+    db: Session, sample_satellite, sample_ground_station
+):
+    start_time = datetime(2024, 9, 28, 12, 0)
+    deleted = RequestService.create_contact_request(
+        db, _contact_model(sample_satellite.id, start_time)
+    )
+    moved = RequestService.create_contact_request(
+        db, _contact_model(sample_satellite.id, start_time + timedelta(hours=1))
+    )
+
+    with Session(db.get_bind()) as scheduler_db:
+        snapshot = RequestService.get_all_requests(scheduler_db)
+        # the scheduler books the second contact where a new one is created below
+        bookings = [
+            Booking(
+                slot=Slot(
+                    start_time=start_time, end_time=start_time + timedelta(minutes=30)
+                ),
+                gs_id=sample_ground_station.id,
+                request_id=request.id,
+                id=uuid4(),
+            )
+            for request in snapshot
+        ]
+
+        RequestService.delete_contact_request(db, deleted.id)
+        created = RequestService.create_contact_request(
+            db, _contact_model(sample_satellite.id, start_time, minutes=15)
+        )
+
+        RequestService.replace_bookings(scheduler_db, snapshot, bookings)
+        scheduler_db.commit()
+
+    db.expire_all()
+    stored = RequestService.get_bookings(db)
+    assert {b.request_id for b in stored} == {created.id, moved.id}
+    assert all(
+        b.slot.start_time >= start_time + timedelta(hours=1)
+        for b in stored
+        if b.request_id == moved.id
+    )
+    assert RequestService.get_contact_request(db, created.id).scheduled
+    assert RequestService.get_contact_request(db, moved.id).scheduled
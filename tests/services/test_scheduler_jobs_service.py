@@ -0,0 +1,192 @@
+from datetime import datetime, timedelta
+import threading
+from unittest.mock import patch
+from uuid import UUID
+import pytest
+from sqlmodel import Session, SQLModel, create_engine
+from app.entities.GroundStation import GroundStation
+from app.entities.Request import ContactRequest
+from app.entities.Satellite import Satellite
+from app.entities.SchedulerJob import SchedulerJob, utc_now
+from app.services.request import RequestService
+from app.services.scheduler_jobs import SchedulerQueue
+
+# jobs only reschedule the requests that have not ended yet
+_start = datetime(2099, 9, 28, 12, 0)
+
+
+@pytest.fixture(name="engine")
+def engine_fixture(tmp_path):
+    # a file, so the worker threads and the test each get their own connection
+    engine = create_engine(f"sqlite:///{tmp_path / 'jobs.db'}")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as db:
+        satellite = Satellite(
+            name="SCISAT 1",
+            tle="1 27858U 03036A   24271.51787419  .00002340  00000+0  31635-3 0  9999\n2 27858  73.9336 337.0907 0007403 194.1129 165.9841 14.79656508138550",
+        )
+        db.add(satellite)
+        db.add(
+            GroundStation(
+                id=1,
+                name="Inuvik",
+                lat=68.3195,
+                lon=-133.549,
+                height=102.5,
+                mask=5,
+                uplink=0,
+                downlink=0,
+                science=0,
+            )
+        )
+        db.add(
+            ContactRequest(
+                mission="SCISAT",
+                satellite_id=satellite.id,
+                start_time=_start,
+                end_time=_start + timedelta(minutes=30),
+                booking_id=None,
+                priority=1,
+                ground_station_id=1,
+                orbit=1,
+                uplink=True,
+                telemetry=True,
+                science=True,
+                aos=_start,
+                los=_start + timedelta(minutes=30),
+                rf_on=_start,
+                rf_off=_start + timedelta(minutes=30),
+                duration=1800,
+            )
+        )
+        db.commit()
+    yield engine
+
+
+@pytest.fixture(name="queue")
+def queue_fixture(engine):
+    queue = SchedulerQueue(
+        session_factory=lambda: Session(engine, expire_on_commit=False),
+        debounce_seconds=0.2,
+    )
+    yield queue
+    queue.shutdown(timeout=5)
+
+
+def test_job_stores_bookings(engine, queue):
+    job = queue.submit("greedy")
+    assert job.status == "queued"
+
+    assert queue.wait(job, timeout=10)
+
+    job = queue.get(job.id)
+    assert job.status == "done"
+    with Session(engine) as db:
+        stored = RequestService.get_bookings(db)
+    assert [b.id for b in stored] == [UUID(b["id"]) for b in job.result]
+    assert [b.slot.start_time for b in stored] == [
+        _start,
+        _start + timedelta(minutes=15),
+    ]
+
+
+def test_burst_of_submissions_is_coalesced(queue):
+    jobs = [queue.submit("greedy") for _ in range(5)]
+    other = queue.submit("optimal")
+
+    assert {job.id for job in jobs} == {jobs[0].id}
+    assert queue.get(jobs[0].id).submissions == 5
+    assert other.id != jobs[0].id
+    assert queue.wait(jobs[0], timeout=10) and queue.wait(other, timeout=10)
+
+    # a submission after the job started gets a new job
+    assert queue.submit("greedy").id != jobs[0].id
+
+
+def test_failed_job_records_error(queue):
+    queue.debounce_seconds = 0
+    with patch.object(
+        RequestService,
+        "reschedule_bookings",
+        side_effect=RuntimeError("database is down"),
+    ):
+        job = queue.submit()
+        assert queue.wait(job, timeout=10)
+
+    job = queue.get(job.id)
+    assert job.status == "failed"
+    assert job.error == "database is down"
+    assert job.result is None
+
+
+def test_finished_jobs_are_trimmed(queue):
+    queue.history = 1
+    queue.debounce_seconds = 0
+    first = queue.submit()
+    queue.wait(first, timeout=10)
+    second = queue.submit()
+    queue.wait(second, timeout=10)
+
+    assert queue.get(first.id) is None
+    assert queue.get(second.id).status == "done"
+
+
+def test_jobs_are_shared_by_worker_processes(engine, queue):
+    # a second queue on the same database stands in for another worker process
+    other = SchedulerQueue(
+        session_factory=lambda: Session(engine, expire_on_commit=False),
+        debounce_seconds=0,
+        poll_seconds=0.05,
+    )
+    queue.debounce_seconds = 0
+    running = threading.Event()
+    release = threading.Event()
+    reschedule = RequestService.reschedule_bookings
+    overlaps = []
+
+    def slow_reschedule(*args, **kwargs):
+        overlaps.append(running.is_set())
+        running.set()
+        release.wait(10)
+        running.clear()
+        return reschedule(*args, **kwargs)
+
+    try:
+        with patch.object(
+            RequestService, "reschedule_bookings", side_effect=slow_reschedule
+        ):
+            first = queue.submit("greedy")
+            assert running.wait(10)
+            second = other.submit("optimal")
+            assert other.get(first.id).status == "running"
+            assert not other.wait(second, timeout=0.3)
+            release.set()
+            assert other.wait(first, timeout=10)
+            assert queue.wait(second, timeout=10)
+    finally:
+        release.set()
+        other.shutdown(timeout=5)
+
+    assert overlaps == [False, False]
+    assert queue.get(second.id).status == "done"
+
+
+def test_abandoned_jobs_do_not_block(engine, queue):
+    queue.debounce_seconds = 0
+    queue.stale_seconds = 60
+    with Session(engine) as db:
+        abandoned = SchedulerJob(
+            mode="greedy",
+            improve_ms=0,
+            status="running",
+            started_at=utc_now() - timedelta(hours=1),
+        )
+        db.add(abandoned)
+        db.commit()
+        db.refresh(abandoned)
+
+    job = queue.submit()
+    assert queue.wait(job, timeout=10)
+
+    assert queue.get(job.id).status == "done"
+    assert queue.get(abandoned.id).status == "failed"
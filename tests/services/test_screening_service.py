@@ -0,0 +1,138 @@
+from datetime import datetime, timedelta, timezone
+import math
+import numpy as np
+import pytest
+from app.entities.GroundStation import GroundStation
+from app.entities.Satellite import Satellite
+from app.services.geometry import station_frames, time_grid
+from app.services.passes import satellite_passes
+from app.services.propagation import satellite_itrf
+from app.services.screening import (
+    OrbitBounds,
+    candidate_indices,
+    orbit_bounds,
+    reachable_stations,
+)
+from app.services.visibility import visibility_matrix
+
+_tle_scisat = """SCISAT 1
+1 27858U 03036A   24271.51787419  .00002340  00000+0  31635-3 0  9999
+2 27858  73.9336 337.0907 0007403 194.1129 165.9841 14.79656508138550"""
+
+_tle_neossat = """NEOSSAT
+1 39089U 13009D   24271.52543360  .00000662  00000+0  24595-3 0  9997
+2 39089  98.4054  96.2203 0010420 322.4732  37.5725 14.35304192606691"""
+
+_start = datetime(2024, 10, 1, 0, 0, tzinfo=timezone.utc)
+_end = _start + timedelta(days=2)
+
+
+def _station(id: int, lat: float, lon: float, mask: int = 5) -> GroundStation:
+    return GroundStation(
+        id=id,
+        name=f"Station {id}",
+        lat=lat,
+        lon=lon,
+        height=100,
+        mask=mask,
+        uplink=0,
+        downlink=0,
+        science=0,
+    )
+
+
+@pytest.fixture
+def satellites():
+    return [
+        Satellite(name="SCISAT 1", tle=_tle_scisat),
+        Satellite(name="NEOSSAT", tle=_tle_neossat),
+    ]
+
+
+@pytest.fixture
+def stations():
+    return [
+        _station(1, 68.3195, -133.549),
+        _station(2, 53.2124, -105.934),
+        _station(3, 45.5846, -75.8083, mask=0),
+        _station(4, -89.9, 0),
+        _station(5, 0, 30, mask=10),
+    ]
+
+
+def test_orbit_bounds(satellites):
+    bounds = orbit_bounds(satellites[0].get_sf_sat())
+
+    assert math.degrees(bounds.max_latitude) == pytest.approx(73.9336, abs=1e-3)
+    assert 6900 < bounds.apogee_radius < 7100
+    # about 15 orbits a day, plus the Earth's rotation
+    assert 2 * math.pi * 15 / 86400 < bounds.max_rate < 2 * math.pi * 17 / 86400
+
+
+def test_reachable_stations():
+    bounds = OrbitBounds(
+        max_latitude=math.radians(10),
+        apogee_radius=6378 + 500,
+        max_rate=0.0012,
+    )
+    positions, _ = station_frames(
+        [_station(1, 0, 0), _station(2, 25, 0), _station(3, 60, 0)]
+    )
+
+    reachable = reachable_stations(bounds, positions, np.array([5.0, 5.0, 5.0]))
+
+    assert reachable.tolist() == [True, True, False]
+
+
+def test_candidate_indices_cover_visibility(satellites, stations):
+    times = time_grid(_start, _end, 60)
+    positions, _ = station_frames(stations[1:2])
+    masks = np.array([float(stations[1].mask)])
+
+    for sat in satellites:
+        sf_sat = sat.get_sf_sat()
+        samples = candidate_indices(
+            sf_sat,
+            len(times),
+            60,
+            positions,
+            masks,
+            lambda index: satellite_itrf(sf_sat, times[index]),
+        )
+        visible = visibility_matrix([sat], stations[1:2], _start, _end, screening=False)
+
+        assert samples is not None
+        assert set(np.flatnonzero(visible[0, 0])) <= set(samples.tolist())
+        # a single station sees a LEO satellite a small fraction of the time
+        assert len(samples) < len(times) / 3
+
+
+def test_candidate_indices_skip_fine_grids(satellites, stations):
+    positions, _ = station_frames(stations)
+
+    samples = candidate_indices(
+        satellites[0].get_sf_sat(),
+        100,
+        600,
+        positions,
+        np.zeros(len(stations)),
+        lambda index: np.zeros((3, len(index))),
+    )
+
+    assert samples is None
+
+
+def test_screened_matrix_matches(satellites, stations):
+    screened = visibility_matrix(satellites, stations, _start, _end, screening=True)
+    full = visibility_matrix(satellites, stations, _start, _end, screening=False)
+
+    assert screened.any()
+    assert np.array_equal(screened, full)
+
+
+def test_screened_passes_match(satellites, stations):
+    for sat in satellites:
+        sf_sat = sat.get_sf_sat()
+        assert satellite_passes(
+            sf_sat, stations, _start, _end, screening=True
+        ) == satellite_passes(sf_sat, stations, _start, _end, screening=False)
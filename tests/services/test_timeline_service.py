@@ -0,0 +1,134 @@
+from datetime import datetime, timedelta, timezone
+from uuid import UUID, uuid4
+import pytest
+from app.entities.GroundStation import GroundStation
+from app.entities.Request import ContactRequest, RFRequest
+from app.services.occupancy import OccupancyIndex
+from app.services.request import divide_into_slots, schedule_with_slots
+from app.services.timeline import (
+    Timeline,
+    from_epoch,
+    slot_starts,
+    to_epoch,
+)
+
+_start = datetime(2025, 1, 21, 10, 0, tzinfo=timezone.utc)
+
+
+def _station(id: int) -> GroundStation:
+    return GroundStation(
+        id=id,
+        name=f"Station {id}",
+        lat=53.2124,
+        lon=-105.934,
+        height=490.3,
+        mask=5,
+        uplink=0,
+        downlink=0,
+        science=0,
+    )
+
+
+def test_epoch_round_trip():
+    naive = datetime(2025, 1, 21, 10, 0)
+
+    assert to_epoch(naive) == to_epoch(_start)
+    assert from_epoch(to_epoch(_start), _start) == _start
+    assert from_epoch(to_epoch(naive), naive) == naive
+
+
+def test_slot_starts_match_divide_into_slots():
+    end = _start + timedelta(minutes=50)
+
+    slots = divide_into_slots(_start, end)
+    starts = slot_starts(to_epoch(_start), to_epoch(end))
+
+    assert [from_epoch(s, _start) for s in starts.tolist()] == [s for s, _ in slots]
+
+
+def test_timeline_blocks_touched_cells():
+    timeline = Timeline(0, 3600, resolution=60)
+    timeline.book(1, 60, 150)
+
+    assert timeline.is_free(1, 0, 60)
+    assert not timeline.is_free(1, 170, 200)
+    assert timeline.is_free(1, 180, 240)
+    assert timeline.is_free(2, 60, 150)
+    assert timeline.free_stations([1, 2], 100, 200).tolist() == [False, True]
+    with pytest.raises(ValueError):
+        timeline.book(1, 120, 180)
+    with pytest.raises(ValueError):
+        timeline.is_free(1, 3000, 4000)
+
+
+def test_timeline_find_gap():
+    timeline = Timeline(0, 3600, resolution=60)
+    timeline.book(1, 60, 150)
+
+    assert timeline.find_gap(1, 0, 3600, 60) == 0
+    assert timeline.find_gap(1, 30, 3600, 60) == 180
+    assert timeline.find_gap(1, 30, 200, 60) is None
+    assert timeline.find_gap(2, -100, 3600, 60) == 0
+    assert timeline.find_gap(1, 3500, 4000, 200) is None
+
+
+def test_timeline_year_fits_in_a_few_mb():
+    timeline = Timeline(0, 365 * 86400, resolution=60)
+    timeline.book(1, 0, 60)
+
+    assert timeline.nbytes() < 1024 * 1024
+
+
+def test_schedule_with_timeline_matches_intervals():
+    stations = [_station(1), _station(2)]
+
+    def requests():
+        gs_ids = [1, 1, 2, 1]
+        contacts = [
+            ContactRequest(
+                id=UUID(int=i),
+                mission="SCISAT",
+                satellite_id=uuid4(),
+                start_time=_start + timedelta(minutes=15 * i),
+                end_time=_start + timedelta(minutes=15 * i + 60),
+                booking_id=None,
+                priority=1,
+                ground_station_id=gs_id,
+                orbit=1,
+                uplink=True,
+                telemetry=True,
+                science=True,
+                aos=_start,
+                los=_start,
+                rf_on=_start,
+                rf_off=_start,
+                duration=1200,
+            )
+            for i, gs_id in enumerate(gs_ids)
+        ]
+        rf = RFRequest(
+            id=UUID(int=255),
+            mission="SCISAT",
+            satellite_id=uuid4(),
+            start_time=_start,
+            end_time=_start + timedelta(hours=2),
+            contact_id=None,
+            priority=1,
+            downlink_time_requested=3600,
+        )
+        return [*contacts, rf]
+
+    def summary(bookings):
+        return [
+            (b.request_id, b.gs_id, b.slot.start_time, b.slot.end_time)
+            for b in bookings
+        ]
+
+    start = to_epoch(_start)
+    with_intervals = schedule_with_slots(requests(), stations, OccupancyIndex())
+    with_timeline = schedule_with_slots(
+        requests(), stations, Timeline(start, start + 4 * 3600, resolution=60)
+    )
+
+    assert len(with_intervals) > 0
+    assert summary(with_timeline) == summary(with_intervals)
@@ -0,0 +1,101 @@
+import base64
+from datetime import datetime, timedelta, timezone
+import numpy as np
+import pytest
+from app.entities.GroundStation import GroundStation
+from app.entities.Satellite import Satellite
+from app.services.request import is_visible
+from app.services.visibility import encode_matrix, time_grid, visibility_matrix
+
+_tle_scisat = """SCISAT 1
+1 27858U 03036A   24271.51787419  .00002340  00000+0  31635-3 0  9999
+2 27858  73.9336 337.0907 0007403 194.1129 165.9841 14.79656508138550"""
+
+_tle_neossat = """NEOSSAT
+1 39089U 13009D   24271.52543360  .00000662  00000+0  24595-3 0  9997
+2 39089  98.4054  96.2203 0010420 322.4732  37.5725 14.35304192606691"""
+
+_start = datetime(2025, 1, 21, 6, 0, tzinfo=timezone.utc)
+_end = datetime(2025, 1, 21, 18, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def satellites():
+    return [
+        Satellite(name="SCISAT 1", tle=_tle_scisat),
+        Satellite(name="NEOSSAT", tle=_tle_neossat),
+    ]
+
+
+@pytest.fixture
+def stations():
+    return [
+        GroundStation(
+            id=1,
+            name="Inuvik NorthWest",
+            lat=68.3195,
+            lon=-133.549,
+            height=102.5,
+            mask=5,
+            uplink=0,
+            downlink=0,
+            science=0,
+        ),
+        GroundStation(
+            id=2,
+            name="Prince Albert",
+            lat=53.2124,
+            lon=-105.934,
+            height=490.3,
+            mask=5,
+            uplink=0,
+            downlink=0,
+            science=0,
+        ),
+    ]
+
+
+def test_time_grid():
+    times = time_grid(_start, _start + timedelta(minutes=10), step_seconds=120)
+
+    assert len(times) == 5
+    assert times[0].utc_datetime() == _start
+    assert times[-1].utc_datetime() == _start + timedelta(minutes=8)
+
+
+def test_visibility_matrix_matches_is_visible(satellites, stations):
+    matrix = visibility_matrix(satellites, stations, _start, _end, step_seconds=600)
+
+    assert matrix.shape == (2, 2, 72)
+    assert matrix.dtype == np.bool_
+    assert matrix.any()
+    for i, sat in enumerate(satellites):
+        for j, gs in enumerate(stations):
+            for k in range(0, 72, 7):
+                time = _start + timedelta(seconds=600 * k)
+                assert matrix[i, j, k] == is_visible(sat.get_sf_sat(), gs, time)
+
+
+def test_visibility_matrix_elevations(satellites, stations):
+    elevations = visibility_matrix(
+        satellites, stations, _start, _end, step_seconds=600, elevations=True
+    )
+    visible = visibility_matrix(satellites, stations, _start, _end, step_seconds=600)
+
+    assert elevations.dtype == np.float32
+    assert np.all((elevations > 5) == visible)
+    assert np.all((elevations >= -90) & (elevations <= 90))
+
+
+def test_visibility_matrix_empty(satellites):
+    assert visibility_matrix(satellites, [], _start, _end).shape == (2, 0, 720)
+
+
+def test_encode_matrix_packed_round_trip(satellites, stations):
+    matrix = visibility_matrix(satellites, stations, _start, _end)
+
+    packed = encode_matrix(matrix, "packed")
+    bits = np.unpackbits(np.frombuffer(base64.b64decode(packed), dtype=np.uint8))
+
+    assert np.array_equal(bits[: matrix.size].reshape(matrix.shape), matrix)
+    assert len(packed) < len(str(encode_matrix(matrix, "list"))) / 20